@@ -13,7 +13,103 @@ class Settings:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     UPLOAD_DIR = os.path.join(BASE_DIR, "static", "uploads")
     RESULT_DIR = os.path.join(BASE_DIR, "static", "results")
-    DOCS_STATIC_DIR = os.path.join(BASE_DIR, "static", "docs") # 압축 해제된 파일 저장소
+    DOCS_STATIC_DIR = os.path.join(BASE_DIR, "static", "docs") # 압축 해제된 파일 저장소 (이전 방식 문서)
+    DOCS_BLOB_DIR = os.path.join(BASE_DIR, "static", "blobs")  # 문서 파일 내용 주소 저장소 (참조 카운트)
+
+    # 슬라이드 렌더링 (스트리밍 파이프라인)
+    RASTER_DPI = int(os.getenv("RASTER_DPI", "150"))
+    RASTER_CHUNK_PAGES = int(os.getenv("RASTER_CHUNK_PAGES", "8"))   # pdftoppm 1회 호출당 페이지 수
+    MAX_PENDING_PAGES = int(os.getenv("MAX_PENDING_PAGES", "16"))    # 렌더링 후 분석 대기 중인 최대 페이지 수
+    # 동시에 실행할 pdftoppm 프로세스 수 (작업 1개 기준, 기본: 코어 수의 절반)
+    RASTER_PROCESSES = int(os.getenv("RASTER_PROCESSES", str(max(1, (os.cpu_count() or 2) // 2))))
+
+    # PDF 보고서
+    REPORT_PDF_BACKEND = os.getenv("REPORT_PDF_BACKEND", "wkhtmltopdf")   # wkhtmltopdf | pymupdf (프로세스 내, 빠름)
+    REPORT_PDF_MODE = os.getenv("REPORT_PDF_MODE", "lazy")                # lazy: 첫 다운로드 시 생성 | eager: 작업마다 생성
+    REPORT_FONT_PATH = os.getenv("REPORT_FONT_PATH", "/usr/share/fonts/truetype/nanum/NanumGothic.ttf")  # pymupdf용 한글 글꼴
+
+    # 다운로드 시 생성되는 결과물(PDF 보고서 등) 캐시
+    ARTIFACT_CACHE_DIR = os.path.join(RESULT_DIR, "artifacts")
+    ARTIFACT_CACHE_MAX_MB = int(os.getenv("ARTIFACT_CACHE_MAX_MB", "2048"))  # 초과 시 오래 사용되지 않은 것부터 삭제
+
+    # PPT -> PDF 변환 (상주 LibreOffice 풀)
+    OFFICE_CONVERTER = os.getenv("OFFICE_CONVERTER", "unoserver")     # unoserver | soffice (변환마다 실행)
+    OFFICE_CONVERTERS = int(os.getenv("OFFICE_CONVERTERS", "2"))      # 프로세스당 LibreOffice 인스턴스 수 = 동시 변환 수
+    OFFICE_SERVER_CMD = os.getenv("OFFICE_SERVER_CMD", "unoserver")
+    OFFICE_START_TIMEOUT = int(os.getenv("OFFICE_START_TIMEOUT", "60"))
+    OFFICE_CONVERT_TIMEOUT = int(os.getenv("OFFICE_CONVERT_TIMEOUT", "180"))
+    OFFICE_RECYCLE_AFTER = int(os.getenv("OFFICE_RECYCLE_AFTER", "200"))  # 이 횟수만큼 변환 후 인스턴스 재시작
+
+    # 페이지 이미지 인코딩 (LLM 전송용은 메모리에서 압축, 보관용은 결과 폴더에 1회 저장)
+    LLM_IMAGE_FORMAT = os.getenv("LLM_IMAGE_FORMAT", "jpeg")         # jpeg | webp | png
+    LLM_IMAGE_QUALITY = int(os.getenv("LLM_IMAGE_QUALITY", "85"))
+    LLM_IMAGE_MAX_EDGE = int(os.getenv("LLM_IMAGE_MAX_EDGE", "2048"))  # 긴 변 최대 픽셀 (0: 축소 안 함, OpenAI는 2048 초과분을 어차피 축소)
+    ARCHIVE_IMAGE_FORMAT = os.getenv("ARCHIVE_IMAGE_FORMAT", "png")
+    ARCHIVE_IMAGE_QUALITY = int(os.getenv("ARCHIVE_IMAGE_QUALITY", "90"))
+
+    # 슬라이드 분석 캐시
+    SLIDE_CACHE_ENABLED = os.getenv("SLIDE_CACHE_ENABLED", "true").lower() == "true"
+    SLIDE_CACHE_TTL_DAYS = int(os.getenv("SLIDE_CACHE_TTL_DAYS", "30"))
+    SLIDE_CACHE_MAX_ENTRIES = int(os.getenv("SLIDE_CACHE_MAX_ENTRIES", "100000"))
+
+    # OpenAI 동시 요청 제어 (API Key별 AIMD)
+    OPENAI_INITIAL_CONCURRENCY = int(os.getenv("OPENAI_INITIAL_CONCURRENCY", "3"))
+    OPENAI_MIN_CONCURRENCY = int(os.getenv("OPENAI_MIN_CONCURRENCY", "1"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    OPENAI_LATENCY_BACKOFF_RATIO = float(os.getenv("OPENAI_LATENCY_BACKOFF_RATIO", "2.0"))
+
+    # Local LLM 서버에 동시에 보낼 최대 요청 수 = GPU 슬롯 수 (모든 작업 공유)
+    # worker 모드에서는 워커 프로세스 수로 나눠 프로세스마다 배정 (머신이 여러 대면 머신별로 나눠서 설정)
+    LOCAL_MAX_INFLIGHT = int(os.getenv("LOCAL_MAX_INFLIGHT", "4"))
+    # 남은 슬라이드가 이 값 이하인 작업은 스케줄링 우선순위를 높임
+    SMALL_JOB_PAGES = int(os.getenv("SMALL_JOB_PAGES", "20"))
+
+    # 작업 실행 방식: inline(웹 프로세스의 BackgroundTasks) | worker(worker.py 별도 프로세스)
+    JOB_EXECUTION_MODE = os.getenv("JOB_EXECUTION_MODE", "inline")
+    WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+    WORKER_THREADS = int(os.getenv("WORKER_THREADS", "2"))          # 프로세스당 동시 작업 수
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+
+    # 대시보드 실시간 갱신 소스: local(웹 프로세스 내 pub/sub) | changestream(MongoDB replica set 필요)
+    # worker 모드에서는 진행 상황이 다른 프로세스에서 기록되므로 기본값이 changestream
+    JOB_EVENTS_SOURCE = os.getenv("JOB_EVENTS_SOURCE", "changestream" if JOB_EXECUTION_MODE == "worker" else "local")
+
+    # 작업 진행률 기록 (DB 쓰기 묶음 처리)
+    PROGRESS_FLUSH_SECONDS = float(os.getenv("PROGRESS_FLUSH_SECONDS", "1.0"))
+    PROGRESS_FLUSH_LOGS = int(os.getenv("PROGRESS_FLUSH_LOGS", "20"))
+    JOB_LOG_CAP = int(os.getenv("JOB_LOG_CAP", "500"))               # 작업 문서에 보관할 최대 로그 수
+
+    # 로그인 세션
+    SESSION_MAX_AGE_SECONDS = int(os.getenv("SESSION_MAX_AGE_SECONDS", str(60 * 60 * 24 * 7)))  # 쿠키 유지 기간과 동일
+    SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+    # 다른 프로세스의 로그아웃 반영: none(캐시 TTL 이내 반영) | changestream(MongoDB replica set 필요)
+    SESSION_INVALIDATION = os.getenv("SESSION_INVALIDATION", "none")
+
+    # 사용자 설정 캐시 (변경 시 이 프로세스에서는 즉시 무효화, 다른 프로세스는 TTL 이내 반영)
+    SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "30"))
+    SETTINGS_CACHE_SIZE = int(os.getenv("SETTINGS_CACHE_SIZE", "10000"))
+
+    # 비밀번호 해싱 (bcrypt 전용 스레드 풀)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))
+    BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "64"))
+
+    # async 라우트에서 블로킹 I/O(MongoDB, 파일)를 실행할 전용 스레드 수
+    BLOCKING_IO_THREADS = int(os.getenv("BLOCKING_IO_THREADS", "32"))
+
+    # 업로드 (스트리밍 저장 + 재개 가능한 분할 업로드)
+    MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "1024"))            # 작업(슬라이드/오디오) 업로드 최대 크기
+    MAX_DOC_UPLOAD_MB = int(os.getenv("MAX_DOC_UPLOAD_MB", "200"))     # 문서(zip) 업로드 최대 크기
+    UPLOAD_BUFFER_KB = int(os.getenv("UPLOAD_BUFFER_KB", "1024"))      # 디스크 쓰기 단위
+    UPLOAD_PART_MAX_MB = int(os.getenv("UPLOAD_PART_MAX_MB", "16"))    # 분할 업로드 조각 최대 크기
+    UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))  # 미완료 분할 업로드 보관 기간
+
+    # 중복 업로드 재사용 (같은 파일 + 같은 모델/프롬프트의 완료 결과를 즉시 복사)
+    UPLOAD_DEDUP_ENABLED = os.getenv("UPLOAD_DEDUP_ENABLED", "true").lower() == "true"
+    UPLOAD_DEDUP_SCOPE = os.getenv("UPLOAD_DEDUP_SCOPE", "owner")   # owner | global (다른 사용자 결과도 재사용)
 
     BASE_URL = "http://localhost:8000"
     
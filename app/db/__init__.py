@@ -31,3 +31,7 @@ users_col = db['users']
 sessions_col = db['sessions']
 history_col = db['history']
 docs_col = db['docs']
+slide_cache_col = db['slide_cache']
+slide_results_col = db['slide_results']  # 작업별 슬라이드 분석 체크포인트
+upload_sessions_col = db['upload_sessions']  # 재개 가능한 분할 업로드 상태
+blobs_col = db['blobs']  # 문서 파일 blob 참조 카운트
@@ -0,0 +1,212 @@
+# app/db/indexes.py
+"""
+MongoDB 인덱스 선언 및 점검 도구
+
+    python -m app.db.indexes ensure   # 선언된 인덱스 생성 (이미 있으면 무시)
+    python -m app.db.indexes audit    # 매니저들이 사용하는 모든 쿼리 형태를 explain() 하여 COLLSCAN 검사
+
+서버(main.py)와 워커(worker.py)는 시작 시 ensure_indexes_in_background()로 자동 생성합니다.
+"""
+import sys
+import threading
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.db import db, users_col, sessions_col, history_col, docs_col, slide_cache_col, slide_results_col, upload_sessions_col, blobs_col
+
+def _declared_indexes():
+    """(collection, keys, options) 목록"""
+    return [
+        # users: 로그인/중복 체크
+        (users_col, [("username", ASCENDING)], {"name": "username_unique", "unique": True}),
+        (users_col, [("email", ASCENDING)], {
+            "name": "email_unique",
+            "unique": True,
+            # 이메일 인증 없이 가입한 사용자는 email이 ""이므로 제외
+            "partialFilterExpression": {"email": {"$gt": ""}}
+        }),
+
+        # sessions: 매 요청 인증
+        (sessions_col, [("session_id", ASCENDING)], {"name": "session_id_unique", "unique": True}),
+        # 쿠키 유지 기간이 지난 세션은 MongoDB가 자동 삭제
+        (sessions_col, [("created_at", ASCENDING)], {
+            "name": "created_at_ttl",
+            "expireAfterSeconds": settings.SESSION_MAX_AGE_SECONDS
+        }),
+
+        # history: 작업 조회/목록/대기열
+        (history_col, [("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        (history_col, [("owner", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {"name": "owner_created"}),
+        (history_col, [("owner", ASCENDING), ("updated_at", ASCENDING)], {"name": "owner_updated"}),
+        (history_col, [("status", ASCENDING), ("created_at", ASCENDING)], {"name": "status_created"}),
+        (history_col, [("created_at", DESCENDING)], {"name": "created_at"}),
+        (history_col, [("result_key", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)], {
+            "name": "result_key_status",
+            "partialFilterExpression": {"result_key": {"$type": "string"}}
+        }),
+
+        # docs: 트리 탐색
+        (docs_col, [("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        (docs_col, [("owner", ASCENDING), ("parent_id", ASCENDING)], {"name": "owner_parent"}),
+        (docs_col, [("owner", ASCENDING), ("type", ASCENDING)], {"name": "owner_type"}),
+        (docs_col, [("parent_id", ASCENDING)], {"name": "parent_id"}),
+        # 같은 작업을 다시 가져올 때 기존 문서의 파일 목록 재사용
+        (docs_col, [("source_job", ASCENDING)], {
+            "name": "source_job",
+            "partialFilterExpression": {"source_job": {"$type": "string"}}
+        }),
+
+        # blobs: 문서 파일 참조 카운트
+        (blobs_col, [("key", ASCENDING)], {"name": "key_unique", "unique": True}),
+
+        # slide_cache: 키 조회 + 마지막 사용 기준 TTL/LRU
+        (slide_cache_col, [("key", ASCENDING)], {"name": "key_unique", "unique": True}),
+        (slide_cache_col, [("last_used_at", ASCENDING)], {
+            "name": "last_used_ttl",
+            "expireAfterSeconds": settings.SLIDE_CACHE_TTL_DAYS * 24 * 3600
+        }),
+
+        # slide_results: 작업별 체크포인트
+        (slide_results_col, [("job_id", ASCENDING), ("index", ASCENDING)], {"name": "job_index_unique", "unique": True}),
+
+        # upload_sessions: 분할 업로드 조회 + 미완료 업로드 자동 만료
+        (upload_sessions_col, [("upload_id", ASCENDING)], {"name": "upload_id_unique", "unique": True}),
+        (upload_sessions_col, [("created_at", ASCENDING)], {
+            "name": "created_at_ttl",
+            "expireAfterSeconds": settings.UPLOAD_SESSION_TTL_HOURS * 3600
+        }),
+    ]
+
+def ensure_indexes():
+    """선언된 인덱스를 생성합니다. 동일한 인덱스가 있으면 MongoDB가 무시하므로 여러 번 호출해도 안전합니다."""
+    for col, keys, options in _declared_indexes():
+        try:
+            col.create_index(keys, background=True, **options)
+        except OperationFailure as e:
+            # TTL 값만 바뀐 경우 기존 인덱스를 수정
+            if "expireAfterSeconds" in options and e.code in (85, 86):
+                db.command("collMod", col.name, index={
+                    "keyPattern": dict(keys),
+                    "expireAfterSeconds": options["expireAfterSeconds"]
+                })
+            else:
+                print(f"[WARN] 인덱스 생성 실패 {col.name}.{options.get('name')}: {e}")
+        except Exception as e:
+            print(f"[WARN] 인덱스 생성 실패 {col.name}.{options.get('name')}: {e}")
+
+def ensure_indexes_in_background():
+    threading.Thread(target=ensure_indexes, daemon=True).start()
+
+# ==========================================
+# Query plan audit
+# ==========================================
+
+def _query_shapes():
+    """
+    서비스 레이어가 실행하는 쿼리 형태 목록: (이름, explain 결과를 반환하는 함수)
+    update/delete/count 는 같은 필터의 find로 인덱스 선택을 확인합니다.
+    """
+    now = datetime.now()
+    sample = "audit-sample"
+
+    def find(col, query, sort=None):
+        def run():
+            cursor = col.find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            return cursor.explain()
+        return run
+
+    def aggregate(col, pipeline):
+        return lambda: db.command("aggregate", col.name, pipeline=pipeline, explain=True)
+
+    return [
+        # AuthManager
+        ("users.by_username", find(users_col, {"username": sample})),
+        ("users.by_email", find(users_col, {"email": sample})),
+        ("sessions.by_session_id", find(sessions_col, {"session_id": sample})),
+
+        # JobManager
+        ("history.by_id", find(history_col, {"id": sample})),
+        ("history.by_id_owner", find(history_col, {"id": sample, "owner": sample})),
+        ("history.completed_by_owner", find(history_col, {"owner": sample, "status": "completed"}, [("created_at", -1), ("id", -1)])),
+        ("history.all_sorted", find(history_col, {}, [("created_at", -1)])),
+        ("history.list_jobs", aggregate(history_col, [
+            {"$match": {"owner": sample, "updated_at": {"$gt": now}}},
+            {"$sort": {"created_at": -1, "id": -1}},
+            {"$limit": 21}
+        ])),
+        ("history.job_logs", aggregate(history_col, [{"$match": {"id": sample, "owner": sample}}])),
+        ("history.claim_next", find(history_col, {
+            "$or": [{"status": "pending"}, {"status": "processing", "lease_expires_at": {"$lt": now}}],
+            "file_path": {"$ne": None},
+            "attempts": {"$lt": settings.JOB_MAX_ATTEMPTS}
+        }, [("created_at", 1)])),
+        ("history.heartbeat", find(history_col, {"id": sample, "lease_owner": sample, "status": "processing"})),
+        ("history.interrupted", find(history_col, {"status": {"$in": ["processing", "pending"]}})),
+        ("history.queue_count", find(history_col, {
+            "created_at": {"$lt": now.isoformat()},
+            "status": {"$in": ["pending", "processing"]}
+        })),
+        ("history.usage_by_owner", aggregate(history_col, [{"$match": {"owner": sample, "status": "completed"}}])),
+        ("history.reusable_result", find(history_col, {"result_key": sample, "status": "completed", "failed_slides": 0}, [("created_at", -1)])),
+        ("slide_results.by_job", find(slide_results_col, {"job_id": sample})),
+        ("slide_results.by_job_index", find(slide_results_col, {"job_id": sample, "index": 1})),
+
+        # DocManager
+        ("docs.by_id", find(docs_col, {"id": sample})),
+        ("docs.by_id_owner", find(docs_col, {"id": sample, "owner": sample})),
+        ("docs.by_owner_parent", find(docs_col, {"owner": sample, "parent_id": None})),
+        ("docs.by_parent", find(docs_col, {"parent_id": sample})),
+        ("docs.folders_by_owner", find(docs_col, {"owner": sample, "type": "folder"})),
+        ("docs.by_source_job", find(docs_col, {"source_job": sample, "type": "file"})),
+
+        # BlobStore
+        ("blobs.by_key", find(blobs_col, {"key": sample})),
+
+        # SlideCache
+        ("slide_cache.by_key", find(slide_cache_col, {"key": sample})),
+        ("slide_cache.lru", find(slide_cache_col, {}, [("last_used_at", 1)])),
+
+        # UploadStore
+        ("upload_sessions.by_id_owner", find(upload_sessions_col, {"upload_id": sample, "owner": sample})),
+    ]
+
+def _collscan_found(node) -> bool:
+    if isinstance(node, dict):
+        if node.get("stage") == "COLLSCAN":
+            return True
+        # rejectedPlans는 실제로 실행되지 않으므로 제외
+        return any(_collscan_found(v) for k, v in node.items() if k != "rejectedPlans")
+    if isinstance(node, list):
+        return any(_collscan_found(v) for v in node)
+    return False
+
+def audit_query_plans() -> bool:
+    ok = True
+    for name, explain in _query_shapes():
+        try:
+            plan = explain()
+        except Exception as e:
+            print(f"[ERROR] {name}: explain 실패 ({e})")
+            ok = False
+            continue
+        if _collscan_found(plan):
+            print(f"[FAIL]  {name}: COLLSCAN")
+            ok = False
+        else:
+            print(f"[OK]    {name}")
+    return ok
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "audit"
+    if command == "ensure":
+        ensure_indexes()
+        print("인덱스 생성 완료")
+    elif command == "audit":
+        ensure_indexes()
+        sys.exit(0 if audit_query_plans() else 1)
+    else:
+        print(__doc__)
+        sys.exit(2)
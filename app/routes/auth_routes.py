@@ -1,8 +1,11 @@
 # app/routes/auth_routes.py
-from fastapi import APIRouter, HTTPException, Form
+from fastapi import APIRouter, HTTPException, Form, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from app.services.auth_manager import AuthManager
+from app.services.auth_manager import AuthManager, AsyncAuthManager
+from app.services.password_hasher import PasswordPoolBusy
+from app.routes.deps import get_current_user
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -16,7 +19,7 @@ async def api_signup_request(
     password: str = Form(...), 
     email: str = Form(...)
 ):
-    result = AuthManager.request_signup(username, password, email)
+    result = await AsyncAuthManager.request_signup(username, password, email)
     if result == "success":
         return {"message": "Verification email sent"}
     elif result == "username_exists":
@@ -28,19 +31,30 @@ async def api_signup_request(
     
 @router.post("/auth/signup/verify")
 async def api_signup_verify(req: VerifyRequest):
-    if AuthManager.verify_and_create_user(req.email, req.code):
+    try:
+        created = await AuthManager.verify_and_create_user(req.email, req.code)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    if created:
         return {"message": "User created successfully"}
     raise HTTPException(status_code=400, detail="Invalid verification code")
 
 @router.post("/auth/signup")
 async def api_signup(username: str = Form(...), password: str = Form(...)):
-    if AuthManager.create_user(username, password):
+    try:
+        created = await AuthManager.create_user(username, password)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+    if created:
         return {"message": "User created"}
     raise HTTPException(status_code=400, detail="User already exists")
 
 @router.post("/auth/login")
 async def api_login(username: str = Form(...), password: str = Form(...)):
-    session_id = AuthManager.authenticate_user(username, password)
+    try:
+        session_id = await AuthManager.authenticate_user(username, password)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
     if session_id:
         response = JSONResponse(content={"message": "Login successful"})
         
@@ -48,8 +62,16 @@ async def api_login(username: str = Form(...), password: str = Form(...)):
             key="session_id", 
             value=session_id, 
             httponly=True,
-            max_age=60*60*24*7,  # 7일간 유지
-            expires=60*60*24*7   
+            max_age=settings.SESSION_MAX_AGE_SECONDS,  # 7일간 유지 (서버 세션 만료와 동일)
+            expires=settings.SESSION_MAX_AGE_SECONDS   
         )
         return response
-    raise HTTPException(status_code=401, detail="Invalid credentials")
\ No newline at end of file
+    raise HTTPException(status_code=401, detail="Invalid credentials")
+
+@router.get("/auth/session-cache/stats")
+async def api_session_cache_stats(user: str = Depends(get_current_user)):
+    return AuthManager.get_session_cache_stats()
+
+@router.get("/auth/password-pool/stats")
+async def api_password_pool_stats(user: str = Depends(get_current_user)):
+    return AuthManager.get_password_pool_stats()
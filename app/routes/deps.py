@@ -1,10 +1,13 @@
 # app/routes/deps.py
 from fastapi import Request, HTTPException
-from app.services.auth_manager import AuthManager
+from app.services.auth_manager import AuthManager, AsyncAuthManager
 
-def get_current_user(request: Request):
+async def get_current_user(request: Request):
     session_id = request.cookies.get("session_id")
-    user = AuthManager.get_user_by_session(session_id)
+    # 캐시 적중 시 스레드 풀을 거치지 않음 (미스일 때만 DB 조회를 스레드로 넘김)
+    user = AuthManager.get_cached_user(session_id)
+    if user is None:
+        user = await AsyncAuthManager.get_user_by_session(session_id)
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     return user
\ No newline at end of file
@@ -1,14 +1,15 @@
 # app/routes/doc_routes.py
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Body
 from typing import Optional
-from fastapi.responses import FileResponse
-from app.services.doc_manager import DocManager
-from app.services.job_manager import JobManager
-from app.services.auth_manager import AuthManager
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from urllib.parse import quote
+from app.services.doc_manager import AsyncDocManager
+from app.services.job_manager import AsyncJobManager
+from app.services.aio import run_blocking
+from app.services.upload_store import UploadStore, UploadTooLarge
 from app.core.config import settings
-from app.db import docs_col
 from app.routes.deps import get_current_user
-import shutil
 import os
 
 router = APIRouter()
@@ -17,7 +18,7 @@ router = APIRouter()
 @router.get("/docs/folders")
 async def get_folders(user: str = Depends(get_current_user)):
     try:
-        folders = list(docs_col.find({"owner": user, "type": "folder"}, {"_id": 0}))
+        folders = await AsyncDocManager.get_folders(user)
         return folders
     except Exception as e:
         print(f"[Error] get_folders: {e}")
@@ -29,7 +30,7 @@ async def rename_node(
     new_name: str = Body(...),
     user: str = Depends(get_current_user)
 ):
-    success = DocManager.rename_node(user, node_id, new_name)
+    success = await AsyncDocManager.rename_node(user, node_id, new_name)
     if not success:
         raise HTTPException(status_code=400, detail="이름 변경 실패 (권한이 없거나 유효하지 않은 이름)")
     
@@ -45,7 +46,7 @@ async def move_node(
     if target_parent_id == "root":
         target_parent_id = None
 
-    success = DocManager.move_node(user, node_id, target_parent_id)
+    success = await AsyncDocManager.move_node(user, node_id, target_parent_id)
     
     if not success:
         raise HTTPException(status_code=400, detail="이동 실패 (권한 없음 또는 순환 참조)")
@@ -57,7 +58,7 @@ async def move_node(
 async def get_nodes(parent_id: str = None, user: str = Depends(get_current_user)):
     if parent_id == "root":
         parent_id = None
-    return DocManager.get_nodes(user, parent_id)
+    return await AsyncDocManager.get_nodes(user, parent_id)
 
 @router.post("/docs/folder")
 async def create_folder(
@@ -66,7 +67,7 @@ async def create_folder(
     user: str = Depends(get_current_user)
 ):
     if parent_id == "root": parent_id = None
-    return DocManager.create_folder(user, name, parent_id)
+    return await AsyncDocManager.create_folder(user, name, parent_id)
 
 @router.post("/docs/upload")
 async def upload_doc(
@@ -76,58 +77,54 @@ async def upload_doc(
 ):
     if parent_id == "root": parent_id = None
     
-    temp_path = os.path.join(settings.UPLOAD_DIR, f"temp_{file.filename}")
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
+    # 업로드마다 별도 임시 폴더에 스트리밍 저장 (같은 파일명 동시 업로드 충돌 방지)
+    temp_path = UploadStore.temp_upload_path(file.filename)
     try:
-        new_doc = DocManager.upload_zip_doc(user, temp_path, file.filename, parent_id)
+        await run_blocking(UploadStore.save_stream, file.file, temp_path, settings.MAX_DOC_UPLOAD_MB * 1024 * 1024)
+        new_doc = await AsyncDocManager.upload_zip_doc(user, temp_path, file.filename, parent_id)
         return new_doc
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        await run_blocking(UploadStore.remove_temp, temp_path)
 
 @router.delete("/docs/{node_id}")
 async def delete_node(node_id: str, user: str = Depends(get_current_user)):
-    success = DocManager.delete_node(user, node_id)
+    success = await AsyncDocManager.delete_node(user, node_id)
     if not success:
         raise HTTPException(status_code=404, detail="Node not found")
     return {"status": "deleted"}
 
 @router.get("/docs/content/{doc_id}")
 async def get_content(doc_id: str, user: str = Depends(get_current_user)):
-    content = DocManager.get_markdown_content(user, doc_id)
+    content = await AsyncDocManager.get_markdown_content(user, doc_id)
     if content is None:
         raise HTTPException(status_code=404, detail="Content not found")
     return {"content": content}
 
 @router.get("/docs/download/{doc_id}")
 async def download_doc(doc_id: str, user: str = Depends(get_current_user)):
-    # 1. 파일 압축 및 경로 가져오기
-    zip_path = DocManager.get_zip_path(user, doc_id)
+    # 임시 zip 파일을 만들지 않고 문서 폴더를 바로 압축하며 전송
+    result = await AsyncDocManager.get_zip_stream(user, doc_id)
     
-    if not zip_path or not os.path.exists(zip_path):
+    if not result:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # [수정된 부분] load_data() 대신 DB(docs_col)에서 직접 파일명 조회
-    target = docs_col.find_one({"id": doc_id, "owner": user})
-    
+    name, stream = result
     # 다운로드될 파일명 설정 (예: 강의자료.zip)
-    display_name = f"{target['name']}.zip" if target else "document.zip"
+    display_name = f"{name}.zip"
     
-    return FileResponse(
-        zip_path, 
-        media_type='application/zip', 
-        filename=display_name
+    return StreamingResponse(
+        iterate_in_threadpool(stream),
+        media_type='application/zip',
+        headers={"Content-Disposition": f"attachment; filename*=utf-8''{quote(display_name)}"}
     )
 
 @router.get("/docs/history") 
-def get_job_history(user: str = Depends(get_current_user)):
-    jobs = JobManager.get_jobs_by_user(user)
-    completed_jobs = [j for j in jobs if j["status"] == "completed"]
-    return completed_jobs
+async def get_job_history(user: str = Depends(get_current_user)):
+    return await AsyncJobManager.get_completed_jobs(user)
 
 @router.post("/docs/import/{job_id}")
 async def import_job_to_docs(
@@ -137,7 +134,7 @@ async def import_job_to_docs(
     user: str = Depends(get_current_user)
 ):
     # 1. 작업(Job) 확인 (본인 작업인지 체크)
-    job = JobManager.get_job(job_id)
+    job = await AsyncJobManager.get_job(job_id)
     if not job or job["owner"] != user:
         raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
     
@@ -159,9 +156,11 @@ async def import_job_to_docs(
             final_parent_id = None if parent_id == "root" else parent_id
 
         # 문서 생성 (결정된 final_owner 이름으로 DB 저장)
-        new_doc = DocManager.upload_zip_doc(
+        # 같은 작업을 이미 가져온 문서가 있으면 blob 참조만 추가 (메타데이터만 생성)
+        new_doc = await AsyncDocManager.import_job_doc(
             owner=final_owner,
-            file_path=zip_path,
+            job_id=job_id,
+            zip_path=zip_path,
             filename=job["filename"], 
             parent_id=final_parent_id
         )
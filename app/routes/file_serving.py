@@ -0,0 +1,91 @@
+# app/routes/file_serving.py
+
+import os
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+CHUNK_SIZE = 1024 * 1024
+
+def _etag(st) -> str:
+    # 다시 생성되면 os.replace로 새 파일(inode)이 되므로 inode + 크기로 충분
+    return f'"{st.st_ino:x}-{st.st_size:x}"'
+
+def _parse_range(header: str, size: int):
+    """'bytes=start-end' 단일 구간만 지원, 해석할 수 없으면 None (전체 응답)"""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[6:].strip().partition("-")
+    try:
+        if start_s == "":
+            # 마지막 N 바이트
+            length = int(end_s)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+def _iter_file(f, start: int, length: int):
+    with f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def serve_file(request: Request, path: str, media_type: str, filename: str):
+    """
+    ETag(If-None-Match → 304)와 Range(206) 요청을 지원하는 파일 응답
+    파일을 먼저 열어두므로 응답 도중 삭제되어도 끝까지 전송됩니다. (열기 전에 삭제되었으면 FileNotFoundError)
+    """
+    f = open(path, "rb")
+    try:
+        response = _file_response(request, f, media_type, filename)
+    except BaseException:
+        f.close()
+        raise
+    if not isinstance(response, StreamingResponse):
+        f.close()
+    return response
+
+def _file_response(request: Request, f, media_type: str, filename: str):
+    st = os.fstat(f.fileno())
+    size = st.st_size
+    etag = _etag(st)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    # If-Range가 현재 ETag와 다르면 (파일이 바뀜) 전체를 다시 보냄
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range == etag:
+        byte_range = _parse_range(request.headers.get("range"), size)
+        if request.headers.get("range") and byte_range is not None and byte_range[0] >= size:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+
+    return StreamingResponse(_iter_file(f, start, length), status_code=status, media_type=media_type, headers=headers)
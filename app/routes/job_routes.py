@@ -1,55 +1,272 @@
 # app/routes/job_routes.py
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Depends
-from app.services.job_manager import JobManager
+from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.services.job_manager import JobManager, AsyncJobManager
+from app.services.auth_manager import AsyncAuthManager
+from app.services.aio import run_blocking
+from app.services.job_events import job_events
+from app.services.artifacts import ARTIFACTS, declared_artifacts, ensure_artifact
+from app.services.upload_store import UploadStore, UploadTooLarge, UploadConflict
 from app.services.processor import process_file_task
 from app.services.audio_processor import process_audio_task
 from app.core.config import settings
 from app.routes.deps import get_current_user
-import shutil
+from app.routes.file_serving import serve_file
+from pydantic import BaseModel
+import asyncio
+from typing import Optional
+from datetime import datetime
+import json
+import uuid
 import os
 
 router = APIRouter()
 
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.flac']
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    size: int
+
+async def _start_job(background_tasks: BackgroundTasks, user: str, job_id: str, filename: str,
+                     file_path: str, file_hash: str, file_size: int):
+    # 확장자 확인 및 분기 처리
+    ext = os.path.splitext(filename)[1].lower()
+    kind = "audio" if ext in AUDIO_EXTENSIONS else "slide"
+    
+    snapshot = await AsyncAuthManager.get_settings_snapshot(user)
+    result_key = JobManager.make_result_key(file_hash, kind, snapshot)
+
+    # 같은 파일 + 같은 설정으로 완료된 작업이 있으면 결과를 재사용하고 업로드 원본은 버림
+    source = await AsyncJobManager.find_reusable_job(result_key, user)
+    if source:
+        await run_blocking(UploadStore.remove_temp, file_path)
+        return await AsyncJobManager.create_reused_job(
+            source, filename, user, kind=kind, settings_snapshot=snapshot,
+            file_hash=file_hash, file_size=file_size, result_key=result_key
+        )
+
+    # 작업 생성
+    await AsyncJobManager.create_job(
+        filename, user, file_path=file_path, kind=kind, settings_snapshot=snapshot,
+        job_id=job_id, file_hash=file_hash, file_size=file_size, result_key=result_key
+    )
+    
+    # worker 모드에서는 worker.py가 DB 대기열에서 가져가 처리
+    if settings.JOB_EXECUTION_MODE != "worker":
+        if kind == "audio":
+            background_tasks.add_task(process_audio_task, job_id, file_path)
+        else:
+            background_tasks.add_task(process_file_task, job_id, file_path)
+    return job_id
+
 @router.post("/upload")
 async def upload_file(
     background_tasks: BackgroundTasks, 
     file: UploadFile = File(...), 
     user: str = Depends(get_current_user)
 ):
-    # 파일 저장
-    file_path = os.path.join(settings.UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # 작업 생성
-    job_id = JobManager.create_job(file.filename, user)
-    
-    # 확장자 확인 및 분기 처리
-    ext = os.path.splitext(file.filename)[1].lower()
-    
-    if ext in ['.mp3', '.wav', '.m4a', '.flac']:
-        background_tasks.add_task(process_audio_task, job_id, file_path)
-    else:
-        background_tasks.add_task(process_file_task, job_id, file_path)
+    # 작업 전용 폴더에 스트리밍 저장 (같은 파일명 동시 업로드 충돌 방지, 해시 동시 계산)
+    job_id = str(uuid.uuid4())
+    file_path = UploadStore.job_upload_path(job_id, file.filename)
+    try:
+        file_hash, file_size = await run_blocking(
+            UploadStore.save_stream, file.file, file_path, settings.MAX_UPLOAD_MB * 1024 * 1024
+        )
+    except UploadTooLarge as e:
+        await run_blocking(UploadStore.remove_temp, file_path)
+        raise HTTPException(status_code=413, detail=str(e))
     
+    job_id = await _start_job(background_tasks, user, job_id, file.filename, file_path, file_hash, file_size)
     return {"job_id": job_id, "message": "Upload successful"}
 
+# --- 재개 가능한 분할 업로드 ---
+# 1) POST /uploads {filename, size}         -> upload_id, part_size
+# 2) PUT /uploads/{id}?offset=N (raw body)  -> 받은 위치(received) 반환, 끊기면 GET으로 위치 확인 후 이어서 전송
+# 3) POST /uploads/{id}/complete            -> 작업 생성
+
+@router.post("/uploads")
+async def create_upload(req: UploadInitRequest, user: str = Depends(get_current_user)):
+    try:
+        return await run_blocking(
+            UploadStore.create_session, user, req.filename, req.size, settings.MAX_UPLOAD_MB * 1024 * 1024
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str, user: str = Depends(get_current_user)):
+    session = await run_blocking(UploadStore.get_session, user, upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+@router.put("/uploads/{upload_id}")
+async def upload_part(upload_id: str, offset: int, request: Request, user: str = Depends(get_current_user)):
+    part_max = settings.UPLOAD_PART_MAX_MB * 1024 * 1024
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > part_max:
+        raise HTTPException(status_code=413, detail=f"조각 크기 제한({settings.UPLOAD_PART_MAX_MB}MB)을 초과했습니다.")
+
+    data = bytearray()
+    async for piece in request.stream():
+        data.extend(piece)
+        if len(data) > part_max:
+            raise HTTPException(status_code=413, detail=f"조각 크기 제한({settings.UPLOAD_PART_MAX_MB}MB)을 초과했습니다.")
+
+    try:
+        session = await run_blocking(UploadStore.write_part, user, upload_id, offset, bytes(data))
+    except UploadConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, background_tasks: BackgroundTasks, user: str = Depends(get_current_user)):
+    session = await run_blocking(UploadStore.get_session, user, upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    job_id = str(uuid.uuid4())
+    file_path = UploadStore.job_upload_path(job_id, session["filename"])
+    try:
+        result = await run_blocking(UploadStore.complete_session, user, upload_id, file_path)
+    except UploadConflict as e:
+        await run_blocking(UploadStore.remove_temp, file_path)
+        raise HTTPException(status_code=409, detail=str(e))
+    if not result:
+        await run_blocking(UploadStore.remove_temp, file_path)
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    file_hash, file_size = result
+    job_id = await _start_job(background_tasks, user, job_id, session["filename"], file_path, file_hash, file_size)
+    return {"job_id": job_id, "message": "Upload successful"}
+
+@router.delete("/uploads/{upload_id}")
+async def discard_upload(upload_id: str, user: str = Depends(get_current_user)):
+    if not await run_blocking(UploadStore.discard_session, user, upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": "Upload discarded"}
+
 @router.get("/jobs")
-async def get_my_jobs(user: str = Depends(get_current_user)):
-    return JobManager.get_jobs_by_user(user)
+async def get_my_jobs(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    include_logs: bool = False,
+    user: str = Depends(get_current_user)
+):
+    since_dt = None
+    if since:
+        try:
+            since_dt = datetime.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid since timestamp")
+
+    try:
+        return await AsyncJobManager.list_jobs(user, limit, cursor, since_dt, include_logs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/{job_id}/logs")
+async def get_job_logs(job_id: str, start: int = 0, limit: int = 200, user: str = Depends(get_current_user)):
+    result = await AsyncJobManager.get_job_logs(job_id, user, start, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job not found or permission denied")
+    return result
+
+@router.get("/jobs/stream")
+async def stream_my_jobs(request: Request, user: str = Depends(get_current_user)):
+    """
+    Server-Sent Events: 사용자의 작업 변경분(status, progress, new_logs)만 push
+    (created / deleted / resync 이벤트를 받으면 클라이언트가 /api/jobs로 전체 목록을 다시 조회)
+    """
+    sub = job_events.subscribe(user)
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            job_events.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}/artifacts/{name}")
+async def download_artifact(job_id: str, name: str, request: Request, user: str = Depends(get_current_user)):
+    job = await AsyncJobManager.get_job(job_id)
+    if not job or job.get("owner") != user:
+        raise HTTPException(status_code=404, detail="Job not found or permission denied")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=400, detail="완료된 작업만 다운로드할 수 있습니다.")
+
+    # 이전 작업은 artifacts 필드가 없으므로 종류 기준 기본 목록 사용
+    if name not in (job.get("artifacts") or declared_artifacts(job.get("kind"))):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    base_name = os.path.splitext(job["filename"])[0]
+    ext = os.path.splitext(name)[1]
+    # 생성형 결과물(PDF 보고서 등)은 첫 요청 때 생성 후 캐시
+    # 경로를 받은 뒤 파일을 열기 전에 캐시 정리로 삭제되었으면 한 번 다시 생성
+    for attempt in range(2):
+        path = await run_blocking(ensure_artifact, job_id, name)
+        if not path:
+            raise HTTPException(status_code=404, detail="Result not found")
+        try:
+            return serve_file(request, path, ARTIFACTS[name].media_type, f"{base_name}{ext}")
+        except FileNotFoundError:
+            if attempt:
+                raise HTTPException(status_code=404, detail="Result not found")
 
 @router.get("/status/{job_id}")
 async def get_status(job_id: str, user: str = Depends(get_current_user)):
-    job = JobManager.get_job(job_id)
+    job = await AsyncJobManager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404)
     if job.get("owner") != user:
          raise HTTPException(status_code=403, detail="Not your job")
     return job
 
+@router.post("/jobs/{job_id}/resume")
+async def resume_job(job_id: str, background_tasks: BackgroundTasks, user: str = Depends(get_current_user)):
+    job = await AsyncJobManager.get_job(job_id)
+    if not job or job.get("owner") != user:
+        raise HTTPException(status_code=404, detail="Job not found or permission denied")
+    if job["status"] != "failed":
+        raise HTTPException(status_code=400, detail="실패한 작업만 재개할 수 있습니다.")
+
+    file_path = job.get("file_path")
+    if not file_path or not os.path.exists(file_path):
+        raise HTTPException(status_code=400, detail="원본 파일이 남아있지 않아 재개할 수 없습니다.")
+
+    # 동시에 들어온 재개 요청은 하나만 통과 (나머지는 작업을 중복 실행하지 않도록 거절)
+    if not await AsyncJobManager.requeue_job(job_id):
+        raise HTTPException(status_code=409, detail="이미 재개되었거나 실패 상태가 아닌 작업입니다.")
+    if settings.JOB_EXECUTION_MODE != "worker":
+        if job.get("kind") == "audio":
+            background_tasks.add_task(process_audio_task, job_id, file_path)
+        else:
+            background_tasks.add_task(process_file_task, job_id, file_path)
+    return {"job_id": job_id, "message": "Job resumed"}
+
 @router.delete("/jobs/{job_id}")
 async def delete_job(job_id: str, user: str = Depends(get_current_user)):
-    success = JobManager.delete_job(job_id, user)
+    success = await AsyncJobManager.delete_job(job_id, user)
     if not success:
         raise HTTPException(status_code=404, detail="Job not found or permission denied")
     return {"message": "Job deleted"}
\ No newline at end of file
@@ -2,7 +2,8 @@
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from typing import Optional, Any
 from pydantic import BaseModel
-from app.services.auth_manager import AuthManager
+from app.services.auth_manager import AsyncAuthManager
+from app.services.aio import run_blocking
 from app.routes.deps import get_current_user
 from app.db.prompt import default_system_prompt, default_user_prompt
 import shutil
@@ -10,6 +11,10 @@ import os
 
 router = APIRouter()
 
+def _save_upload(src, file_path: str):
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(src, buffer)
+
 class ModelUpdateRequest(BaseModel):
     preferred_model: str
 
@@ -37,11 +42,10 @@ async def save_settings(
         ext = os.path.splitext(profile_img.filename)[1]
         file_path = os.path.join(profile_dir, f"{user}{ext}")
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(profile_img.file, buffer)
+        await run_blocking(_save_upload, profile_img.file, file_path)
         profile_url = f"/{file_path}"
 
-    success = AuthManager.update_user_settings(
+    success = await AsyncAuthManager.update_user_settings(
         user, api_key, model, audio_lang, int_audio_model, custom_prompt, custom_user_prompt, profile_url
     )
     
@@ -52,7 +56,7 @@ async def save_settings(
 
 @router.get("/settings/usage")
 async def get_usage_info(user: str = Depends(get_current_user)):
-    total_usd = AuthManager.get_user_usage(user)
+    total_usd = await AsyncAuthManager.get_user_usage(user)
     return {"total_spent_usd": round(total_usd, 4)}
 
 @router.get("/settings/default_prompts")
@@ -73,12 +77,9 @@ async def upload_profile_image(
     file_path = f"static/profiles/{user}{ext}"
     profile_url = f"/{file_path}"
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    await run_blocking(_save_upload, file.file, file_path)
 
-    # DB 직접 접근 대신 AuthManager 등을 사용하는 것이 좋으나 기존 로직 유지
-    from app.db import users_col
-    users_col.update_one({"username": user}, {"$set": {"profile_img": profile_url}})
+    await AsyncAuthManager.update_profile_image(user, profile_url)
 
     return {"status": "success", "url": profile_url}
 
@@ -88,7 +89,7 @@ async def update_model_setting(
     user: str = Depends(get_current_user)
 ):
     if req.preferred_model != "local":
-        current_settings = AuthManager.get_user_settings(user)
+        current_settings = await AsyncAuthManager.get_user_settings(user)
         api_key = current_settings.get("openai_api_key")
         
         if not api_key or not api_key.strip():
@@ -97,7 +98,7 @@ async def update_model_setting(
                 detail="OpenAI API Key가 설정되지 않았습니다. 설정 메뉴에서 먼저 키를 등록해주세요."
             )
 
-    success = AuthManager.update_preferred_model(user, req.preferred_model)
+    success = await AsyncAuthManager.update_preferred_model(user, req.preferred_model)
     
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
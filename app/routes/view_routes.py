@@ -2,26 +2,36 @@
 from fastapi import APIRouter, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
-from app.services.auth_manager import AuthManager
+from app.core.config import settings
+from app.services.auth_manager import AuthManager, AsyncAuthManager
 import os
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+async def _session_user(request: Request):
+    session_id = request.cookies.get("session_id")
+    # 캐시 적중 시 스레드 풀을 거치지 않음 (미스일 때만 DB 조회를 스레드로 넘김)
+    user = AuthManager.get_cached_user(session_id)
+    if user is None:
+        user = await AsyncAuthManager.get_user_by_session(session_id)
+    return user
+
 @router.get("/")
 async def index(request: Request):
-    session_id = request.cookies.get("session_id")
-    user = AuthManager.get_user_by_session(session_id)
+    user = await _session_user(request)
     
     if not user:
         return RedirectResponse(url="/login")
 
-    user_settings = AuthManager.get_user_settings(user)
+    user_settings = await AsyncAuthManager.get_user_settings(user)
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request, 
         "username": user,
-        "settings": user_settings  
+        "settings": user_settings,
+        # 서버가 작업마다 보관하는 최대 로그 수 (대시보드의 log_count도 이 값을 넘지 않음)
+        "job_log_cap": settings.JOB_LOG_CAP
     })
 
 @router.get("/login")
@@ -35,19 +45,18 @@ async def signup_page(request: Request):
 @router.get("/logout")
 async def logout(request: Request):
     session_id = request.cookies.get("session_id")
-    AuthManager.logout(session_id)
+    await AsyncAuthManager.logout(session_id)
     response = RedirectResponse(url="/login", status_code=302)
     response.delete_cookie("session_id")
     return response
 
 @router.get("/settings")
 async def settings_page(request: Request):
-    session_id = request.cookies.get("session_id")
-    user = AuthManager.get_user_by_session(session_id)
+    user = await _session_user(request)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user_settings = AuthManager.get_user_settings(user)
+    user_settings = await AsyncAuthManager.get_user_settings(user)
     
     return templates.TemplateResponse("settings.html", {
         "request": request, 
@@ -58,8 +67,7 @@ async def settings_page(request: Request):
 # 기존 docs.py의 뷰 라우트
 @router.get("/viewer")
 async def viewer_page(request: Request):
-    session_id = request.cookies.get("session_id")
-    user = AuthManager.get_user_by_session(session_id)
+    user = await _session_user(request)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
     
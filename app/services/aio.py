@@ -0,0 +1,49 @@
+# app/services/aio.py
+
+import inspect
+import functools
+import anyio
+from anyio import to_thread
+from app.core.config import settings
+
+# 블로킹 I/O(pymongo, 파일 시스템) 전용 스레드 수 제한
+# (FastAPI 기본 스레드 풀과 분리하여 sync 의존성 처리와 경쟁하지 않도록)
+_limiter = None
+
+def _get_limiter():
+    global _limiter
+    if _limiter is None:
+        # CapacityLimiter는 이벤트 루프 안에서 생성해야 하므로 첫 호출 시 생성
+        _limiter = anyio.CapacityLimiter(settings.BLOCKING_IO_THREADS)
+    return _limiter
+
+async def run_blocking(func, *args, **kwargs):
+    """동기 함수를 전용 스레드 풀에서 실행하고 결과를 await"""
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_get_limiter())
+
+class AsyncFacade:
+    """
+    정적 메서드로 구성된 Manager 클래스의 async 버전
+    AsyncJobManager.get_job(job_id) 처럼 같은 이름으로 await 하여 사용합니다.
+    (이미 async인 메서드는 그대로 반환)
+    """
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._wrappers = {}
+
+    def __getattr__(self, name):
+        wrapper = self._wrappers.get(name)
+        if wrapper is not None:
+            return wrapper
+
+        attr = getattr(self._manager, name)
+        if not callable(attr) or inspect.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await run_blocking(attr, *args, **kwargs)
+
+        self._wrappers[name] = wrapper
+        return wrapper
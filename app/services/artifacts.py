@@ -0,0 +1,150 @@
+# app/services/artifacts.py
+
+import os
+import time
+import shutil
+import zipfile
+import tempfile
+import threading
+from app.core.config import settings
+from app.services.report_renderer import render_report_pdf
+
+class Artifact:
+    """
+    작업 결과물 선언
+    - stored: 작업 중 생성되는 결과 zip (원본 저장소이므로 제거 대상 아님)
+    - generated: 첫 요청 시 결과 zip에서 생성하여 ARTIFACT_CACHE_DIR에 캐시 (용량 초과 시 오래된 것부터 제거)
+    """
+
+    def __init__(self, name: str, media_type: str, kinds, build=None):
+        self.name = name
+        self.media_type = media_type
+        self.kinds = kinds
+        self.build = build  # (job_id, zip_path) -> bytes | None
+
+    @property
+    def generated(self) -> bool:
+        return self.build is not None
+
+def _build_report(job_id: str, zip_path: str):
+    with zipfile.ZipFile(zip_path) as zf:
+        names = set(zf.namelist())
+        if "result.pdf" in names:
+            # REPORT_PDF_MODE=eager 로 만든 작업
+            return zf.read("result.pdf")
+        if "result.md" not in names:
+            return None
+        work_dir = tempfile.mkdtemp(prefix=f"report_{job_id}_")
+        try:
+            zf.extractall(work_dir, [n for n in names if n.startswith("images/")])
+            md_content = zf.read("result.md").decode("utf-8")
+            return render_report_pdf(md_content, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+ARTIFACTS = {
+    "result.zip": Artifact("result.zip", "application/zip", ("slide", "audio")),
+    "report.pdf": Artifact("report.pdf", "application/pdf", ("slide",), build=_build_report),
+}
+
+def declared_artifacts(kind: str):
+    """작업 생성 시 job 문서에 기록할 결과물 목록"""
+    return [name for name, artifact in ARTIFACTS.items() if (kind or "slide") in artifact.kinds]
+
+def artifact_url(job_id: str, name: str) -> str:
+    return f"/api/jobs/{job_id}/artifacts/{name}"
+
+def stored_zip_path(job_id: str) -> str:
+    return os.path.join(settings.RESULT_DIR, f"{job_id}.zip")
+
+def _cache_path(job_id: str, name: str) -> str:
+    return os.path.join(settings.ARTIFACT_CACHE_DIR, f"{job_id}_{name}")
+
+# ensure_artifact가 경로를 반환한 뒤 응답을 시작하기까지의 여유 (이 시간 안에 조회된 결과물은 제거하지 않음)
+EVICT_GRACE_SECONDS = 60
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+
+def ensure_artifact(job_id: str, name: str):
+    """결과물 경로 반환 (생성형은 없으면 만들고, 같은 결과물의 동시 요청은 한 번만 생성)"""
+    artifact = ARTIFACTS.get(name)
+    zip_path = stored_zip_path(job_id)
+    if artifact is None or not os.path.exists(zip_path):
+        return None
+    if not artifact.generated:
+        return zip_path
+
+    path = _cache_path(job_id, name)
+    if os.path.exists(path):
+        _touch(path)
+        return path
+
+    key = (job_id, name)
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            if os.path.exists(path):
+                return path
+            data = artifact.build(job_id, zip_path)
+            if data is None:
+                return None
+            os.makedirs(settings.ARTIFACT_CACHE_DIR, exist_ok=True)
+            tmp_path = path + ".part"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+    finally:
+        with _build_locks_guard:
+            _build_locks.pop(key, None)
+
+    evict_generated(keep=(path,))
+    return path
+
+def _touch(path: str):
+    # 최근 사용 시각 갱신 (atime은 noatime 마운트에서 갱신되지 않으므로 mtime 사용)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def evict_generated(max_bytes: int = None, keep=()):
+    """
+    생성형 결과물 캐시가 ARTIFACT_CACHE_MAX_MB를 넘으면 가장 오래 사용되지 않은 것부터 삭제
+    keep(방금 만든 결과물)과 최근 EVICT_GRACE_SECONDS 안에 조회된 결과물은 다른 요청이 응답 중일 수 있으므로 남김
+    """
+    max_bytes = settings.ARTIFACT_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    cache_dir = settings.ARTIFACT_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    keep = {os.path.abspath(p) for p in keep}
+    recent = time.time() - EVICT_GRACE_SECONDS
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and not entry.name.endswith(".part"):
+            st = entry.stat()
+            total += st.st_size
+            if st.st_mtime < recent and os.path.abspath(entry.path) not in keep:
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def remove_job_artifacts(job_id: str):
+    for name, artifact in ARTIFACTS.items():
+        if artifact.generated:
+            path = _cache_path(job_id, name)
+            if os.path.exists(path):
+                os.remove(path)
@@ -3,27 +3,30 @@
 import os
 import json
 import requests
-import shutil
-import threading
 from app.core.config import settings
-from app.services.job_manager import JobManager
+from app.services.job_manager import JobManager, LeaseLost
 from app.services.auth_manager import AuthManager
+from app.services.scheduler import audio_scheduler
+from app.services.result_packager import ResultPackager
+from app.services.upload_store import UploadStore
 
-audio_lock = threading.Lock()
-
-def process_audio_task(job_id: str, file_path: str):
+def process_audio_task(job_id: str, file_path: str, lease_owner: str = None, cancel=None):
     # 1. 사용자 설정 로드
     job = JobManager.get_job(job_id)
     if not job:
         return
     
     owner = job.get("owner")
-    user_settings = AuthManager.get_user_settings(owner)
+    # 업로드 시점에 저장한 설정 스냅샷 사용 (실행 시점에 설정을 다시 읽지 않음)
+    user_settings = AuthManager.resolve_job_settings(owner, job.get("settings_snapshot"))
     
     # 설정값 가져오기
     language = user_settings.get("audio_language", "auto")
     model_level = user_settings.get("audio_model_level", 2)
     
+    # 오디오 서버는 한 번에 하나씩, 사용자 간 공정하게 처리
+    audio_scheduler.register(job_id, owner, 1)
+
     # 대기열 로깅
     try:
         queue_pos = JobManager.get_queue_position(job_id)
@@ -33,7 +36,7 @@ def process_audio_task(job_id: str, file_path: str):
             JobManager.update_progress(job_id, 0, 0, "오디오 변환 준비 중...")
     except: pass
 
-    with audio_lock:
+    with audio_scheduler.slot(job_id):
         try:
             JobManager.start_processing(job_id)
             JobManager.update_progress(job_id, 0, 0, "오디오 서버로 전송 시작...")
@@ -75,36 +78,32 @@ def process_audio_task(job_id: str, file_path: str):
 
             result = response.json()
             
-            # 결과 처리
-            result_base = os.path.join(settings.RESULT_DIR, job_id)
-            os.makedirs(result_base, exist_ok=True)
-            
-            base_name = os.path.splitext(fname)[0]
-            
-            # 텍스트 파일 저장 (일반 텍스트)
-            txt_path = os.path.join(result_base, f"{base_name}.txt")
-            with open(txt_path, "w", encoding="utf-8") as f:
-                f.write(result.get("text", ""))
-
-            # 타임스탬프 파일 저장
-            time_path = os.path.join(result_base, f"{base_name}_timestamps.txt")
-            with open(time_path, "w", encoding="utf-8") as f:
-                f.write(result.get("text_with_time", ""))
-
-            # 압축
+            # 결과 처리 (중간 폴더 없이 zip에 바로 기록)
             JobManager.update_progress(job_id, 90, 100, "결과물 압축 중...")
-            shutil.make_archive(os.path.join(settings.RESULT_DIR, job_id), 'zip', result_base)
+            base_name = os.path.splitext(fname)[0]
+            packager = ResultPackager(job_id, lease_owner)
+            try:
+                # 텍스트 파일 (일반 텍스트)
+                packager.add_bytes(f"{base_name}.txt", result.get("text", ""))
+                # 타임스탬프 파일
+                packager.add_bytes(f"{base_name}_timestamps.txt", result.get("text_with_time", ""))
+                # 결과 zip 교체 직전에 임대 확인 (다른 워커가 가져간 작업의 결과를 덮어쓰지 않음)
+                JobManager.check_lease(job_id, lease_owner, cancel)
+                result_url = packager.finish()
+            except Exception:
+                packager.abort()
+                raise
             
-            JobManager.mark_completed(job_id, f"/static/results/{job_id}.zip")
+            if not JobManager.mark_completed(job_id, result_url, lease_owner):
+                raise LeaseLost(job_id)
+            # 원본 파일 삭제 (실패한 작업은 재개를 위해 작업 삭제 시까지 보존)
+            UploadStore.remove_job_upload(job_id, file_path)
 
+        except LeaseLost:
+            # 다른 워커가 이어서 처리하므로 상태/파일은 건드리지 않음
+            print(f"[Worker] job {job_id}: 임대를 잃어 처리를 중단합니다.")
         except Exception as e:
             print(f"[AUDIO ERROR] {e}")
-            JobManager.mark_failed(job_id, str(e))
+            JobManager.mark_failed(job_id, str(e), lease_owner)
         finally:
-            # 원본 임시 파일 삭제
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            # 결과 폴더(압축 전) 삭제
-            result_dir = os.path.join(settings.RESULT_DIR, job_id)
-            if os.path.exists(result_dir):
-                shutil.rmtree(result_dir)
\ No newline at end of file
+            audio_scheduler.unregister(job_id)
\ No newline at end of file
@@ -1,27 +1,30 @@
 # app/services/auth_manager.py
 
 import uuid
-import hashlib
-import bcrypt
 import random
+import threading
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.password_hasher import password_hasher, PasswordPoolBusy
 from app.services.email_service import send_verification_email
 from app.db import users_col, sessions_col
 from app.db.prompt import default_system_prompt, default_user_prompt
+from app.services.aio import AsyncFacade, run_blocking
 
 # 이메일 인증 코드는 임시 데이터이므로 메모리에 유지 (서버 재시작 시 초기화됨)
 # 운영 환경에서는 Redis나 MongoDB TTL Collection 사용을 권장
 verification_codes = {}
 
+# session_id -> (username, 세션 문서 _id) 캐시 (매 요청마다 DB 조회하지 않도록)
+session_cache = TTLCache(settings.SESSION_CACHE_SIZE, settings.SESSION_CACHE_TTL_SECONDS)
+
+# username -> 사용자 설정 캐시 (설정 변경 시 즉시 무효화)
+settings_cache = TTLCache(settings.SETTINGS_CACHE_SIZE, settings.SETTINGS_CACHE_TTL_SECONDS)
+
 class AuthManager:
     
-    @staticmethod
-    def _pre_hash(password: str) -> bytes:
-        """
-        bcrypt의 72바이트 제한을 우회하기 위해 
-        SHA-256으로 먼저 해싱하여 64글자(bytes)로 고정합니다.
-        """
-        return hashlib.sha256(password.encode('utf-8')).hexdigest().encode('utf-8')
-
     @staticmethod
     def request_signup(username, password, email):
         # 1. 사용자명 중복 체크 (MongoDB)
@@ -48,21 +51,28 @@ class AuthManager:
             return "mail_failed"
 
     @staticmethod
-    def verify_and_create_user(email, code):
-        data = verification_codes.get(email)
+    async def verify_and_create_user(email, code):
+        # await 이전에 코드를 꺼내서, 같은 코드로 동시에 들어온 요청 중 하나만 계정 생성으로 진행
+        data = verification_codes.pop(email, None)
         if not data:
             return False # 요청 내역 없음
         
         if data["code"] != code:
-            return False # 코드 불일치
+            # 코드 불일치: 그 사이 새 코드가 발급되지 않았으면 다시 입력할 수 있도록 되돌림
+            verification_codes.setdefault(email, data)
+            return False
         
         # 검증 완료 -> 실제 계정 생성 준비
         username = data["username"]
         password = data["password"]
         
-        # 비밀번호 해싱
-        safe_pw = AuthManager._pre_hash(password)
-        hashed_pw = bcrypt.hashpw(safe_pw, bcrypt.gensalt()).decode('utf-8')
+        # 비밀번호 해싱 (전용 스레드 풀에서 실행)
+        try:
+            hashed_pw = await password_hasher.hash(password)
+        except PasswordPoolBusy:
+            # 재시도할 수 있도록 코드를 되돌림
+            verification_codes.setdefault(email, data)
+            raise
         
         # MongoDB에 저장할 문서 구조
         new_user = {
@@ -76,20 +86,19 @@ class AuthManager:
             "audio_model_level": 2
         }
         
-        # DB 저장
-        users_col.insert_one(new_user)
-        
-        # 임시 데이터 삭제
-        del verification_codes[email]
+        # DB 저장 (인증 요청 이후 같은 사용자명/이메일이 먼저 가입했으면 unique 인덱스가 거절)
+        try:
+            await run_blocking(users_col.insert_one, new_user)
+        except DuplicateKeyError:
+            return False
         return True
 
     @staticmethod
-    def create_user(username, password):
-        if users_col.find_one({"username": username}):
+    async def create_user(username, password):
+        if await run_blocking(users_col.find_one, {"username": username}):
             return False
         
-        safe_pw = AuthManager._pre_hash(password)
-        hashed_pw = bcrypt.hashpw(safe_pw, bcrypt.gensalt()).decode('utf-8')
+        hashed_pw = await password_hasher.hash(password)
         
         new_user = {
             "username": username,
@@ -102,44 +111,98 @@ class AuthManager:
             "audio_model_level": 2
         }
         
-        users_col.insert_one(new_user)
+        # 해싱하는 동안 같은 사용자명이 먼저 가입했으면 unique 인덱스가 거절 -> 이미 존재하는 경우와 동일하게 처리
+        try:
+            await run_blocking(users_col.insert_one, new_user)
+        except DuplicateKeyError:
+            return False
         return True
 
     @staticmethod
-    def authenticate_user(username, password):
+    async def authenticate_user(username, password):
         # DB에서 유저 조회
-        user = users_col.find_one({"username": username})
+        user = await run_blocking(users_col.find_one, {"username": username})
         if not user:
             return None
         
-        stored_hash = user["password"].encode('utf-8')
-        safe_pw = AuthManager._pre_hash(password)
+        stored_hash = user["password"]
         
-        # 비밀번호 검증
-        if bcrypt.checkpw(safe_pw, stored_hash):
+        # 비밀번호 검증 (전용 스레드 풀에서 실행, 이벤트 루프는 막지 않음)
+        if await password_hasher.verify(password, stored_hash):
+            # cost factor 설정이 바뀌었으면 로그인 성공 시 새 설정으로 재해싱
+            if password_hasher.needs_rehash(stored_hash):
+                try:
+                    new_hash = await password_hasher.hash(password)
+                    await run_blocking(
+                        users_col.update_one,
+                        {"username": username, "password": stored_hash},
+                        {"$set": {"password": new_hash}}
+                    )
+                except PasswordPoolBusy:
+                    pass  # 다음 로그인 때 다시 시도
+
             session_id = str(uuid.uuid4())
             
-            # 세션 DB에 저장
-            sessions_col.insert_one({
+            # 세션 DB에 저장 (created_at 기준 TTL 인덱스로 만료)
+            await run_blocking(sessions_col.insert_one, {
                 "session_id": session_id,
-                "username": username
+                "username": username,
+                "created_at": datetime.now()
             })
             return session_id
         return None
 
+    @staticmethod
+    def get_cached_user(session_id):
+        """세션 캐시만 확인 (DB 조회 없음, 이벤트 루프에서 바로 호출 가능)"""
+        if not session_id:
+            return None
+        cached = session_cache.get(session_id)
+        return cached[0] if cached is not None else None
+
     @staticmethod
     def get_user_by_session(session_id):
+        if not session_id:
+            return None
+
+        cached = session_cache.get(session_id)
+        if cached is not None:
+            return cached[0]
+
         # DB에서 세션 조회
         session = sessions_col.find_one({"session_id": session_id})
-        if session:
-            return session["username"]
-        return None
+        if not session:
+            return None
+
+        created_at = session.get("created_at")
+        if created_at is None:
+            # 만료 시각이 없던 기존 세션은 지금부터 유효기간 시작
+            created_at = datetime.now()
+            sessions_col.update_one({"_id": session["_id"]}, {"$set": {"created_at": created_at}})
+
+        # TTL 인덱스 삭제는 주기적으로 실행되므로 만료 여부를 직접 확인
+        remaining = (created_at + timedelta(seconds=settings.SESSION_MAX_AGE_SECONDS) - datetime.now()).total_seconds()
+        if remaining <= 0:
+            sessions_col.delete_one({"_id": session["_id"]})
+            return None
+
+        session_cache.set(session_id, (session["username"], str(session["_id"])), ttl=remaining)
+        return session["username"]
 
     @staticmethod
     def logout(session_id):
         # DB에서 세션 삭제
+        session_cache.invalidate(session_id)
         sessions_col.delete_one({"session_id": session_id})
 
+    @staticmethod
+    def get_password_pool_stats():
+        return password_hasher.stats()
+
+    @staticmethod
+    def get_session_cache_stats():
+        return session_cache.stats()
+
     @staticmethod
     def update_user_settings(username, api_key, model_choice, audio_lang="auto", audio_model=2, custom_prompt=None, custom_user_prompt=None, profile_url=None):
         update_data = {
@@ -158,34 +221,47 @@ class AuthManager:
         if profile_url:
             update_data["profile_img"] = profile_url
 
-        result = users_col.update_one(
-            {"username": username},
-            {"$set": update_data}
-        )
-        return result.matched_count > 0
+        return AuthManager._write_settings(username, update_data)
     
     @staticmethod
     def update_preferred_model(username, model_choice):
+        return AuthManager._write_settings(username, {"preferred_model": model_choice})
+
+    @staticmethod
+    def update_profile_image(username, profile_url):
+        return AuthManager._write_settings(username, {"profile_img": profile_url})
+
+    @staticmethod
+    def _write_settings(username, update_data):
+        """설정 변경은 모두 여기를 거쳐 버전을 올리고 캐시를 무효화 (write-through)"""
         result = users_col.update_one(
             {"username": username},
-            {"$set": {"preferred_model": model_choice}}
+            {"$set": update_data, "$inc": {"settings_version": 1}}
         )
+        settings_cache.invalidate(username)
         return result.matched_count > 0
     
     @staticmethod
     def get_user_settings(username):
-        user = users_col.find_one({"username": username})
+        cached = settings_cache.get(username)
+        if cached is not None:
+            return dict(cached)
+
+        user = users_col.find_one({"username": username}, {"password": 0})
 
         if user:
-            return {
+            user_settings = {
                 "openai_api_key": user.get("openai_api_key", ""),
                 "preferred_model": user.get("preferred_model", "local"),
                 "audio_language": user.get("audio_language", "auto"),
                 "audio_model_level": user.get("audio_model_level", 2),
                 "custom_prompt": user.get("custom_prompt", default_system_prompt),
                 "custom_user_prompt": user.get("custom_user_prompt", default_user_prompt),
-                "profile_img": user.get("profile_img", "/static/default_avatar.png")
+                "profile_img": user.get("profile_img", "/static/default_avatar.png"),
+                "settings_version": user.get("settings_version", 0)
             }
+            settings_cache.set(username, user_settings)
+            return dict(user_settings)
         
         return {
             "openai_api_key": "",
@@ -193,8 +269,28 @@ class AuthManager:
             "audio_language": "auto",
             "audio_model_level": 2,
             "custom_prompt": default_system_prompt,
-            "custom_user_prompt": default_user_prompt
+            "custom_user_prompt": default_user_prompt,
+            "settings_version": 0
         }
+
+    @staticmethod
+    def get_settings_snapshot(username):
+        """
+        작업 생성 시점의 설정 스냅샷 (작업 문서에 저장되므로 API Key는 제외)
+        실행 시점에 설정이 바뀌어도 업로드 당시의 모델/프롬프트로 처리됩니다.
+        """
+        snapshot = AuthManager.get_user_settings(username)
+        snapshot.pop("openai_api_key", None)
+        snapshot.pop("profile_img", None)
+        return snapshot
+
+    @staticmethod
+    def resolve_job_settings(owner, snapshot=None):
+        """작업 실행 시 사용할 설정: 스냅샷이 있으면 스냅샷 + 현재 API Key"""
+        current = AuthManager.get_user_settings(owner)
+        if not snapshot:
+            return current
+        return {**snapshot, "openai_api_key": current.get("openai_api_key", "")}
     
     @staticmethod
     def update_user_cumulative_usage(username: str, cost_usd: float):
@@ -208,4 +304,20 @@ class AuthManager:
         user = users_col.find_one({"username": username}, {"total_spent_usd": 1})
         if user and "total_spent_usd" in user:
             return user["total_spent_usd"]
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+# async 라우트용: 같은 메서드를 전용 스레드 풀에서 실행
+AsyncAuthManager = AsyncFacade(AuthManager)
+
+def _watch_session_deletes():
+    """다른 프로세스에서 삭제(로그아웃/만료)된 세션을 이 프로세스의 캐시에서도 제거"""
+    try:
+        with sessions_col.watch([{"$match": {"operationType": "delete"}}]) as stream:
+            for change in stream:
+                doc_id = str(change["documentKey"]["_id"])
+                session_cache.invalidate_where(lambda key, value: value[1] == doc_id)
+    except Exception as e:
+        print(f"[WARN] 세션 change stream 중단: {e}")
+
+if settings.SESSION_INVALIDATION == "changestream":
+    threading.Thread(target=_watch_session_deletes, daemon=True).start()
@@ -0,0 +1,128 @@
+# app/services/blob_store.py
+
+import os
+import re
+import uuid
+import hashlib
+from datetime import datetime
+from pymongo import ReturnDocument
+from app.core.config import settings
+from app.db import blobs_col
+
+class BlobStore:
+    """
+    문서 파일(슬라이드 이미지, 마크다운)의 내용 주소 저장소
+    - 같은 내용은 한 번만 저장 (키 = SHA-256 + 확장자)
+    - 문서가 참조할 때마다 refcount 증가, 문서 삭제 시 감소하여 0이 되면 파일 삭제
+    - 가져오기/공유는 참조만 늘리므로 디스크 사용량이 공유 횟수와 무관
+    """
+
+    TEMP_DIR = os.path.join(settings.DOCS_BLOB_DIR, "tmp")
+
+    @staticmethod
+    def _extension(name: str) -> str:
+        ext = os.path.splitext(name)[1].lower()
+        # 정적 파일 응답의 Content-Type 추정용 (이상한 확장자는 버림)
+        return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+    @staticmethod
+    def path(key: str) -> str:
+        return os.path.join(settings.DOCS_BLOB_DIR, key[:2], key)
+
+    @staticmethod
+    def url(key: str) -> str:
+        return f"/static/blobs/{key[:2]}/{key}"
+
+    @staticmethod
+    def put_stream(src, name: str):
+        """
+        파일 객체를 저장하고 참조 1개를 추가한 뒤 (key, size) 반환
+        이미 같은 내용이 있으면 refcount만 증가합니다.
+        """
+        buffer_size = settings.UPLOAD_BUFFER_KB * 1024
+        hasher = hashlib.sha256()
+        size = 0
+        os.makedirs(BlobStore.TEMP_DIR, exist_ok=True)
+        tmp_path = os.path.join(BlobStore.TEMP_DIR, str(uuid.uuid4()))
+
+        try:
+            with open(tmp_path, "wb") as out:
+                while True:
+                    chunk = src.read(buffer_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+
+            key = hasher.hexdigest() + BlobStore._extension(name)
+            blobs_col.update_one(
+                {"key": key},
+                {"$inc": {"refcount": 1}, "$setOnInsert": {"size": size, "created_at": datetime.now()}},
+                upsert=True
+            )
+            # 참조를 먼저 올린 뒤 항상 파일을 배치 (내용 주소이므로 덮어써도 같은 내용)
+            # release가 파일을 치우는 중이어도 이 교체 이후에는 파일이 존재함
+            dest = BlobStore.path(key)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp_path, dest)
+            return key, size
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def retain(keys) -> bool:
+        """
+        이미 저장된 blob들에 참조 추가 (파일 I/O 없음)
+        하나라도 없으면 추가했던 참조를 되돌리고 False 반환
+        """
+        retained = []
+        for key in keys:
+            result = blobs_col.update_one({"key": key, "refcount": {"$gt": 0}}, {"$inc": {"refcount": 1}})
+            if result.matched_count == 0 or not os.path.exists(BlobStore.path(key)):
+                if result.matched_count:
+                    retained.append(key)
+                BlobStore.release(retained)
+                return False
+            retained.append(key)
+        return True
+
+    @staticmethod
+    def release(keys):
+        """참조 제거, 더 이상 참조되지 않는 blob은 삭제"""
+        for key in keys:
+            doc = blobs_col.find_one_and_update(
+                {"key": key},
+                {"$inc": {"refcount": -1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not doc or doc["refcount"] > 0:
+                continue
+            # 그 사이 다시 참조되지 않았을 때만 삭제
+            if blobs_col.delete_one({"key": key, "refcount": {"$lte": 0}}).deleted_count:
+                BlobStore._remove_file(key)
+
+    @staticmethod
+    def _remove_file(key: str):
+        """
+        참조가 사라진 blob 파일 삭제
+        파일을 먼저 휴지통 경로로 옮긴 뒤 참조를 다시 확인하여, 그 사이 put_stream이 다시 참조했으면 되돌림
+        (put_stream은 참조 증가 후 파일을 배치하므로 이후 배치된 파일은 지워지지 않음)
+        """
+        path = BlobStore.path(key)
+        os.makedirs(BlobStore.TEMP_DIR, exist_ok=True)
+        trash = os.path.join(BlobStore.TEMP_DIR, f"{key}.{uuid.uuid4()}.trash")
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            return
+        if blobs_col.find_one({"key": key}, {"_id": 1}):
+            os.replace(trash, path)
+        else:
+            os.remove(trash)
+
+    @staticmethod
+    def read_text(key: str) -> str:
+        with open(BlobStore.path(key), "r", encoding="utf-8") as f:
+            return f.read()
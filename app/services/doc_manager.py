@@ -1,31 +1,54 @@
 # app/services/doc_manager.py
 
 import os
+import re
 import shutil
 import uuid
 import zipfile
 from datetime import datetime
 from app.core.config import settings
 from app.db import docs_col
+from app.services.aio import AsyncFacade
+from app.services.blob_store import BlobStore
+from app.services.zip_stream import iter_zip, walk_entries
+
+# 목록/조회 응답에서 제외할 필드 (files: 문서별 blob 목록, 내용 조회/다운로드에서만 사용)
+_NODE_PROJECTION = {"_id": 0, "files": 0}
 
 class DocManager:
     
     @staticmethod
-    def get_zip_path(owner: str, doc_id: str):
+    def get_zip_stream(owner: str, doc_id: str):
+        """
+        문서 파일들을 임시 파일 없이 zip으로 스트리밍 (동시 다운로드 간 경로 충돌/임시 파일 누적 없음)
+        (표시 이름, bytes 제너레이터) 반환, 문서가 없으면 None
+        """
         target = docs_col.find_one({"id": doc_id, "owner": owner})
         
         if not target or target["type"] != "file":
             return None
         
-        # 실제 파일들이 저장된 경로
+        if "files" in target:
+            entries = [(f["name"], BlobStore.path(f["blob"])) for f in target["files"]]
+            return target["name"], iter_zip(entries)
+        
+        # 이전 방식 문서: 압축 해제된 폴더
         source_dir = os.path.join(settings.DOCS_STATIC_DIR, doc_id)
-        # 임시로 생성할 압축 파일 경로
-        zip_output_base = os.path.join(settings.UPLOAD_DIR, f"download_{doc_id}")
+        if not os.path.isdir(source_dir):
+            return None
         
-        # 폴더를 zip으로 압축
-        zip_path = shutil.make_archive(zip_output_base, 'zip', source_dir)
-        return zip_path
+        # 목록은 요청 시점에 확정 (스트리밍 도중 삭제되어도 일관된 목록)
+        entries = list(walk_entries(source_dir))
+        return target["name"], iter_zip(entries)
     
+    @staticmethod
+    def get_node(owner: str, node_id: str):
+        return docs_col.find_one({"id": node_id, "owner": owner}, _NODE_PROJECTION)
+
+    @staticmethod
+    def get_folders(owner: str):
+        return list(docs_col.find({"owner": owner, "type": "folder"}, _NODE_PROJECTION))
+
     @staticmethod
     def rename_node(owner: str, node_id: str, new_name: str):
         """노드(파일/폴더) 이름 변경"""
@@ -103,8 +126,8 @@ class DocManager:
         # MongoDB 조회
         query = {"owner": owner, "parent_id": parent_id}
         
-        # _id 필드는 프론트엔드에 필요 없으므로 제외하고 가져옴
-        nodes = list(docs_col.find(query, {"_id": 0}))
+        # _id 필드와 파일 목록(슬라이드마다 1개)은 프론트엔드에 필요 없으므로 제외하고 가져옴
+        nodes = list(docs_col.find(query, _NODE_PROJECTION))
         
         # 폴더 우선, 그 다음 이름 순으로 정렬 (Python 레벨에서 정렬)
         return sorted(nodes, key=lambda x: (x["type"] != "folder", x["name"]))
@@ -128,73 +151,88 @@ class DocManager:
         return new_folder
 
     @staticmethod
-    def upload_zip_doc(owner: str, file_path: str, filename: str, parent_id: str = None):
-        """ZIP 파일을 받아 압축을 풀고 문서 노드를 생성 (폴더 구조 자동 보정 포함)"""
-        doc_id = str(uuid.uuid4())
-        extract_path = os.path.join(settings.DOCS_STATIC_DIR, doc_id)
-        os.makedirs(extract_path, exist_ok=True)
+    def _zip_members(zip_ref: zipfile.ZipFile):
+        """저장할 (문서 내 경로, ZipInfo) 목록 (숨김 항목 제외, 단일 최상위 폴더는 평탄화)"""
+        members = []
+        for info in zip_ref.infolist():
+            if info.is_dir():
+                continue
+            parts = [p for p in info.filename.replace("\\", "/").split("/") if p not in ("", ".")]
+            # 숨김 파일(.DS_Store, __MACOSX 등) 및 상위 경로 탈출 제외
+            if not parts or ".." in parts or parts[0].startswith(".") or parts[0].startswith("__"):
+                continue
+            members.append((parts, info))
 
-        # 1. 압축 해제
-        try:
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
-        except Exception as e:
-            if os.path.exists(extract_path):
-                shutil.rmtree(extract_path)
-            raise e
-
-        # 만약 최상위에 result.md가 없고, 폴더가 하나만 있다면 그 안으로 들어가서 꺼내옵니다.
-        if not os.path.exists(os.path.join(extract_path, "result.md")):
-            
-            # 숨김 파일(.DS_Store, __MACOSX 등)을 제외한 실제 항목 확인
-            items = os.listdir(extract_path)
-            visible_items = [i for i in items if not i.startswith('.') and not i.startswith('__')]
-            
-            # 항목이 딱 하나이고, 그것이 디렉토리라면? (중첩 폴더 상황)
-            if len(visible_items) == 1:
-                nested_dir = os.path.join(extract_path, visible_items[0])
-                
-                if os.path.isdir(nested_dir):
-                    print(f"[Info] 중첩된 폴더 구조 감지: {visible_items[0]} -> 구조 평탄화 수행")
-                    
-                    # 내부의 모든 파일/폴더를 상위(extract_path)로 이동
-                    for item in os.listdir(nested_dir):
-                        src_path = os.path.join(nested_dir, item)
-                        dst_path = os.path.join(extract_path, item)
-                        
-                        # 이름 충돌 방지 (혹시나 같은 이름이 있다면 덮어쓰거나 건너뛰기)
-                        if os.path.exists(dst_path):
-                            if os.path.isdir(dst_path):
-                                shutil.rmtree(dst_path)
-                            else:
-                                os.remove(dst_path)
-                        
-                        shutil.move(src_path, extract_path)
-                    
-                    # 빈 껍데기 폴더 삭제
-                    os.rmdir(nested_dir)
+        # 만약 최상위에 result.md가 없고, 폴더가 하나만 있다면 그 안의 경로를 기준으로 합니다.
+        tops = {parts[0] for parts, _ in members}
+        has_root_md = any(parts == ["result.md"] for parts, _ in members)
+        if not has_root_md and len(tops) == 1 and all(len(parts) > 1 for parts, _ in members):
+            print(f"[Info] 중첩된 폴더 구조 감지: {next(iter(tops))} -> 구조 평탄화 수행")
+            members = [(parts[1:], info) for parts, info in members]
+
+        return [("/".join(parts), info) for parts, info in members]
 
-        # 2. 메타데이터 DB 저장
+    @staticmethod
+    def _create_doc_node(owner: str, filename: str, parent_id: str, files, source_job: str = None):
+        # 메타데이터 DB 저장 (실제 내용은 blob 참조)
         doc_name = os.path.splitext(filename)[0]
         
         new_doc = {
-            "id": doc_id,
+            "id": str(uuid.uuid4()),
             "type": "file",
             "name": doc_name,
             "owner": owner,
             "parent_id": parent_id,
-            "path": f"/static/docs/{doc_id}", # 정적 경로
+            "files": files,  # [{"name": "images/slide_001.png", "blob": key, "size": n}, ...]
             "created_at": datetime.now().isoformat()
         }
+        if source_job:
+            new_doc["source_job"] = source_job
         
-        docs_col.insert_one(new_doc)
+        try:
+            docs_col.insert_one(new_doc)
+        except Exception:
+            BlobStore.release([f["blob"] for f in files])
+            raise
         new_doc.pop("_id", None)
+        new_doc.pop("files", None)
         return new_doc
+
+    @staticmethod
+    def upload_zip_doc(owner: str, file_path: str, filename: str, parent_id: str = None, source_job: str = None):
+        """ZIP 파일의 각 항목을 blob 저장소에 넣고 문서 노드를 생성 (폴더 구조 자동 보정 포함)"""
+        files = []
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                for name, info in DocManager._zip_members(zip_ref):
+                    with zip_ref.open(info) as src:
+                        key, size = BlobStore.put_stream(src, name)
+                    files.append({"name": name, "blob": key, "size": size})
+        except Exception:
+            # 이미 추가한 참조 되돌리기
+            BlobStore.release([f["blob"] for f in files])
+            raise
+
+        return DocManager._create_doc_node(owner, filename, parent_id, files, source_job)
+
+    @staticmethod
+    def import_job_doc(owner: str, job_id: str, zip_path: str, filename: str, parent_id: str = None):
+        """
+        작업 결과를 문서로 가져오기/공유
+        같은 작업을 가져온 문서가 이미 있으면 그 파일 목록의 참조만 늘림 (압축 해제/복사 없음)
+        """
+        existing = docs_col.find_one({"source_job": job_id, "type": "file"}, {"files": 1})
+        if existing and existing.get("files"):
+            files = existing["files"]
+            if BlobStore.retain([f["blob"] for f in files]):
+                return DocManager._create_doc_node(owner, filename, parent_id, files, job_id)
+
+        return DocManager.upload_zip_doc(owner, zip_path, filename, parent_id, source_job=job_id)
     
     @staticmethod
     def delete_node(owner: str, node_id: str):
-        # 삭제할 노드 찾기
-        target = docs_col.find_one({"id": node_id, "owner": owner})
+        # 삭제할 노드를 먼저 DB에서 제거 (동시에 들어온 삭제 요청 중 하나만 blob 참조를 감소)
+        target = docs_col.find_one_and_delete({"id": node_id, "owner": owner})
         if not target:
             return False
 
@@ -204,13 +242,14 @@ class DocManager:
             DocManager.delete_node(owner, child["id"])
 
         # 실제 파일 삭제 (파일일 경우)
-        if target["type"] == "file":
+        if target["type"] == "file" and "files" in target:
+            # 다른 문서가 같은 내용을 참조하고 있으면 참조 수만 감소
+            BlobStore.release([f["blob"] for f in target["files"]])
+        elif target["type"] == "file":
             full_path = os.path.join(settings.DOCS_STATIC_DIR, target["id"])
             if os.path.exists(full_path):
                 shutil.rmtree(full_path)
 
-        # DB에서 노드 삭제
-        docs_col.delete_one({"id": node_id})
         return True
 
     @staticmethod
@@ -220,7 +259,19 @@ class DocManager:
         if not target:
             return None
         
-        # 마크다운 파일 읽기 (물리적 파일 시스템에서)
+        if "files" in target:
+            blobs = {f["name"]: f["blob"] for f in target["files"]}
+            if "result.md" not in blobs:
+                return "# Error: Markdown file not found."
+            content = BlobStore.read_text(blobs["result.md"])
+            
+            # [중요] 이미지 경로를 blob 정적 경로로 보정
+            def to_blob_url(match):
+                key = blobs.get(f"images/{match.group(1)}")
+                return BlobStore.url(key) if key else match.group(0)
+            return re.sub(r"\./images/([^\s)\"'<>]+)", to_blob_url, content)
+        
+        # 마크다운 파일 읽기 (이전 방식 문서: 물리적 파일 시스템에서)
         md_path = os.path.join(settings.DOCS_STATIC_DIR, doc_id, "result.md")
         if not os.path.exists(md_path):
             return "# Error: Markdown file not found."
@@ -230,4 +281,7 @@ class DocManager:
             
         # [중요] 이미지 경로 보정
         content = content.replace("./images/", f"{target['path']}/images/")
-        return content
\ No newline at end of file
+        return content
+
+# async 라우트용: 같은 메서드를 전용 스레드 풀에서 실행
+AsyncDocManager = AsyncFacade(DocManager)
@@ -0,0 +1,81 @@
+# app/services/image_encoder.py
+
+import io
+import os
+from PIL import Image
+from app.core.config import settings
+
+# PIL 저장 포맷 이름, MIME, 확장자
+_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "png": ("PNG", "image/png", ".png"),
+}
+
+class EncodedPage:
+    """렌더링된 페이지 1장의 인코딩 결과 (LLM 전송용과 보관용 모두 메모리, 보관용은 결과 zip에 바로 기록)"""
+
+    __slots__ = ("index", "filename", "data", "mime", "archive_data")
+
+    def __init__(self, index: int, filename: str, data: bytes, mime: str, archive_data: bytes):
+        self.index = index
+        self.filename = filename          # 결과 zip(images/)의 보관용 파일명
+        self.data = data                  # LLM으로 보낼 압축 이미지
+        self.mime = mime
+        self.archive_data = archive_data  # 보관용 이미지 (결과 zip에 디스크 재읽기 없이 기록)
+
+    @property
+    def archive_bytes(self) -> int:
+        return len(self.archive_data)
+
+def _format(name: str):
+    fmt = _FORMATS.get((name or "").lower())
+    if not fmt:
+        raise ValueError(f"지원하지 않는 이미지 포맷입니다: {name}")
+    return fmt
+
+def _save(img, fp, fmt: str, quality: int):
+    pil_format = _format(fmt)[0]
+    if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    options = {"optimize": True}
+    if pil_format in ("JPEG", "WEBP"):
+        options["quality"] = quality
+    img.save(fp, pil_format, **options)
+
+def archive_extension() -> str:
+    return _format(settings.ARCHIVE_IMAGE_FORMAT)[2]
+
+def encode_archive(img, index: int, images_dir: str = None):
+    """
+    보관용 이미지를 메모리에서 인코딩하여 (파일명, bytes) 반환
+    images_dir가 주어지면 디스크에도 저장 (REPORT_PDF_MODE=eager 에서 wkhtmltopdf가 참조)
+    """
+    filename = f"page_{index:03d}{archive_extension()}"
+    archive_buf = io.BytesIO()
+    _save(img, archive_buf, settings.ARCHIVE_IMAGE_FORMAT, settings.ARCHIVE_IMAGE_QUALITY)
+    archive_data = archive_buf.getvalue()
+    if images_dir:
+        with open(os.path.join(images_dir, filename), "wb") as f:
+            f.write(archive_data)
+    return filename, archive_data
+
+def encode_page(img, index: int, images_dir: str = None) -> EncodedPage:
+    """
+    PIL 이미지의 보관용 이미지와 LLM 전송용 압축본을 메모리에서 인코딩
+    (LLM_IMAGE_MAX_EDGE: 비전 모델이 어차피 축소하는 크기 이상은 보내지 않음)
+    """
+    filename, archive_data = encode_archive(img, index, images_dir)
+
+    llm_img = img
+    max_edge = settings.LLM_IMAGE_MAX_EDGE
+    if max_edge > 0 and max(img.size) > max_edge:
+        scale = max_edge / max(img.size)
+        llm_img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+
+    buf = io.BytesIO()
+    _save(llm_img, buf, settings.LLM_IMAGE_FORMAT, settings.LLM_IMAGE_QUALITY)
+    if llm_img is not img:
+        llm_img.close()
+
+    return EncodedPage(index, filename, buf.getvalue(), _format(settings.LLM_IMAGE_FORMAT)[1], archive_data)
@@ -0,0 +1,195 @@
+# app/services/job_events.py
+
+import time
+import asyncio
+import threading
+from collections import defaultdict, OrderedDict
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.db import history_col
+
+# 변경 감지 대상 필드 (logs는 new_logs 델타로 별도 전달)
+_TRACKED_FIELDS = ("status", "progress", "current_page", "total_pages", "result_url", "error")
+
+# change stream 재연결 대기 (초, 연속 실패 시 두 배씩 증가)
+_WATCH_RETRY_MIN = 1.0
+_WATCH_RETRY_MAX = 30.0
+# delete 이벤트에는 문서 _id만 있으므로 _id -> (작업 ID, 소유자)를 기억해 둘 최대 개수
+_KNOWN_JOBS_MAX = 100_000
+# resume token이 oplog 범위를 벗어남 (ChangeStreamHistoryLost)
+_HISTORY_LOST = 286
+
+class _Subscriber:
+    def __init__(self, owner: str, loop, maxsize: int = 256):
+        self.owner = owner
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 너무 밀리면 개별 델타 대신 전체 재동기화 요청 하나로 교체
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+class JobEventBus:
+    """
+    작업 진행 상황 델타를 사용자별 SSE 구독자에게 전달하는 pub/sub
+    - local: 이 프로세스의 JobManager가 직접 publish (inline 실행 모드)
+    - changestream: MongoDB change stream을 구독하여 다른 프로세스(워커)의 변경도 전달
+      (MongoDB replica set 필요)
+    """
+
+    def __init__(self):
+        self._subs = defaultdict(set)
+        self._owners = {}      # job_id -> owner 캐시
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def subscribe(self, owner: str) -> _Subscriber:
+        sub = _Subscriber(owner, asyncio.get_running_loop())
+        with self._lock:
+            self._subs[owner].add(sub)
+        if settings.JOB_EVENTS_SOURCE == "changestream":
+            self._ensure_watcher()
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        with self._lock:
+            self._subs[sub.owner].discard(sub)
+            if not self._subs[sub.owner]:
+                del self._subs[sub.owner]
+
+    def publish(self, job_id: str, delta: dict, owner: str = None, from_stream: bool = False):
+        # change stream 모드에서는 DB 변경이 곧 이벤트이므로 직접 publish는 중복
+        if settings.JOB_EVENTS_SOURCE == "changestream" and not from_stream:
+            return
+        if not self._subs:
+            return
+
+        if owner is None:
+            with self._lock:
+                owner = self._owners.get(job_id)
+        if owner is None:
+            job = history_col.find_one({"id": job_id}, {"_id": 0, "owner": 1})
+            if not job:
+                return
+            owner = job["owner"]
+
+        event = {"type": "update", "id": job_id, **delta}
+        finished = event["type"] == "deleted" or event.get("status") in ("completed", "failed")
+        with self._lock:
+            if finished:
+                self._owners.pop(job_id, None)
+            else:
+                self._owners[job_id] = owner
+            subs = list(self._subs.get(owner, ()))
+        for sub in subs:
+            sub.loop.call_soon_threadsafe(sub.push, event)
+
+    def publish_deleted(self, job_id: str, owner: str):
+        """
+        삭제 이벤트는 이벤트 소스와 관계없이 이 프로세스의 구독자에게 바로 전달
+        (change stream은 삭제된 문서의 소유자를 알 수 없는 경우가 있으므로, 중복 전달은 클라이언트에서 무시됨)
+        """
+        self.publish(job_id, {"type": "deleted"}, owner, from_stream=True)
+
+    def _broadcast_resync(self):
+        """이벤트가 유실되었을 수 있으므로 모든 구독자에게 전체 재조회 요청"""
+        with self._lock:
+            subs = [sub for group in self._subs.values() for sub in group]
+        for sub in subs:
+            sub.loop.call_soon_threadsafe(sub.push, {"type": "resync"})
+
+    def _ensure_watcher(self):
+        with self._lock:
+            if self._watcher and self._watcher.is_alive():
+                return
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "delete"]}}},
+            # 전체 문서(긴 logs 포함)를 받지 않도록 필요한 필드만 남김
+            {"$project": {
+                "operationType": 1,
+                "documentKey": 1,
+                "updateDescription": 1,
+                "fullDocument.id": 1,
+                "fullDocument.owner": 1
+            }}
+        ]
+        # 문서 _id -> (작업 ID, 소유자): delete 이벤트에는 문서 내용이 없으므로 insert/update 때 기록
+        known = OrderedDict()
+        resume_token = None
+        retry = _WATCH_RETRY_MIN
+        # 연결이 끊겼다가 resume token 없이 다시 시작하면 그 사이 이벤트가 유실될 수 있음
+        missed = False
+
+        while True:
+            try:
+                with history_col.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    retry = _WATCH_RETRY_MIN
+                    if missed:
+                        self._broadcast_resync()
+                        missed = False
+                    for change in stream:
+                        self._handle_change(change, known)
+                        resume_token = stream.resume_token
+            except Exception as e:
+                if isinstance(e, OperationFailure) and e.code == _HISTORY_LOST:
+                    # 중단된 시점부터 이어받을 수 없으므로 현재 시점부터 다시 구독하고 클라이언트는 재조회
+                    resume_token = None
+                    missed = True
+                elif resume_token is None:
+                    missed = True
+                print(f"[WARN] 작업 change stream 중단, {retry:.0f}초 후 재연결: {e}")
+                time.sleep(retry)
+                retry = min(retry * 2, _WATCH_RETRY_MAX)
+
+    def _handle_change(self, change: dict, known: OrderedDict):
+        doc = change.get("fullDocument") or {}
+        key = str(change["documentKey"]["_id"])
+        if doc.get("id") and doc.get("owner"):
+            known[key] = (doc["id"], doc["owner"])
+            known.move_to_end(key)
+            while len(known) > _KNOWN_JOBS_MAX:
+                known.popitem(last=False)
+
+        job_id, owner = known.get(key, (doc.get("id"), doc.get("owner")))
+        if not job_id:
+            return
+
+        op = change["operationType"]
+        if op == "insert":
+            self.publish(job_id, {"type": "created"}, owner, from_stream=True)
+        elif op == "delete":
+            known.pop(key, None)
+            # 소유자를 모르는 작업(이 watcher 시작 전에 만들어짐)은 삭제한 프로세스가 publish_deleted로 전달
+            if owner:
+                self.publish(job_id, {"type": "deleted"}, owner, from_stream=True)
+        else:
+            delta = self._delta_from_update(change.get("updateDescription", {}))
+            if delta:
+                self.publish(job_id, delta, owner, from_stream=True)
+
+    @staticmethod
+    def _delta_from_update(description: dict):
+        fields = description.get("updatedFields", {})
+        delta = {k: fields[k] for k in _TRACKED_FIELDS if k in fields}
+
+        if "logs" in fields:
+            delta["logs"] = fields["logs"]
+        else:
+            pushed = sorted(
+                (int(k.split(".", 1)[1]), v) for k, v in fields.items()
+                if k.startswith("logs.") and k.split(".", 1)[1].isdigit()
+            )
+            if pushed:
+                delta["new_logs"] = [v for _, v in pushed]
+        return delta
+
+job_events = JobEventBus()
@@ -2,10 +2,24 @@
 
 import uuid
 import os
+import base64
 import shutil
-from datetime import datetime
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
 from app.core.config import settings
-from app.db import history_col  
+from app.db import history_col, slide_results_col
+from app.db.prompt import default_system_prompt, default_user_prompt
+from app.services.job_events import job_events
+from app.services.progress_writer import progress_writer, log_push_ops
+from app.services.aio import AsyncFacade
+from app.services.artifacts import declared_artifacts, artifact_url, remove_job_artifacts
+from app.services.upload_store import UploadStore
+
+class LeaseLost(Exception):
+    """다른 워커가 작업을 가져감 (임대 만료) - 결과를 기록하지 않고 중단"""
+    pass
 
 class JobManager:
     
@@ -15,60 +29,341 @@ class JobManager:
         서버 재시작 시 실행:
         기존에 'processing'이나 'pending' 상태로 남아있던 작업들을 'failed'로 처리합니다.
         (서버가 꺼지면서 작업이 중단된 것으로 간주)
+        worker 모드에서는 작업이 별도 워커 프로세스에 있으므로 건드리지 않고,
+        임대(lease)가 만료된 작업은 워커가 다시 가져가서 이어서 처리합니다.
         """
+        if settings.JOB_EXECUTION_MODE == "worker":
+            return
         try:
             history_col.update_many(
                 {"status": {"$in": ["processing", "pending"]}},
                 {
                     "$set": {
                         "status": "failed",
-                        "error": "Server restarted during processing"
+                        "error": "Server restarted during processing",
+                        "updated_at": datetime.now()
                     },
-                    "$push": {
-                        "logs": "서버 재시작으로 인해 작업이 중단되었습니다."
-                    }
+                    **log_push_ops(["서버 재시작으로 인해 작업이 중단되었습니다."])
                 }
             )
         except Exception as e:
             print(f"[ERROR] 작업 상태 초기화 실패: {e}")
 
     @staticmethod
-    def create_job(filename: str, owner: str):
-        job_id = str(uuid.uuid4())
-        
-        new_job = {
+    def _new_job_doc(job_id: str, filename: str, owner: str, kind: str, file_path: str, settings_snapshot: dict,
+                     file_hash: str, file_size: int, result_key: str):
+        """새 작업 문서 (대기 상태 기본값, 재사용 작업은 필요한 필드만 덮어씀)"""
+        now = datetime.now()
+        return {
             "id": job_id,
             "filename": filename,
             "owner": owner,
+            "kind": kind,            # slide | audio
+            "file_path": file_path,  # 워커가 처리할 업로드 원본 경로
+            "file_hash": file_hash,  # 업로드 원본 SHA-256
+            "file_size": file_size,
+            "result_key": result_key,  # 같은 파일 + 같은 설정이면 같은 결과 (중복 업로드 재사용)
+            "artifacts": declared_artifacts(kind),  # 다운로드 가능한 결과물 (생성형은 첫 요청 시 생성)
+            "settings_snapshot": settings_snapshot,   # 업로드 시점의 사용자 설정 (API Key 제외)
+            "attempts": 0,
+            "lease_owner": None,
+            "lease_expires_at": None,
             "status": "pending",
             "progress": 0,
             "total_pages": 0,
             "current_page": 0,
             "logs": [],
-            "created_at": datetime.now().isoformat(),
+            "log_total": 0,
+            "created_at": now.isoformat(),
+            "updated_at": now,
             "result_url": None,
             "error": None
         }
+
+    @staticmethod
+    def create_job(filename: str, owner: str, file_path: str = None, kind: str = "slide", settings_snapshot: dict = None,
+                   job_id: str = None, file_hash: str = None, file_size: int = None, result_key: str = None):
+        # 업로드 파일을 작업 폴더에 먼저 저장하는 경우 job_id를 미리 발급받아 전달
+        job_id = job_id or str(uuid.uuid4())
+        
+        new_job = JobManager._new_job_doc(
+            job_id, filename, owner, kind, file_path, settings_snapshot, file_hash, file_size, result_key
+        )
         
         history_col.insert_one(new_job)
+        job_events.publish(job_id, {"type": "created"}, owner)
         return job_id
     
+    @staticmethod
+    def make_result_key(file_hash: str, kind: str, snapshot: dict):
+        """결과에 영향을 주는 입력(파일 해시 + 모델/프롬프트 설정)의 지문"""
+        if not file_hash:
+            return None
+        snapshot = snapshot or {}
+        if kind == "audio":
+            params = {
+                "language": snapshot.get("audio_language", "auto"),
+                "model": snapshot.get("audio_model_level", 2)
+            }
+        else:
+            params = {
+                "model": snapshot.get("preferred_model", "local"),
+                "system_prompt": (snapshot.get("custom_prompt") or default_system_prompt).strip(),
+                "user_prompt": (snapshot.get("custom_user_prompt") or default_user_prompt).strip()
+            }
+        payload = json.dumps({"file": file_hash, "kind": kind, **params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def find_reusable_job(result_key: str, owner: str):
+        """
+        결과 파일이 남아있는 동일 입력의 완료 작업 (UPLOAD_DEDUP_SCOPE=global이면 다른 사용자 작업 포함)
+        분석 실패 슬라이드가 있는 결과는 재사용하지 않음 (실패가 이후 업로드에 복사되지 않도록)
+        """
+        if not result_key or not settings.UPLOAD_DEDUP_ENABLED:
+            return None
+        query = {"result_key": result_key, "status": "completed", "failed_slides": 0}
+        if settings.UPLOAD_DEDUP_SCOPE != "global":
+            query["owner"] = owner
+
+        projection = {"_id": 0, "id": 1, "owner": 1, "total_pages": 1}
+        for job in history_col.find(query, projection).sort("created_at", -1).limit(5):
+            if os.path.exists(os.path.join(settings.RESULT_DIR, f"{job['id']}.zip")):
+                return job
+        return None
+
+    @staticmethod
+    def create_reused_job(source: dict, filename: str, owner: str, kind: str = "slide", settings_snapshot: dict = None,
+                          file_hash: str = None, file_size: int = None, result_key: str = None):
+        """기존 결과 zip을 링크(또는 복사)하여 즉시 완료된 작업 생성 (LLM 호출/비용 없음)"""
+        job_id = str(uuid.uuid4())
+        src_zip = os.path.join(settings.RESULT_DIR, f"{source['id']}.zip")
+        dst_zip = os.path.join(settings.RESULT_DIR, f"{job_id}.zip")
+        try:
+            os.link(src_zip, dst_zip)  # 같은 파일시스템이면 하드 링크 (복사 비용/추가 용량 없음)
+        except OSError:
+            shutil.copy2(src_zip, dst_zip)
+
+        total_pages = source.get("total_pages", 0)
+        log = "동일한 파일/설정의 기존 결과를 재사용했습니다. (LLM 비용 없음)"
+        new_job = JobManager._new_job_doc(
+            job_id, filename, owner, kind, None, settings_snapshot, file_hash, file_size, result_key
+        )
+        new_job.update({
+            "reused_from": source["id"],
+            "status": "completed",
+            "progress": 100,
+            "total_pages": total_pages,
+            "current_page": total_pages,
+            "failed_slides": 0,
+            "cumulative_usage": {"prompt": 0, "cached": 0, "completion": 0},
+            "logs": [log],
+            "log_total": 1,
+            "result_url": artifact_url(job_id, "result.zip")
+        })
+        history_col.insert_one(new_job)
+        job_events.publish(job_id, {"type": "created"}, owner)
+        return job_id
+
+    @staticmethod
+    def claim_next_job(worker_id: str, lease_seconds: int):
+        """
+        대기 중인 작업(또는 임대가 만료된 처리 중 작업) 하나를 원자적으로 가져옵니다.
+        여러 워커가 동시에 호출해도 find_one_and_update 덕분에 한 워커만 가져갑니다.
+        """
+        now = datetime.now()
+        expired = {"status": "processing", "lease_expires_at": {"$lt": now}}
+
+        # 재시도 한도를 넘긴 작업은 더 이상 가져가지 않고 실패 처리
+        history_col.update_many(
+            {**expired, "attempts": {"$gte": settings.JOB_MAX_ATTEMPTS}},
+            {
+                "$set": {
+                    "status": "failed",
+                    "error": "Worker lease expired too many times",
+                    "lease_owner": None,
+                    "updated_at": now
+                },
+                **log_push_ops(["워커 중단이 반복되어 작업을 중단했습니다."])
+            }
+        )
+
+        return history_col.find_one_and_update(
+            {
+                "$or": [{"status": "pending"}, expired],
+                "file_path": {"$ne": None},
+                "attempts": {"$lt": settings.JOB_MAX_ATTEMPTS}
+            },
+            {
+                "$set": {
+                    "status": "processing",
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            projection={"_id": 0},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def requeue_job(job_id: str) -> bool:
+        """
+        실패한 작업을 다시 대기 상태로 (체크포인트는 유지되어 남은 슬라이드만 처리)
+        동시에 들어온 재개 요청 중 하나만 성공하도록 failed 상태일 때만 갱신하고, 갱신 여부 반환
+        """
+        # 진행 중인 진행률 flush가 최종 상태 뒤에 기록되지 않도록 같은 작업의 쓰기를 직렬화
+        with progress_writer.final(job_id):
+            result = history_col.update_one(
+                {"id": job_id, "status": "failed"},
+                {
+                    "$set": {
+                        "status": "pending",
+                        "error": None,
+                        # 재시도 한도를 모두 쓴 작업도 다시 가져갈 수 있도록 초기화
+                        "attempts": 0,
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                        "updated_at": datetime.now()
+                    },
+                    **log_push_ops(["작업을 다시 시작합니다."])
+                }
+            )
+        if result.matched_count == 0:
+            return False
+        job_events.publish(job_id, {"status": "pending", "error": None, "new_logs": ["작업을 다시 시작합니다."]})
+        return True
+
+    @staticmethod
+    def heartbeat(job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """임대 연장. 다른 워커가 가져간 경우 False"""
+        result = history_col.update_one(
+            {"id": job_id, "lease_owner": worker_id, "status": "processing"},
+            {"$set": {"lease_expires_at": datetime.now() + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    def check_lease(job_id: str, lease_owner: str = None, cancel=None):
+        """
+        worker 모드에서 임대를 잃었으면 LeaseLost 발생 (inline 모드는 lease_owner=None)
+        결과 zip 교체/완료 기록처럼 되돌릴 수 없는 단계 직전에 호출합니다.
+        """
+        if cancel is not None and cancel.is_set():
+            raise LeaseLost(job_id)
+        if lease_owner and not JobManager.heartbeat(job_id, lease_owner, settings.JOB_LEASE_SECONDS):
+            raise LeaseLost(job_id)
+
     @staticmethod
     def start_processing(job_id: str):
         history_col.update_one(
             {"id": job_id},
-            {"$set": {"status": "processing"}}
+            {"$set": {"status": "processing", "updated_at": datetime.now()}}
         )
+        job_events.publish(job_id, {"status": "processing"})
 
     @staticmethod
-    def get_jobs_by_user(username: str):
-        # MongoDB에서 사용자별 작업 조회 (생성일 역순 정렬)
-        jobs = list(history_col.find(
-            {"owner": username}, 
-            {"_id": 0}  # ObjectId 제외
-        ).sort("created_at", -1))
-        return jobs
+    def get_completed_jobs(username: str):
+        """사용자의 완료된 작업 목록 (생성일 역순, 목록 조회와 같은 projection으로 logs 등 큰 필드 제외)"""
+        return list(history_col.find(
+            {"owner": username, "status": "completed"},
+            JobManager._list_projection(include_logs=False)
+        ).sort([("created_at", -1), ("id", -1)]))
     
+    @staticmethod
+    def list_jobs(username: str, limit: int = 20, cursor: str = None, since: datetime = None, include_logs: bool = False):
+        """
+        작업 목록 (커서 기반 페이지네이션)
+        - 기본적으로 logs는 제외하고 log_count / last_log 만 포함
+        - since: 이 시각 이후 변경(updated_at)된 작업만 반환 (증분 동기화)
+        - cursor: 이전 페이지의 next_cursor (created_at 역순 기준)
+        """
+        limit = max(1, min(limit, 100))
+        query = {"owner": username}
+        if since:
+            query["updated_at"] = {"$gt": since}
+        if cursor:
+            created_at, job_id = JobManager._decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": job_id}}
+            ]
+
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"created_at": -1, "id": -1}},
+            {"$limit": limit + 1},
+            {"$addFields": {
+                "log_count": {"$size": {"$ifNull": ["$logs", []]}},
+                "last_log": {"$arrayElemAt": [{"$ifNull": ["$logs", []]}, -1]}
+            }},
+            {"$project": JobManager._list_projection(include_logs)}
+        ]
+        server_time = datetime.now()
+        jobs = list(history_col.aggregate(pipeline))
+
+        next_cursor = None
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            next_cursor = JobManager._encode_cursor(jobs[-1]["created_at"], jobs[-1]["id"])
+
+        for job in jobs:
+            if isinstance(job.get("updated_at"), datetime):
+                job["updated_at"] = job["updated_at"].isoformat()
+
+        return {
+            "jobs": jobs,
+            "next_cursor": next_cursor,
+            # 다음 증분 조회 시 since 값으로 사용
+            "server_time": server_time.isoformat()
+        }
+
+    @staticmethod
+    def _list_projection(include_logs: bool):
+        projection = {"_id": 0, "file_path": 0, "lease_owner": 0, "lease_expires_at": 0, "settings_snapshot": 0}
+        if not include_logs:
+            projection["logs"] = 0
+        return projection
+
+    @staticmethod
+    def _encode_cursor(created_at: str, job_id: str) -> str:
+        return base64.urlsafe_b64encode(f"{created_at}|{job_id}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        try:
+            created_at, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        except Exception:
+            raise ValueError("Invalid cursor")
+        return created_at, job_id
+
+    @staticmethod
+    def get_job_logs(job_id: str, username: str, start: int = 0, limit: int = 200):
+        """
+        작업 로그 일부 조회 (start가 음수이면 끝에서부터)
+        """
+        limit = max(1, min(limit, 1000))
+        pipeline = [
+            {"$match": {"id": job_id, "owner": username}},
+            {"$project": {
+                "_id": 0,
+                "total": {"$size": {"$ifNull": ["$logs", []]}},
+                "log_total": 1,
+                "logs": {"$slice": [{"$ifNull": ["$logs", []]}, start, limit]}
+            }}
+        ]
+        result = list(history_col.aggregate(pipeline))
+        if not result:
+            return None
+
+        total = result[0]["total"]
+        offset = start if start >= 0 else max(0, total + start)
+        # JOB_LOG_CAP을 넘어 잘려나간 오래된 로그 수
+        dropped = max(0, result[0].get("log_total", total) - total)
+        return {"logs": result[0]["logs"], "start": min(offset, total), "total": total, "dropped": dropped}
+
     @staticmethod
     def get_job(job_id: str):
         return history_col.find_one({"id": job_id}, {"_id": 0})
@@ -90,45 +385,104 @@ class JobManager:
             "progress": progress
         }
         
-        update_query = {"$set": update_fields}
+        delta = dict(update_fields)
+        log_entry = None
         
         # 메시지가 있으면 logs 배열에 추가 ($push)
         if message:
             log_entry = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
-            update_query["$push"] = {"logs": log_entry}
+            delta["new_logs"] = [log_entry]
             
-        history_col.update_one({"id": job_id}, update_query)
+        # DB 쓰기는 작업별로 모아서 주기적으로 한 번에 기록 (구독자에게는 즉시 전달)
+        progress_writer.update(job_id, update_fields, log_entry)
+        job_events.publish(job_id, delta)
 
     @staticmethod
-    def mark_completed(job_id: str, result_path: str):
-        history_col.update_one(
-            {"id": job_id},
-            {
-                "$set": {
-                    "status": "completed",
-                    "progress": 100,
-                    "result_url": result_path
-                },
-                "$push": {
-                    "logs": "작업 완료! 다운로드 가능합니다."
-                }
-            }
+    def save_slide_result(job_id: str, index: int, filename: str, content: str, usage: dict):
+        """슬라이드 분석 결과 체크포인트 (작업이 중단돼도 이미 받은 응답은 보존)"""
+        slide_results_col.update_one(
+            {"job_id": job_id, "index": index},
+            {"$set": {
+                "filename": filename,
+                "content": content,
+                "usage": usage,
+                "created_at": datetime.now()
+            }},
+            upsert=True
         )
 
     @staticmethod
-    def mark_failed(job_id: str, error_msg: str):
-        history_col.update_one(
-            {"id": job_id},
-            {
-                "$set": {
-                    "status": "failed",
-                    "error": error_msg
-                },
-                "$push": {
-                    "logs": f"에러 발생: {error_msg}"
+    def get_slide_results(job_id: str):
+        """{index: {"filename", "content", "usage"}} 형태로 반환"""
+        return {
+            doc["index"]: doc
+            for doc in slide_results_col.find({"job_id": job_id}, {"_id": 0})
+        }
+
+    @staticmethod
+    def clear_slide_results(job_id: str):
+        slide_results_col.delete_many({"job_id": job_id})
+
+    @staticmethod
+    def mark_completed(job_id: str, result_path: str, lease_owner: str = None, failed_slides: int = 0) -> bool:
+        """
+        lease_owner가 주어지면 아직 임대를 가진 경우에만 기록 (다른 워커가 가져간 작업이면 False)
+        failed_slides: 분석에 실패한 슬라이드 수 (0인 결과만 중복 업로드 재사용 대상)
+        """
+        # 진행 중인 진행률 flush가 최종 상태 뒤에 기록되지 않도록 같은 작업의 쓰기를 직렬화
+        with progress_writer.final(job_id):
+            query = {"id": job_id}
+            if lease_owner:
+                query["lease_owner"] = lease_owner
+            result = history_col.update_one(
+                query,
+                {
+                    "$set": {
+                        "status": "completed",
+                        "progress": 100,
+                        "result_url": result_path,
+                        "failed_slides": failed_slides,
+                        "updated_at": datetime.now()
+                    },
+                    **log_push_ops(["작업 완료! 다운로드 가능합니다."])
                 }
-            }
-        )
+            )
+        if result.matched_count == 0:
+            return False
+        job_events.publish(job_id, {
+            "status": "completed",
+            "progress": 100,
+            "result_url": result_path,
+            "new_logs": ["작업 완료! 다운로드 가능합니다."]
+        })
+        return True
+
+    @staticmethod
+    def mark_failed(job_id: str, error_msg: str, lease_owner: str = None) -> bool:
+        # 진행 중인 진행률 flush가 최종 상태 뒤에 기록되지 않도록 같은 작업의 쓰기를 직렬화
+        with progress_writer.final(job_id):
+            query = {"id": job_id}
+            if lease_owner:
+                query["lease_owner"] = lease_owner
+            result = history_col.update_one(
+                query,
+                {
+                    "$set": {
+                        "status": "failed",
+                        "error": error_msg,
+                        "updated_at": datetime.now()
+                    },
+                    **log_push_ops([f"에러 발생: {error_msg}"])
+                }
+            )
+        if result.matched_count == 0:
+            return False
+        job_events.publish(job_id, {
+            "status": "failed",
+            "error": error_msg,
+            "new_logs": [f"에러 발생: {error_msg}"]
+        })
+        return True
 
     @staticmethod
     def delete_job(job_id: str, username: str):
@@ -138,7 +492,10 @@ class JobManager:
             return False
             
         # DB에서 삭제
+        progress_writer.discard(job_id)
         history_col.delete_one({"id": job_id})
+        JobManager.clear_slide_results(job_id)
+        job_events.publish_deleted(job_id, username)
         
         # 파일 시스템 정리
         try:
@@ -149,10 +506,11 @@ class JobManager:
             zip_path = os.path.join(settings.RESULT_DIR, f"{job_id}.zip")
             if os.path.exists(zip_path):
                 os.remove(zip_path)
+            # 다운로드 시 생성된 결과물 캐시 (PDF 보고서 등)
+            remove_job_artifacts(job_id)
             
-            upload_path = os.path.join(settings.UPLOAD_DIR, job_id)
-            if os.path.exists(upload_path):
-                shutil.rmtree(upload_path)
+            # 업로드 원본 (실패한 작업은 재개를 위해 여기까지 남아있음)
+            UploadStore.remove_job_upload(job_id, job.get("file_path"))
         except Exception as e:
             print(f"[WARN] 파일 삭제 중 오류: {e}")
             
@@ -160,7 +518,13 @@ class JobManager:
 
     @staticmethod
     def get_queue_position(job_id: str) -> int:
-        # 현재 작업 정보 조회
+        # 이 프로세스의 스케줄러가 관리 중인 작업이면 스케줄러 기준의 정확한 순서 사용
+        from app.services.scheduler import get_queue_position
+        pos = get_queue_position(job_id)
+        if pos is not None:
+            return pos
+
+        # 스케줄러에 없는 작업(다른 프로세스 등)은 DB 기준으로 추정
         current_job = history_col.find_one({"id": job_id})
         if not current_job:
             return 0
@@ -194,5 +558,8 @@ class JobManager:
             
         return result[0]
 
+# async 라우트용: 같은 메서드를 전용 스레드 풀에서 실행
+AsyncJobManager = AsyncFacade(JobManager)
+
 # 모듈 로드 시 중단된 작업 상태 초기화
 JobManager.reset_interrupted_jobs()
\ No newline at end of file
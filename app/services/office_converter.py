@@ -0,0 +1,230 @@
+# app/services/office_converter.py
+
+import os
+import time
+import queue
+import atexit
+import shlex
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import subprocess
+import concurrent.futures
+from app.core.config import settings
+
+class OfficeConversionError(Exception):
+    """PPT -> PDF 변환 실패 (타임아웃 포함)"""
+    pass
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _profile_url(path: str) -> str:
+    return "file://" + os.path.abspath(path).replace("\\", "/")
+
+# LibreOffice는 soffice -> soffice.bin 처럼 자식 프로세스를 띄우므로 프로세스 그룹 단위로 종료
+_NEW_GROUP = {"start_new_session": True} if os.name == "posix" else {}
+
+def _signal_group(proc: subprocess.Popen, sig):
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, sig)
+        elif sig == signal.SIGTERM:
+            proc.terminate()
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def _stop_process_group(proc: subprocess.Popen, timeout: float = 10):
+    """프로세스와 그 자식들까지 종료 (terminate 후 응답이 없으면 kill)"""
+    _signal_group(proc, signal.SIGTERM)
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+        proc.wait()
+    else:
+        # 리더가 먼저 끝나도 남아있는 자식(soffice.bin) 정리
+        if os.name == "posix":
+            _signal_group(proc, signal.SIGKILL)
+
+class _OfficeInstance:
+    """
+    상주 LibreOffice 1개 (unoserver)
+    인스턴스마다 전용 사용자 프로필/포트를 사용하므로 동시 변환 시 프로필 잠금 충돌이 없습니다.
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.proc = None
+        self.port = None
+        self.conversions = 0
+        self.profile_dir = tempfile.mkdtemp(prefix=f"lo_profile_{os.getpid()}_{index}_")
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        # 여러 워커 프로세스가 각자 풀을 만들므로 포트는 매번 빈 포트를 할당
+        self.port = _free_port()
+        uno_port = _free_port()
+        self.proc = subprocess.Popen(
+            [
+                *shlex.split(settings.OFFICE_SERVER_CMD),
+                "--interface", "127.0.0.1",
+                "--port", str(self.port),
+                "--uno-port", str(uno_port),
+                "--user-installation", _profile_url(self.profile_dir),
+            ],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            **_NEW_GROUP
+        )
+        self.conversions = 0
+
+        deadline = time.monotonic() + settings.OFFICE_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise OfficeConversionError(f"LibreOffice 서버 시작 실패 (exit {self.proc.returncode})")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.3)
+        self.stop()
+        raise OfficeConversionError("LibreOffice 서버 시작 시간 초과")
+
+    def stop(self):
+        if self.proc is None:
+            return
+        # 서버가 이미 죽었어도 그룹에 남은 LibreOffice가 있을 수 있으므로 항상 그룹 종료
+        _stop_process_group(self.proc)
+        self.proc = None
+
+    def convert(self, src_path: str, pdf_path: str):
+        from unoserver.client import UnoClient
+
+        client = UnoClient(server="127.0.0.1", port=str(self.port), host_location="local")
+        client.convert(inpath=src_path, outpath=pdf_path, convert_to="pdf")
+        self.conversions += 1
+
+class OfficeConverter:
+    """
+    PPT/PPTX -> PDF 변환 풀
+    - OFFICE_CONVERTERS개의 상주 LibreOffice(unoserver)를 재사용하여 변환마다 기동 비용을 내지 않음
+    - 한 인스턴스는 한 번에 변환 1건만 처리 (동시 변환 수 = 인스턴스 수)
+    - 타임아웃/크래시 시 해당 인스턴스를 재시작, OFFICE_RECYCLE_AFTER건마다 재시작하여 누수 방지
+    - unoserver가 없으면 변환마다 soffice를 전용 프로필로 실행 (동시 실행 충돌만 방지)
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._fallback = settings.OFFICE_CONVERTER != "unoserver"
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._instances = []
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="office")
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._started or self._fallback:
+                return
+            try:
+                import unoserver.client  # noqa: F401
+            except ImportError:
+                print("[WARN] unoserver가 설치되어 있지 않아 변환마다 soffice를 실행합니다. (pip install unoserver)")
+                self._fallback = True
+                return
+            for i in range(self.size):
+                inst = _OfficeInstance(i)
+                self._instances.append(inst)
+                self._idle.put(inst)
+            self._started = True
+
+    def convert(self, src_path: str, output_dir: str) -> str:
+        base = os.path.splitext(os.path.basename(src_path))[0]
+        pdf_path = os.path.join(output_dir, f"{base}.pdf")
+
+        self._ensure_pool()
+        if self._fallback:
+            with self._slots:
+                self._convert_once(src_path, output_dir)
+        else:
+            inst = self._idle.get()
+            try:
+                if inst.alive() and inst.conversions >= settings.OFFICE_RECYCLE_AFTER:
+                    inst.stop()
+                if inst.alive() or self._start(inst):
+                    self._convert_pooled(inst, src_path, pdf_path)
+                else:
+                    self._convert_once(src_path, output_dir)
+            finally:
+                self._idle.put(inst)
+
+        if not os.path.exists(pdf_path):
+            raise OfficeConversionError(f"PDF 변환 결과가 없습니다: {os.path.basename(src_path)}")
+        return pdf_path
+
+    def _start(self, inst: _OfficeInstance) -> bool:
+        try:
+            inst.start()
+            return True
+        except (OSError, OfficeConversionError) as e:
+            # 서버를 띄울 수 없으면 이번 변환은 1회성 soffice로 처리하고 다음 변환 때 다시 시도
+            print(f"[WARN] LibreOffice 서버 시작 실패, soffice로 변환합니다: {e}")
+            return False
+
+    def _convert_pooled(self, inst: _OfficeInstance, src_path: str, pdf_path: str):
+        future = self._executor.submit(inst.convert, src_path, pdf_path)
+        try:
+            future.result(timeout=settings.OFFICE_CONVERT_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # 멈춘 인스턴스를 종료하면 대기 중인 client 호출도 에러로 끝남
+            inst.stop()
+            raise OfficeConversionError(f"PDF 변환 시간 초과 ({settings.OFFICE_CONVERT_TIMEOUT}s)")
+        except Exception as e:
+            if not inst.alive():
+                inst.stop()
+            raise OfficeConversionError(f"PDF 변환 실패: {e}")
+
+    def _convert_once(self, src_path: str, output_dir: str):
+        profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        proc = None
+        try:
+            proc = subprocess.Popen(
+                [
+                    "soffice", "--headless", "--norestore",
+                    f"-env:UserInstallation={_profile_url(profile_dir)}",
+                    "--convert-to", "pdf", "--outdir", output_dir, src_path
+                ],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                **_NEW_GROUP
+            )
+            returncode = proc.wait(timeout=settings.OFFICE_CONVERT_TIMEOUT)
+            if returncode != 0:
+                raise OfficeConversionError(f"PDF 변환 실패 (exit {returncode})")
+        except subprocess.TimeoutExpired:
+            raise OfficeConversionError(f"PDF 변환 시간 초과 ({settings.OFFICE_CONVERT_TIMEOUT}s)")
+        finally:
+            # 타임아웃 시 soffice.bin까지 그룹 단위로 종료 (고아 프로세스 방지)
+            if proc is not None:
+                _stop_process_group(proc)
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def shutdown(self):
+        """
+        모든 인스턴스 종료 및 프로필 삭제
+        atexit은 SIGTERM/terminate()로 끝날 때 실행되지 않으므로 worker.py가 시그널 핸들러에서도 호출합니다.
+        """
+        for inst in self._instances:
+            inst.stop()
+            shutil.rmtree(inst.profile_dir, ignore_errors=True)
+
+office_converter = OfficeConverter(settings.OFFICE_CONVERTERS)
+atexit.register(office_converter.shutdown)
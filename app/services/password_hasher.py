@@ -0,0 +1,105 @@
+# app/services/password_hasher.py
+
+import time
+import asyncio
+import hashlib
+import threading
+import concurrent.futures
+import bcrypt
+from app.core.config import settings
+
+class PasswordPoolBusy(Exception):
+    """대기 중인 해싱 작업이 너무 많아 요청을 거절할 때"""
+    pass
+
+class PasswordHasher:
+    """
+    bcrypt 해싱/검증을 전용 스레드 풀에서 실행합니다. (bcrypt는 연산 중 GIL을 해제)
+    - 이벤트 루프를 막지 않도록 async 메서드는 await로 결과를 기다림
+    - 대기열 길이가 BCRYPT_MAX_QUEUE를 넘으면 PasswordPoolBusy로 즉시 거절
+    - 처리 시간/대기 시간 통계를 stats()로 제공
+    """
+
+    def __init__(self, workers: int, max_queue: int, rounds: int):
+        self.rounds = rounds
+        self.max_queue = max_queue
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="bcrypt"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+        self._max_latency = 0.0
+
+    @staticmethod
+    def _pre_hash(password: str) -> bytes:
+        """
+        bcrypt의 72바이트 제한을 우회하기 위해 
+        SHA-256으로 먼저 해싱하여 64글자(bytes)로 고정합니다.
+        """
+        return hashlib.sha256(password.encode('utf-8')).hexdigest().encode('utf-8')
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise PasswordPoolBusy("Too many pending password operations")
+            self._pending += 1
+
+        submitted_at = time.monotonic()
+
+        def run():
+            started_at = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.monotonic()
+                with self._lock:
+                    self._pending -= 1
+                    self._completed += 1
+                    self._total_wait += started_at - submitted_at
+                    self._total_run += finished_at - started_at
+                    self._max_latency = max(self._max_latency, finished_at - submitted_at)
+
+        return self._executor.submit(run)
+
+    def _hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(self._pre_hash(password), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+
+    def _verify_sync(self, password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(self._pre_hash(password), hashed.encode('utf-8'))
+        except ValueError:
+            return False
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self._hash_sync, password))
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(self._verify_sync, password, hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """저장된 해시의 cost factor가 현재 설정과 다르면 True"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            done = self._completed or 1
+            return {
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait / done * 1000, 2),
+                "avg_run_ms": round(self._total_run / done * 1000, 2),
+                "max_latency_ms": round(self._max_latency * 1000, 2)
+            }
+
+password_hasher = PasswordHasher(settings.BCRYPT_WORKERS, settings.BCRYPT_MAX_QUEUE, settings.BCRYPT_ROUNDS)
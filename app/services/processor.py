@@ -2,24 +2,24 @@ import os
 import shutil
 import base64
 import requests
-import subprocess
 import zipfile
-import pdfkit
 import threading
 import concurrent.futures
 import time  # [추가] 대기 시간을 위해 필요
-from pdf2image import convert_from_path
 from app.core.config import settings
-from app.services.job_manager import JobManager
+from app.services.job_manager import JobManager, LeaseLost
 from app.services.auth_manager import AuthManager
+from app.services.slide_cache import SlideCache
+from app.services.rate_limiter import get_limiter
+from app.services.scheduler import gpu_scheduler
+from app.services.image_encoder import encode_page, encode_archive
+from app.services.rasterizer import count_pdf_pages, iter_pdf_pages
+from app.services.office_converter import office_converter
+from app.services.result_packager import ResultPackager
+from app.services.upload_store import UploadStore
+from app.services.report_renderer import render_report_pdf
 from app.db.prompt import default_system_prompt, default_user_prompt
 
-# ==========================================
-# Global Lock
-# ==========================================
-# Local LLM 사용 시에만 작동할 Lock (GPU 자원 보호)
-local_gpu_lock = threading.Lock()
-
 PRICING_TABLE = {
     "gpt-5.2": {"input": 1.75, "cached": 0.175, "output": 14.00},
     "gpt-5-mini": {"input": 0.25, "cached": 0.025, "output": 2.00},
@@ -73,18 +73,11 @@ def get_target_model(user_settings):
 
     return config
 
-def describe_image(image_path: str, model_config: dict):
-    filename = os.path.basename(image_path)
+def describe_image(filename: str, image_data: bytes, mime: str, model_config: dict, limiter=None):
+    """image_data: image_encoder가 메모리에서 인코딩한 LLM 전송용 이미지"""
     url = f"{model_config['base_url']}/chat/completions"
     headers = get_headers(model_config['api_key'])
-
-    def image_to_data_url(path):
-        with open(path, "rb") as f:
-            raw = f.read()
-        encoded = base64.b64encode(raw).decode("utf-8")
-        ext = os.path.splitext(path)[1].lower()
-        mime = "image/png" if ext == ".png" else "image/jpeg"
-        return f"data:{mime};base64,{encoded}"
+    data_url = f"data:{mime};base64,{base64.b64encode(image_data).decode('utf-8')}"
    
     system_instruction = model_config.get("system_prompt", default_system_prompt)
     if not system_instruction.strip():
@@ -102,16 +95,28 @@ def describe_image(image_path: str, model_config: dict):
             {"role": "system", "content": system_instruction.strip()},
             {"role": "user", "content": [
                 {"type": "text", "text": user_instruction.strip()},
-                {"type": "image_url", "image_url": {"url": image_to_data_url(image_path)}}
+                {"type": "image_url", "image_url": {"url": data_url}}
             ]}
         ],
         "max_completion_tokens": 3000,
     }
 
-    max_retries = 3
+    # OpenAI는 API Key별 적응형 제한기, Local은 호출자가 넘긴 스케줄러 슬롯을 거쳐 요청
+    if limiter is None:
+        limiter = get_limiter(model_config)
+    max_retries = 5
     for attempt in range(max_retries):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=180)
+            started_at = limiter.acquire()
+            resp = None
+            try:
+                resp = requests.post(url, headers=headers, json=payload, timeout=180)
+            finally:
+                limiter.release(
+                    started_at,
+                    resp.status_code if resp is not None else None,
+                    resp.headers if resp is not None else None
+                )
             
             if resp.status_code == 200:
                 result = resp.json()
@@ -133,21 +138,19 @@ def describe_image(image_path: str, model_config: dict):
                 return content, usage_info
 
             elif resp.status_code == 429:
-                wait_time = (attempt + 1) * 5
-                print(f"[Rate Limit] 429 Error on {filename}. Waiting {wait_time}s... (Attempt {attempt+1}/{max_retries})")
-                time.sleep(wait_time)
+                # 대기 시간(Retry-After)은 limiter가 다음 acquire에서 반영
+                print(f"[Rate Limit] 429 Error on {filename}. Concurrency -> {int(limiter.limit)} (Attempt {attempt+1}/{max_retries})")
                 continue
             
             else:
                 print(f"[API Error] {resp.status_code}: {resp.text}")
                 if resp.status_code >= 500:
-                    time.sleep(3)
                     continue
                 raise RuntimeError(f"OpenAI API Error: {resp.status_code} - {resp.text}")
 
         except requests.exceptions.Timeout:
+            # 타임아웃도 limiter에 실패로 기록되어 잠시 보류됨
             print(f"[Timeout] {filename} timed out. Retrying...")
-            time.sleep(3)
             continue
             
         except Exception as e:
@@ -159,12 +162,8 @@ def describe_image(image_path: str, model_config: dict):
     raise RuntimeError(f"Failed to process {filename} after {max_retries} attempts.")
 
 def convert_ppt_to_pdf(ppt_path: str, output_dir: str):
-    subprocess.run(
-        ["soffice", "--headless", "--convert-to", "pdf", "--outdir", output_dir, ppt_path],
-        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    )
-    base = os.path.splitext(os.path.basename(ppt_path))[0]
-    return os.path.join(output_dir, f"{base}.pdf")
+    # 상주 LibreOffice 풀에서 변환 (작업마다 soffice를 새로 띄우지 않음)
+    return office_converter.convert(ppt_path, output_dir)
 
 def calculate_total_cost(model_id, total_usage, exchange_rate=1400):
     matched_model = next((m for m in PRICING_TABLE if m in model_id), "default")
@@ -185,110 +184,186 @@ def calculate_total_cost(model_id, total_usage, exchange_rate=1400):
 # Main Processing Logic
 # ==========================================
 
-def _process_job_internal(job_id: str, file_path: str, model_config: dict):
+# 분석 실패 슬라이드의 본문 머리말
+SLIDE_FAILED_MARK = "**[분석 실패]**"
+
+def _process_job_internal(job_id: str, file_path: str, model_config: dict, lease_owner: str = None, cancel=None):
     """
     실제 파일 처리 로직 (실시간 비용 로그 추가)
+    렌더링과 LLM 분석을 스트리밍 파이프라인으로 겹쳐서 수행합니다.
+    worker 모드: lease_owner는 워커 임대 ID, cancel은 임대를 잃으면 설정되는 Event
     """
     work_dir = os.path.join(settings.UPLOAD_DIR, job_id)
     os.makedirs(work_dir, exist_ok=True)
+    packager = None
     
     try:
         JobManager.start_processing(job_id)
         
-        # 1. 이미지 변환 (PDF/PPT -> Images)
-        images = []
+        # 1. 렌더링 대상 PDF 준비 (PPT -> PDF)
         ext = os.path.splitext(file_path)[1].lower()
         
         if ext == ".pdf":
-            raw_images = convert_from_path(file_path, fmt="png", dpi=150)
-            for i, img in enumerate(raw_images):
-                p = os.path.join(work_dir, f"page_{i+1:03d}.png"); img.save(p); images.append(p)
+            pdf_path = file_path
         elif ext in [".ppt", ".pptx"]:
             pdf_path = convert_ppt_to_pdf(file_path, work_dir)
-            raw_images = convert_from_path(pdf_path, fmt="png", dpi=150)
-            for i, img in enumerate(raw_images):
-                p = os.path.join(work_dir, f"page_{i+1:03d}.png"); img.save(p); images.append(p)
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {ext}")
 
         result_base = os.path.join(settings.RESULT_DIR, job_id)
-        result_images_dir = os.path.join(result_base, "images")
-        os.makedirs(result_images_dir, exist_ok=True)
-
-        total_pages = len(images)
+        # 보관용 이미지는 결과 zip에만 기록하고, 디스크 사본은 PDF를 작업마다 만드는 경우(wkhtmltopdf가 참조)에만 저장
+        result_images_dir = None
+        if settings.REPORT_PDF_MODE != "lazy":
+            result_images_dir = os.path.join(result_base, "images")
+            os.makedirs(result_images_dir, exist_ok=True)
+        # 결과 zip은 슬라이드가 끝날 때마다 바로 기록 (마지막에 폴더 전체를 다시 압축하지 않음)
+        packager = ResultPackager(job_id, lease_owner)
+
+        total_pages = count_pdf_pages(pdf_path)
         cumulative_usage = {"prompt": 0, "cached": 0, "completion": 0}
         results_map = {} 
+
+        # 이전 시도에서 체크포인트된 슬라이드는 다시 분석하지 않음
+        # (이미지는 디스크에 남기지 않으므로 다시 렌더링하여 새 결과 zip에 담음)
+        checkpoint = {}
+        resumed_usage = {"prompt": 0, "cached": 0, "completion": 0}
+        for idx, saved_slide in JobManager.get_slide_results(job_id).items():
+            if idx > total_pages:
+                continue
+            checkpoint[idx] = saved_slide
+            for k in resumed_usage:
+                resumed_usage[k] += saved_slide.get("usage", {}).get(k, 0)
+
+        if checkpoint:
+            # 이전 시도에서 이미 지불한 사용량도 이 작업의 총 비용에 포함
+            for k in cumulative_usage:
+                cumulative_usage[k] += resumed_usage[k]
+            resumed_usd, resumed_krw = calculate_total_cost(model_config['model_id'], resumed_usage)
+            resume_log = f"체크포인트에서 재개: {len(checkpoint)}/{total_pages} 슬라이드 재사용"
+            if model_config['provider'] == 'openai':
+                resume_log += f" (절감: ${resumed_usd} / ₩{resumed_krw:,})"
+            JobManager.update_progress(job_id, len(checkpoint), total_pages, resume_log)
         
         # 2. LLM 분석 (병렬 vs 순차)
+        # 렌더링은 현재 스레드에서 chunk 단위로 진행되고, 분석은 worker 스레드에서 진행됩니다.
+        # pending_slots 로 "렌더링은 끝났지만 아직 분석되지 않은" 페이지 수를 제한합니다.
         if model_config['provider'] == 'openai':
-            max_workers = 3
-            completed_count = 0
-            progress_lock = threading.Lock()
-
-            def process_single_slide(idx, img_path):
-                img_filename = os.path.basename(img_path)
-                shutil.copy2(img_path, os.path.join(result_images_dir, img_filename))
-                content, usage = describe_image(img_path, model_config)
-                return idx, content, usage, img_filename
-
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_idx = {
-                    executor.submit(process_single_slide, idx, img_path): idx 
-                    for idx, img_path in enumerate(images, 1)
-                }
-
-                for future in concurrent.futures.as_completed(future_to_idx):
-                    try:
-                        idx, content, usage, filename = future.result()
-                        results_map[idx] = (filename, content)
-                        
-                        with progress_lock:
-                            # 사용량 누적
-                            for k in cumulative_usage:
-                                cumulative_usage[k] += usage[k]
-                            completed_count += 1
-                            
-                            # 실시간 비용 계산
-                            usd_val, krw_val = calculate_total_cost(model_config['model_id'], cumulative_usage)
-                            cur_tokens = cumulative_usage['prompt'] + cumulative_usage['completion']
-                            
-                            # 로그 메시지에 비용 정보 포함
-                            log_msg = (
-                                f"분석 중 ({completed_count}/{total_pages}) | "
-                                f"누적 토큰: {cur_tokens:,} | "
-                                f"예상 비용: ${usd_val:.3f} (₩{krw_val:,})"
-                            )
-                            
-                            JobManager.update_progress(
-                                job_id, completed_count, total_pages, log_msg
-                            )
-                            
-                    except Exception as e:
-                        print(f"[FINAL ERROR] Slide processing failed: {e}")
-                        failed_idx = future_to_idx[future]
-                        results_map[failed_idx] = ("error.png", f"**[분석 실패]** 오류가 발생했습니다: {str(e)}")
-
+            # 실제 동시 요청 수는 API Key별 AdaptiveLimiter가 조절하며, 여기서는 상한만 지정
+            max_workers = settings.OPENAI_MAX_CONCURRENCY
+            slide_limiter = None
         else:
-            # Local LLM: 순차 처리
-            for idx, img_path in enumerate(images, 1):
-                img_filename = os.path.basename(img_path)
-                shutil.copy2(img_path, os.path.join(result_images_dir, img_filename))
-                
-                content, usage = describe_image(img_path, model_config)
-                
+            # Local LLM: 여러 슬라이드를 동시에 보내 서버(vLLM 등)의 continuous batching 활용
+            # 서버 전체의 동시 요청 수(LOCAL_MAX_INFLIGHT)는 gpu_scheduler가 사용자별로 공정하게 분배
+            # (worker 모드에서는 이 프로세스에 배정된 슬롯 수가 상한)
+            max_workers = gpu_scheduler.slots
+            gpu_scheduler.register(job_id, model_config['owner'], total_pages - len(checkpoint))
+            queue_pos = gpu_scheduler.queue_position(job_id)
+            if queue_pos:
+                JobManager.update_progress(job_id, 0, total_pages, f"대기열 진입: 앞선 작업 {queue_pos}개 처리 중")
+            slide_limiter = gpu_scheduler.gate(job_id)
+
+        pending_slots = threading.BoundedSemaphore(max(1, settings.MAX_PENDING_PAGES))
+        completed_count = len(checkpoint)
+        progress_lock = threading.Lock()
+        # 캐시 적중 시 사용량은 0으로 집계하고, 절감된 사용량은 별도로 누적
+        cache_stats = {"hit": 0, "miss": 0}
+        saved_usage = {"prompt": 0, "cached": 0, "completion": 0}
+
+        # 이미지 전송량 통계 (encoded: LLM용 인코딩 합계, sent: 캐시 미스로 실제 전송한 양)
+        image_stats = {"archive": 0, "encoded": 0, "sent": 0}
+
+        def restore_slide(idx, img):
+            # 체크포인트된 슬라이드: 분석은 건너뛰고 결과 zip에 넣을 보관용 이미지만 다시 인코딩
+            try:
+                img_filename, archive_data = encode_archive(img, idx, result_images_dir)
+                packager.add_bytes(f"images/{img_filename}", archive_data)
+                results_map[idx] = (img_filename, checkpoint[idx]["content"])
+            except Exception as e:
+                print(f"[FINAL ERROR] Slide restore failed: {e}")
+                results_map[idx] = ("error.png", f"{SLIDE_FAILED_MARK} 오류가 발생했습니다: {str(e)}")
+            finally:
+                img.close()
+                pending_slots.release()
+
+        def process_single_slide(idx, img):
+            nonlocal completed_count
+            if cancel is not None and cancel.is_set():
+                # 임대를 잃음: 남은 슬라이드는 새 워커가 처리
+                img.close()
+                pending_slots.release()
+                return
+            sent_bytes = 0
+            page = None
+            try:
+                # 보관용은 결과 zip에 바로 기록, LLM 전송용은 메모리에서 압축
+                page = encode_page(img, idx, result_images_dir)
+                img_filename = page.filename
+                packager.add_bytes(f"images/{img_filename}", page.archive_data)
+
+                # 동일 슬라이드(이미지 + 모델 + 프롬프트) 분석 결과가 캐시에 있으면 재사용
+                cache_key = SlideCache.make_key(page.data, model_config, img_filename)
+                cached = SlideCache.get(cache_key)
+                if cached:
+                    content, saved = cached
+                    usage = {"prompt": 0, "cached": 0, "completion": 0}
+                else:
+                    content, usage = describe_image(img_filename, page.data, page.mime, model_config, slide_limiter)
+                    SlideCache.put(cache_key, model_config['model_id'], content, usage)
+                    saved = None
+                    sent_bytes = len(page.data)
+                results_map[idx] = (img_filename, content)
+                JobManager.save_slide_result(job_id, idx, img_filename, content, usage)
+            except Exception as e:
+                print(f"[FINAL ERROR] Slide processing failed: {e}")
+                results_map[idx] = ("error.png", f"{SLIDE_FAILED_MARK} 오류가 발생했습니다: {str(e)}")
+                usage = {"prompt": 0, "cached": 0, "completion": 0}
+                saved = None
+            finally:
+                # 분석이 끝난 페이지는 메모리에서 바로 해제하고 슬롯 반환
+                img.close()
+                pending_slots.release()
+
+            with progress_lock:
+                if page is not None:
+                    image_stats["archive"] += page.archive_bytes
+                    image_stats["encoded"] += len(page.data)
+                    image_stats["sent"] += sent_bytes
                 # 사용량 누적
                 for k in cumulative_usage:
                     cumulative_usage[k] += usage[k]
+                if saved is not None:
+                    cache_stats["hit"] += 1
+                    for k in saved_usage:
+                        saved_usage[k] += saved.get(k, 0)
+                else:
+                    cache_stats["miss"] += 1
+                completed_count += 1
                 
-                results_map[idx] = (img_filename, content)
-
+                # 실시간 비용 계산
                 usd_val, krw_val = calculate_total_cost(model_config['model_id'], cumulative_usage)
                 cur_tokens = cumulative_usage['prompt'] + cumulative_usage['completion']
                 
+                # 로그 메시지에 비용 정보 포함
                 log_msg = (
-                    f"분석 중 ({idx}/{total_pages}) | "
-                    f"누적 토큰: {cur_tokens:,}"
+                    f"분석 중 ({completed_count}/{total_pages}) | "
+                    f"누적 토큰: {cur_tokens:,} | "
+                    f"캐시 적중: {cache_stats['hit']}/{completed_count}"
+                )
+                if model_config['provider'] == 'openai':
+                    log_msg += f" | 예상 비용: ${usd_val:.3f} (₩{krw_val:,})"
+                
+                JobManager.update_progress(
+                    job_id, completed_count, total_pages, log_msg
                 )
 
-                JobManager.update_progress(job_id, idx, total_pages, log_msg)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for idx, img in iter_pdf_pages(pdf_path, slots=pending_slots):
+                if cancel is not None and cancel.is_set():
+                    img.close()
+                    pending_slots.release()
+                    break
+                executor.submit(restore_slide if idx in checkpoint else process_single_slide, idx, img)
+        JobManager.check_lease(job_id, lease_owner, cancel)
 
         # 3. 결과 조합 (인덱스 순서대로)
         md_content = ""
@@ -306,90 +381,76 @@ def _process_job_internal(job_id: str, file_path: str, model_config: dict):
             final_log = f"작업 완료! 총 비용: ${usd_val} (약 ₩{krw_val:,}) | 총 토큰: {cumulative_usage['prompt'] + cumulative_usage['completion']}"
         else:
             final_log = f"작업 완료! 총 토큰: {cumulative_usage['prompt'] + cumulative_usage['completion']}"
+        if cache_stats["hit"] > 0:
+            # 캐시 적중분은 과금되지 않으므로 절감된 사용량을 같은 단가로 환산
+            saved_usd, saved_krw = calculate_total_cost(model_config['model_id'], saved_usage)
+            final_log += f" | 캐시 적중 {cache_stats['hit']}/미스 {cache_stats['miss']}"
+            if model_config['provider'] == 'openai':
+                final_log += f" (절감: ${saved_usd} / ₩{saved_krw:,})"
+        if image_stats["archive"] > 0:
+            # 보관본(기본 PNG, 기존 전송 방식)과 LLM 전송용 압축본의 크기 비교
+            mb = 1024 * 1024
+            reduced = 100 - image_stats["encoded"] * 100 // image_stats["archive"]
+            final_log += (
+                f" | 이미지 전송량: {image_stats['sent'] / mb:.1f}MB"
+                f" (보관본 {image_stats['archive'] / mb:.1f}MB 대비 {reduced}% 절감)"
+            )
         JobManager.update_progress(job_id, total_pages, total_pages, final_log)
         
         # Markdown 저장
-        md_file = os.path.join(result_base, "result.md")
-        with open(md_file, "w", encoding="utf-8") as f: f.write(md_content)
+        packager.add_bytes("result.md", md_content)
         
-        # PDF 생성
-        import markdown
-        raw_html = markdown.markdown(md_content)
+        # PDF 보고서 (REPORT_PDF_MODE=lazy 이면 작업 완료를 막지 않고 첫 다운로드 시 생성)
+        if settings.REPORT_PDF_MODE != "lazy":
+            packager.add_bytes("result.pdf", render_report_pdf(md_content, result_base))
         
-        # 절대 경로 변환 (wkhtmltopdf 에러 방지)
-        abs_image_dir = os.path.abspath(os.path.join(result_base, "images")).replace("\\", "/")
-        pdf_html_body = raw_html.replace('./images', f'file://{abs_image_dir}')
-
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: sans-serif; padding: 20px; line-height: 1.6; }}
-                img {{ max-width: 100%; height: auto; display: block; margin: 20px auto; border: 1px solid #ddd; }}
-                h2 {{ border-bottom: 2px solid #333; padding-bottom: 10px; margin-top: 30px; page-break-before: always; }}
-                h2:first-of-type {{ page-break-before: auto; }}
-                blockquote {{ background: #f9f9f9; border-left: 10px solid #ccc; margin: 1.5em 10px; padding: 0.5em 10px; }}
-            </style>
-        </head>
-        <body>
-            {pdf_html_body}
-        </body>
-        </html>
-        """
-
-        pdf_options = {
-            "quiet": "",
-            "enable-local-file-access": "", # 필수
-            "encoding": "UTF-8",
-            "no-outline": None
-        }
-
-        pdfkit.from_string(
-            full_html, 
-            os.path.join(result_base, "result.pdf"), 
-            options=pdf_options
-        )
-        
-        # 압축 및 정리
-        shutil.make_archive(os.path.join(settings.RESULT_DIR, job_id), 'zip', result_base)
-        
-        # [Cleanup] 압축 후 원본 폴더 삭제
+        # 결과 zip 교체 직전에 임대 확인 (다른 워커가 가져간 작업의 결과를 덮어쓰지 않음)
+        JobManager.check_lease(job_id, lease_owner, cancel)
+        result_url = packager.finish()
+            
+        # 실패한 슬라이드가 있는 결과는 중복 업로드 재사용 대상에서 제외
+        failed_slides = sum(1 for _, text in results_map.values() if text.startswith(SLIDE_FAILED_MARK))
+        if not JobManager.mark_completed(job_id, result_url, lease_owner, failed_slides):
+            raise LeaseLost(job_id)
+        JobManager.clear_slide_results(job_id)
+        # [Cleanup] 원본 폴더 삭제 (eager PDF 렌더링용 이미지 사본)
         if os.path.exists(result_base):
             shutil.rmtree(result_base)
-            
-        JobManager.mark_completed(job_id, f"/static/results/{job_id}.zip")
-
+        # [Cleanup] 임시 작업 폴더 및 업로드 원본 삭제 (실패한 작업은 재개를 위해 작업 삭제 시까지 보존)
+        UploadStore.remove_job_upload(job_id, file_path)
+
+    except LeaseLost:
+        # 다른 워커가 이어서 처리하므로 상태/파일은 건드리지 않음
+        print(f"[Worker] job {job_id}: 임대를 잃어 처리를 중단합니다.")
+        if packager is not None:
+            packager.abort()
     except Exception as e:
-        JobManager.mark_failed(job_id, str(e))
+        if packager is not None:
+            packager.abort()
+        JobManager.mark_failed(job_id, str(e), lease_owner)
     finally:
-        # [Cleanup] 임시 작업 폴더 및 업로드 원본 삭제
-        if os.path.exists(work_dir): shutil.rmtree(work_dir)
-        if os.path.exists(file_path): os.remove(file_path)
+        gpu_scheduler.unregister(job_id)
         
 
-def process_file_task(job_id: str, file_path: str):
+def process_file_task(job_id: str, file_path: str, lease_owner: str = None, cancel=None):
     """
     Celery나 BackgroundTasks에서 호출되는 진입점
+    (worker.py는 임대 ID와 임대 상실 시 설정되는 Event를 함께 전달)
     """
     job = JobManager.get_job(job_id)
     if not job: return
     
     owner = job.get("owner")
-    user_settings = AuthManager.get_user_settings(owner)
+    # 업로드 시점에 저장한 설정 스냅샷 사용 (실행 시점에 설정을 다시 읽지 않음)
+    user_settings = AuthManager.resolve_job_settings(owner, job.get("settings_snapshot"))
     
     try:
         model_config = get_target_model(user_settings)
     except Exception as e:
-        JobManager.mark_failed(job_id, f"설정 오류: {str(e)}")
+        JobManager.mark_failed(job_id, f"설정 오류: {str(e)}", lease_owner)
         return
+    model_config["owner"] = owner
 
-    # 모델 타입에 따라 Lock 사용 여부 결정
-    if model_config['provider'] == 'local':
-        print(f"[Queue] Job {job_id} is waiting for GPU lock...")
-        with local_gpu_lock:
-            _process_job_internal(job_id, file_path, model_config)
-    else:
-        print(f"[Queue] Job {job_id} is starting immediately (API Mode).")
-        _process_job_internal(job_id, file_path, model_config)
\ No newline at end of file
+    # GPU 자원 보호는 전역 Lock 대신 gpu_scheduler가 슬라이드 단위로 담당
+    print(f"[Queue] Job {job_id} is starting ({model_config['provider']} mode).")
+    _process_job_internal(job_id, file_path, model_config, lease_owner, cancel)
\ No newline at end of file
@@ -0,0 +1,127 @@
+# app/services/progress_writer.py
+
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from app.core.config import settings
+from app.db import history_col
+
+def log_push_ops(entries):
+    """
+    logs 배열에 추가하는 update 연산자 (ring buffer)
+    최근 JOB_LOG_CAP개만 유지하고, 지금까지 기록된 전체 개수는 log_total에 누적합니다.
+    (잘려나간 개수 = log_total - len(logs))
+    """
+    return {
+        "$push": {"logs": {"$each": list(entries), "$slice": -settings.JOB_LOG_CAP}},
+        "$inc": {"log_total": len(entries)}
+    }
+
+class _Pending:
+    def __init__(self):
+        self.fields = {}
+        self.logs = []
+        self.first_at = time.monotonic()
+
+class ProgressWriter:
+    """
+    작업 진행률 쓰기를 작업별로 모아서 한 번의 update_one으로 기록합니다.
+    - PROGRESS_FLUSH_SECONDS 가 지나거나 로그가 PROGRESS_FLUSH_LOGS 개 쌓이면 flush
+    - 백그라운드 스레드가 오래 머문 버퍼를 주기적으로 flush
+    - 완료/실패 기록은 final()로 감싸 진행 중인 flush가 끝난 뒤에 쓰고, 그 뒤에 진행률이 덮어쓰지 않도록 보장
+    """
+
+    _STRIPES = 64
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        # 작업별 쓰기 순서 보장 (버퍼를 꺼내는 시점부터 DB 쓰기가 끝날 때까지 유지)
+        self._write_locks = [threading.RLock() for _ in range(self._STRIPES)]
+
+    def _write_lock(self, job_id: str):
+        return self._write_locks[hash(job_id) % self._STRIPES]
+
+    def update(self, job_id: str, fields: dict, log_entry: str = None):
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if pending is None:
+                pending = self._pending[job_id] = _Pending()
+            pending.fields.update(fields)
+            if log_entry:
+                pending.logs.append(log_entry)
+            due = (
+                len(pending.logs) >= settings.PROGRESS_FLUSH_LOGS
+                or time.monotonic() - pending.first_at >= settings.PROGRESS_FLUSH_SECONDS
+            )
+        self._ensure_flusher()
+        if due:
+            self.flush(job_id)
+
+    def flush(self, job_id: str):
+        with self._lock:
+            if job_id not in self._pending:
+                return
+
+        with self._write_lock(job_id):
+            with self._lock:
+                # 다른 스레드가 먼저 flush 했을 수 있음
+                pending = self._pending.pop(job_id, None)
+            if pending is None:
+                return
+            fields, logs = dict(pending.fields), list(pending.logs)
+
+            update = {"$set": {**fields, "updated_at": datetime.now()}}
+            if logs:
+                update.update(log_push_ops(logs))
+            try:
+                history_col.update_one({"id": job_id}, update)
+            except Exception as e:
+                print(f"[WARN] 진행률 기록 실패 ({job_id}): {e}")
+
+    @contextmanager
+    def final(self, job_id: str):
+        """
+        완료/실패 등 최종 상태 기록용: 진행 중인 flush를 기다린 뒤 남은 진행률을 먼저 기록하고,
+        블록 안의 최종 쓰기가 끝날 때까지 같은 작업의 다른 flush를 막습니다.
+        """
+        with self._write_lock(job_id):
+            self.flush(job_id)
+            yield
+
+    def flush_all(self):
+        with self._lock:
+            job_ids = list(self._pending.keys())
+        for job_id in job_ids:
+            self.flush(job_id)
+
+    def discard(self, job_id: str):
+        with self._lock:
+            self._pending.pop(job_id, None)
+
+    def _ensure_flusher(self):
+        if self._flusher and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.PROGRESS_FLUSH_SECONDS)
+            now = time.monotonic()
+            with self._lock:
+                stale = [
+                    job_id for job_id, p in self._pending.items()
+                    if now - p.first_at >= settings.PROGRESS_FLUSH_SECONDS
+                ]
+            for job_id in stale:
+                self.flush(job_id)
+
+progress_writer = ProgressWriter()
+atexit.register(progress_writer.flush_all)
@@ -0,0 +1,78 @@
+# app/services/rasterizer.py
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pdf2image import convert_from_path, pdfinfo_from_path
+from app.core.config import settings
+
+def count_pdf_pages(pdf_path: str) -> int:
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+def _page_windows(pages, chunk_size: int):
+    """정렬된 페이지 번호 목록을 연속 구간 (first, last) 으로 묶습니다. (구간 길이 <= chunk_size)"""
+    windows = []
+    for page in pages:
+        if windows and page == windows[-1][1] + 1 and page - windows[-1][0] < chunk_size:
+            windows[-1][1] = page
+        else:
+            windows.append([page, page])
+    return [tuple(w) for w in windows]
+
+def _render_window(pdf_path: str, dpi: int, first: int, last: int):
+    # ppm: pdftoppm 출력을 재압축 없이 그대로 읽음 (인코딩은 image_encoder에서 1회)
+    return convert_from_path(pdf_path, fmt="ppm", dpi=dpi, first_page=first, last_page=last)
+
+def iter_pdf_pages(pdf_path: str, slots=None, chunk_size: int = None, dpi: int = None, skip_pages=None, processes: int = None):
+    """
+    PDF 전체를 한 번에 변환하지 않고 first_page/last_page 구간(chunk) 단위로 렌더링하여
+    페이지가 준비되는 즉시 (index, PIL 이미지)를 yield 합니다. (디스크에 중간 PNG를 쓰지 않음, close는 소비자 책임)
+    processes(RASTER_PROCESSES)개의 구간을 동시에 렌더링합니다. (구간마다 별도의 pdftoppm 프로세스)
+    yield 순서는 항상 페이지 순서입니다.
+    slots(Semaphore)가 주어지면 페이지마다 슬롯을 확보한 뒤 렌더링하므로
+    분석 대기 중인 페이지 수가 슬롯 수를 넘지 않습니다. (슬롯 반환은 소비자 책임)
+    skip_pages에 포함된 페이지(이미 분석된 체크포인트)는 렌더링하지 않습니다.
+    """
+    processes = max(1, processes or settings.RASTER_PROCESSES)
+    chunk_size = max(1, chunk_size or settings.RASTER_CHUNK_PAGES)
+    if slots is not None:
+        # 동시에 렌더링 중인 구간 전체가 슬롯 수를 넘으면 영원히 확보할 수 없으므로 제한
+        chunk_size = min(chunk_size, max(1, settings.MAX_PENDING_PAGES // processes))
+        processes = min(processes, max(1, settings.MAX_PENDING_PAGES))
+    dpi = dpi or settings.RASTER_DPI
+    total = count_pdf_pages(pdf_path)
+    skip_pages = skip_pages or set()
+    pages = [p for p in range(1, total + 1) if p not in skip_pages]
+    windows = iter(_page_windows(pages, chunk_size))
+
+    with ThreadPoolExecutor(max_workers=processes, thread_name_prefix="raster") as pool:
+        inflight = deque()
+
+        def submit_next():
+            window = next(windows, None)
+            if window is None:
+                return False
+            first, last = window
+            if slots is not None:
+                for _ in range(first, last + 1):
+                    slots.acquire()
+            inflight.append((first, last, pool.submit(_render_window, pdf_path, dpi, first, last)))
+            return True
+
+        for _ in range(processes):
+            if not submit_next():
+                break
+
+        while inflight:
+            first, last, future = inflight.popleft()
+            chunk = future.result()
+            for offset, img in enumerate(chunk):
+                yield first + offset, img
+
+            # 렌더러가 예상보다 적은 페이지를 돌려준 경우 남은 슬롯 반환
+            if slots is not None:
+                for _ in range(len(chunk), last - first + 1):
+                    slots.release()
+            del chunk
+
+            # 현재 구간을 넘겨준 뒤에 다음 구간의 슬롯을 확보해야 교착되지 않음
+            submit_next()
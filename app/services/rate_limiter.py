@@ -0,0 +1,125 @@
+# app/services/rate_limiter.py
+
+import re
+import time
+import hashlib
+import threading
+from app.core.config import settings
+
+# API Key별로 하나의 Limiter를 공유 (같은 사용자의 동시 작업들이 같은 한도를 나눠 씀)
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def parse_duration(value) -> float:
+    """
+    OpenAI 헤더의 기간 표기("1s", "6m0s", "120ms", "0.5")를 초 단위로 변환합니다.
+    """
+    if value is None:
+        return 0.0
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(num) * units[unit] for num, unit in _DURATION_RE.findall(value))
+
+class AdaptiveLimiter:
+    """
+    AIMD(Additive Increase / Multiplicative Decrease) 방식의 동시성 제한기
+    - 200 응답이 이어지면 동시 요청 수를 천천히 늘리고
+    - 429/5xx, 타임아웃, 지연시간 급증 시 절반으로 줄입니다.
+    - Retry-After 및 x-ratelimit-* 헤더가 있으면 해당 시간 동안 새 요청을 보류합니다.
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.latency_ewma = None
+        self.latency_floor = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        with self._cond:
+            while True:
+                wait = self.blocked_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return time.monotonic()
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, started_at: float, status_code: int = None, headers=None):
+        latency = time.monotonic() - started_at
+        headers = headers or {}
+
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                self._decrease(now)
+                retry_after = parse_duration(headers.get("retry-after"))
+                if not retry_after:
+                    # 헤더가 없으면 짧게 쉬었다가 재시도
+                    retry_after = 1.0
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+            elif status_code == 200:
+                self._observe_latency(latency, now)
+
+            # 남은 요청 한도가 0이면 리셋 시각까지 보류
+            remaining = headers.get("x-ratelimit-remaining-requests")
+            if remaining is not None and str(remaining).strip() == "0":
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                self.blocked_until = max(self.blocked_until, now + (reset or 1.0))
+
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float, now: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+        if self.latency_floor is None or self.latency_ewma < self.latency_floor:
+            self.latency_floor = self.latency_ewma
+
+        # 기준 지연시간 대비 크게 늘어나면 서버가 포화된 것으로 보고 감소
+        if self.latency_ewma > self.latency_floor * settings.OPENAI_LATENCY_BACKOFF_RATIO:
+            self._decrease(now)
+        else:
+            # 한도당 1회 성공마다 1/limit 증가 -> 대략 한 라운드에 +1
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, now: float):
+        # 동시에 실패한 요청들 때문에 한도가 연쇄적으로 줄어드는 것을 방지
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit / 2)
+        # 감소 후에는 지연시간 기준을 다시 측정
+        self.latency_floor = self.latency_ewma
+
+def _get_or_create(key: str, initial: int, min_limit: int, max_limit: int) -> AdaptiveLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveLimiter(initial, min_limit, max_limit)
+            _limiters[key] = limiter
+        return limiter
+
+def get_limiter(model_config: dict) -> AdaptiveLimiter:
+    """OpenAI API Key별 AIMD 제한기 (Local LLM은 scheduler.gpu_scheduler가 담당)"""
+    key = hashlib.sha256((model_config['api_key'] or "").encode("utf-8")).hexdigest()
+    return _get_or_create(
+        f"openai:{key}",
+        settings.OPENAI_INITIAL_CONCURRENCY,
+        settings.OPENAI_MIN_CONCURRENCY,
+        settings.OPENAI_MAX_CONCURRENCY
+    )
@@ -0,0 +1,100 @@
+# app/services/report_renderer.py
+
+import io
+import os
+import markdown
+from app.core.config import settings
+
+REPORT_CSS = """
+body { font-family: sans-serif; padding: 20px; line-height: 1.6; }
+img { max-width: 100%; height: auto; display: block; margin: 20px auto; border: 1px solid #ddd; }
+h2 { border-bottom: 2px solid #333; padding-bottom: 10px; margin-top: 30px; page-break-before: always; }
+h2:first-of-type { page-break-before: auto; }
+blockquote { background: #f9f9f9; border-left: 10px solid #ccc; margin: 1.5em 10px; padding: 0.5em 10px; }
+"""
+
+class WkhtmltopdfRenderer:
+    """기존 방식: wkhtmltopdf 프로세스 (pdfkit)"""
+
+    name = "wkhtmltopdf"
+
+    def render(self, md_content: str, base_dir: str) -> bytes:
+        import pdfkit
+
+        raw_html = markdown.markdown(md_content)
+        # 절대 경로 변환 (wkhtmltopdf 에러 방지)
+        abs_image_dir = os.path.abspath(os.path.join(base_dir, "images")).replace("\\", "/")
+        body = raw_html.replace('./images', f'file://{abs_image_dir}')
+        full_html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>{REPORT_CSS}</style>
+        </head>
+        <body>
+            {body}
+        </body>
+        </html>
+        """
+        pdf_options = {
+            "quiet": "",
+            "enable-local-file-access": "", # 필수
+            "encoding": "UTF-8",
+            "no-outline": None
+        }
+        # 출력 경로 False: 파일 대신 bytes로 반환
+        return pdfkit.from_string(full_html, False, options=pdf_options)
+
+class PyMuPDFRenderer:
+    """
+    프로세스 내 렌더러 (PyMuPDF Story)
+    외부 프로세스/HTML 전체 로딩 없이 페이지 단위로 배치하므로 빠르고 메모리 사용량이 적습니다.
+    (CSS 지원 범위가 작아 page-break 등 일부 스타일은 무시됨)
+    """
+
+    name = "pymupdf"
+
+    def render(self, md_content: str, base_dir: str) -> bytes:
+        import fitz
+
+        html = markdown.markdown(md_content).replace('src="./images/', 'src="images/')
+        css = REPORT_CSS
+        archive = fitz.Archive(base_dir)
+
+        # 한글 글꼴 (기본 내장 글꼴에는 한글이 없음)
+        font_path = settings.REPORT_FONT_PATH
+        if font_path and os.path.exists(font_path):
+            archive.add(os.path.dirname(font_path))
+            css += f"@font-face {{ font-family: report; src: url({os.path.basename(font_path)}); }}\n"
+            css += "body { font-family: report; }\n"
+
+        story = fitz.Story(html=html, user_css=css, archive=archive)
+        buf = io.BytesIO()
+        writer = fitz.DocumentWriter(buf)
+        mediabox = fitz.paper_rect("a4")
+        where = mediabox + (36, 36, -36, -36)
+        more = True
+        while more:
+            device = writer.begin_page(mediabox)
+            more, _ = story.place(where)
+            story.draw(device)
+            writer.end_page()
+        writer.close()
+        return buf.getvalue()
+
+_RENDERERS = {
+    WkhtmltopdfRenderer.name: WkhtmltopdfRenderer,
+    PyMuPDFRenderer.name: PyMuPDFRenderer,
+}
+
+def get_renderer(name: str = None):
+    name = name or settings.REPORT_PDF_BACKEND
+    renderer = _RENDERERS.get(name)
+    if renderer is None:
+        raise ValueError(f"지원하지 않는 PDF 렌더러입니다: {name}")
+    return renderer()
+
+def render_report_pdf(md_content: str, base_dir: str, backend: str = None) -> bytes:
+    """base_dir/images/ 의 이미지를 참조하는 Markdown 보고서를 PDF bytes로 변환"""
+    return get_renderer(backend).render(md_content, base_dir)
@@ -0,0 +1,66 @@
+# app/services/result_packager.py
+
+import os
+import re
+import zipfile
+import threading
+from app.core.config import settings
+from app.services.artifacts import artifact_url
+from app.services.zip_stream import compression_for
+
+class ResultPackager:
+    """
+    작업 결과 zip을 결과가 나오는 즉시 기록하는 스트리밍 패키저
+    - 마지막에 make_archive로 결과 폴더를 다시 읽어 압축하지 않음
+    - 이미지/PDF는 ZIP_STORED, 텍스트는 ZIP_DEFLATED
+    - 작성 중에는 .part 파일에 기록하고 finish()에서 최종 경로로 교체 (다운로드/중복 재사용 시 미완성 zip 노출 방지)
+    - 여러 분석 스레드에서 동시에 호출 가능
+    - owner(워커 임대 ID)를 주면 작성 중 파일을 워커별로 분리 (임대를 잃은 워커와 새 워커가 서로의 파일을 덮어쓰지 않음)
+    """
+
+    def __init__(self, job_id: str, owner: str = None):
+        self.job_id = job_id
+        self.path = os.path.join(settings.RESULT_DIR, f"{job_id}.zip")
+        suffix = f".{re.sub(r'[^A-Za-z0-9_-]', '_', owner)}.part" if owner else ".part"
+        self._tmp_path = self.path + suffix
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", allowZip64=True)
+        self._lock = threading.Lock()
+        self._names = set()
+        self._closed = False
+
+    def __contains__(self, arcname: str):
+        with self._lock:
+            return arcname in self._names
+
+    def add_bytes(self, arcname: str, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self._lock:
+            if arcname in self._names:
+                return
+            self._zip.writestr(arcname, data, compress_type=compression_for(arcname))
+            self._names.add(arcname)
+
+    def add_file(self, arcname: str, path: str):
+        with self._lock:
+            if arcname in self._names:
+                return
+            self._zip.write(path, arcname, compress_type=compression_for(arcname))
+            self._names.add(arcname)
+
+    def finish(self) -> str:
+        """zip을 닫고 최종 경로로 옮긴 뒤 다운로드 URL 반환"""
+        with self._lock:
+            self._zip.close()
+            self._closed = True
+            os.replace(self._tmp_path, self.path)
+        return artifact_url(self.job_id, "result.zip")
+
+    def abort(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._zip.close()
+            self._closed = True
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
@@ -0,0 +1,182 @@
+# app/services/scheduler.py
+
+import time
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from app.core.config import settings
+from app.services.rate_limiter import parse_duration
+
+# 연속 실패 시 작업별 재시도 대기 상한 (초)
+MAX_ERROR_BACKOFF = 30.0
+
+class _JobState:
+    def __init__(self, job_id: str, owner: str, total_units: int, seq: int):
+        self.job_id = job_id
+        self.owner = owner
+        self.remaining = max(0, total_units)
+        self.seq = seq
+        self.running = 0      # 현재 슬롯을 점유 중인 요청 수
+        self.waiting = 0      # 슬롯을 기다리는 요청 수
+        self.blocked_until = 0.0  # 429/5xx/타임아웃 후 이 시각까지 새 요청 보류
+        self.failures = 0         # 연속 실패 횟수 (대기 시간 지수 증가)
+
+class FairScheduler:
+    """
+    사용자 간 공정성을 보장하는 슬롯 스케줄러 (단일 프로세스 내)
+    - worker 모드처럼 여러 프로세스가 같은 서버를 쓰면 프로세스마다 별도로 동작하므로,
+      전체 상한은 프로세스 수로 나눈 슬롯으로 맞추고(resize) 공정성/대기 순서는 프로세스 안에서만 보장됩니다.
+    - slots: 동시에 실행 가능한 작업 단위 수 (예: GPU 서버 동시 요청 수)
+    - 단위(unit)마다 슬롯을 할당하며, 다음 순서로 우선순위를 정합니다.
+      1) 남은 단위가 small_job_units 이하인 작은 작업
+      2) 지금까지 적게 할당받은 사용자 (Start-time Fair Queuing)
+      3) 먼저 등록된 작업
+    """
+
+    def __init__(self, name: str, slots: int, small_job_units: int = 0):
+        self.name = name
+        self.slots = max(1, slots)
+        self.small_job_units = small_job_units
+        self._in_use = 0
+        self._jobs = {}
+        self._served = defaultdict(int)   # 사용자별 누적 할당 수
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def resize(self, slots: int):
+        """슬롯 수 변경 (이미 점유 중인 슬롯은 반환될 때까지 유지)"""
+        with self._cond:
+            self.slots = max(1, slots)
+            self._cond.notify_all()
+
+    def register(self, job_id: str, owner: str, total_units: int):
+        with self._cond:
+            if job_id not in self._jobs:
+                self._jobs[job_id] = _JobState(job_id, owner, total_units, next(self._seq))
+
+    def unregister(self, job_id: str):
+        with self._cond:
+            self._jobs.pop(job_id, None)
+            # 더 이상 활동하지 않는 사용자의 누적 기록은 정리
+            active_owners = {j.owner for j in self._jobs.values()}
+            for owner in list(self._served):
+                if owner not in active_owners:
+                    del self._served[owner]
+            self._cond.notify_all()
+
+    def _key(self, job: _JobState):
+        small = 0 if job.remaining <= self.small_job_units else 1
+        return (small, self._served[job.owner], job.seq)
+
+    def _next_job(self):
+        now = time.monotonic()
+        # 보류 중인 작업은 후보에서 제외 (다른 작업이 슬롯을 쓸 수 있도록)
+        candidates = [j for j in self._jobs.values() if j.waiting > 0 and j.blocked_until <= now]
+        if not candidates:
+            return None
+        return min(candidates, key=self._key)
+
+    def acquire(self, job_id: str) -> float:
+        with self._cond:
+            job = self._jobs[job_id]
+            if job.waiting == 0 and job.running == 0:
+                # 새로 활동을 시작한 사용자가 쌓아둔 몫으로 독점하지 않도록 보정
+                active = [self._served[j.owner] for j in self._jobs.values()
+                          if j.owner != job.owner and (j.waiting or j.running)]
+                if active:
+                    self._served[job.owner] = max(self._served[job.owner], min(active))
+            job.waiting += 1
+            try:
+                while not (self._in_use < self.slots and self._next_job() is job):
+                    wait = job.blocked_until - time.monotonic()
+                    self._cond.wait(timeout=wait if wait > 0 else None)
+            finally:
+                job.waiting -= 1
+            job.running += 1
+            self._in_use += 1
+            self._served[job.owner] += 1
+            # 다른 대기자도 빈 슬롯이 남았는지 확인할 수 있도록 깨움
+            self._cond.notify_all()
+            return time.monotonic()
+
+    def release(self, job_id: str, completed: bool = True, failed: bool = False, retry_after: float = 0.0):
+        """
+        completed=False 이면 재시도할 요청이므로 남은 단위 수를 줄이지 않습니다.
+        failed=True (429/5xx/타임아웃) 이면 Retry-After 또는 지수 대기 동안 이 작업의 새 요청을 보류합니다.
+        """
+        with self._cond:
+            self._in_use -= 1
+            job = self._jobs.get(job_id)
+            if job:
+                job.running -= 1
+                if completed:
+                    job.remaining = max(0, job.remaining - 1)
+                    job.failures = 0
+                elif failed:
+                    job.failures += 1
+                    backoff = retry_after or min(MAX_ERROR_BACKOFF, 2.0 ** (job.failures - 1))
+                    job.blocked_until = max(job.blocked_until, time.monotonic() + backoff)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, job_id: str):
+        self.acquire(job_id)
+        try:
+            yield
+        finally:
+            self.release(job_id)
+
+    def gate(self, job_id: str):
+        """describe_image 등 limiter 인터페이스(acquire/release)를 기대하는 곳에 전달할 객체"""
+        return _JobGate(self, job_id)
+
+    def queue_position(self, job_id: str):
+        """
+        이 작업보다 먼저 처리될 작업 수를 반환합니다.
+        (이 스케줄러가 모르는 작업이면 None)
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.running > 0:
+                return 0
+
+            my_key = self._key(job)
+            ahead = 0
+            for other in self._jobs.values():
+                if other is job:
+                    continue
+                if other.waiting > 0 and self._key(other) < my_key:
+                    ahead += 1
+                elif other.running > 0 and self._in_use >= self.slots:
+                    ahead += 1
+            return ahead
+
+class _JobGate:
+    def __init__(self, scheduler: FairScheduler, job_id: str):
+        self._scheduler = scheduler
+        self._job_id = job_id
+        self.limit = scheduler.slots
+
+    def acquire(self) -> float:
+        return self._scheduler.acquire(self._job_id)
+
+    def release(self, started_at: float, status_code: int = None, headers=None):
+        failed = status_code is None or status_code == 429 or status_code >= 500
+        retry_after = parse_duration((headers or {}).get("retry-after")) if failed else 0.0
+        self._scheduler.release(self._job_id, completed=(status_code == 200), failed=failed, retry_after=retry_after)
+
+# Local LLM 서버: 슬라이드 단위 스케줄링
+# (worker.py는 프로세스마다 LOCAL_MAX_INFLIGHT / 프로세스 수 로 줄여서 사용)
+gpu_scheduler = FairScheduler("gpu", settings.LOCAL_MAX_INFLIGHT, settings.SMALL_JOB_PAGES)
+# 오디오 변환 서버: 작업 단위 스케줄링 (한 번에 하나)
+audio_scheduler = FairScheduler("audio", 1)
+
+def get_queue_position(job_id: str):
+    for scheduler in (gpu_scheduler, audio_scheduler):
+        pos = scheduler.queue_position(job_id)
+        if pos is not None:
+            return pos
+    return None
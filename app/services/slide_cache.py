@@ -0,0 +1,90 @@
+# app/services/slide_cache.py
+
+import hashlib
+import itertools
+from datetime import datetime
+from app.core.config import settings
+from app.db import slide_cache_col
+from app.db.prompt import default_system_prompt, default_user_prompt
+
+class SlideCache:
+    """
+    슬라이드 분석 결과 캐시 (Content-addressed)
+    렌더링된 페이지 바이트 + 모델 + 프롬프트의 해시를 키로 사용하여
+    동일한 슬라이드를 다시 LLM에 보내지 않도록 합니다.
+    """
+
+    # 여러 분석 스레드가 동시에 증가시키므로 원자적으로 증가하는 카운터 사용 (next()는 GIL 하에서 원자적)
+    _put_counter = itertools.count(1)
+
+    @staticmethod
+    def make_key(image_bytes: bytes, model_config: dict, filename: str):
+        system_prompt = model_config.get("system_prompt") or default_system_prompt
+        user_template = model_config.get("user_prompt_template") or default_user_prompt
+
+        h = hashlib.sha256()
+        h.update(hashlib.sha256(image_bytes).digest())
+        for part in (model_config["model_id"], system_prompt.strip(), user_template.strip()):
+            h.update(b"\x00" + part.encode("utf-8"))
+        # 사용자 프롬프트가 파일명을 포함하면 결과도 파일명에 의존하므로 키에 포함
+        if "{filename}" in user_template:
+            h.update(b"\x00" + filename.encode("utf-8"))
+        return h.hexdigest()
+
+    @staticmethod
+    def get(key: str):
+        if not settings.SLIDE_CACHE_ENABLED:
+            return None
+        try:
+            entry = slide_cache_col.find_one_and_update(
+                {"key": key},
+                {"$set": {"last_used_at": datetime.now()}, "$inc": {"hits": 1}},
+                {"_id": 0, "content": 1, "usage": 1}
+            )
+        except Exception as e:
+            print(f"[WARN] 슬라이드 캐시 조회 실패: {e}")
+            return None
+        if not entry:
+            return None
+        return entry["content"], entry.get("usage", {"prompt": 0, "cached": 0, "completion": 0})
+
+    @staticmethod
+    def put(key: str, model_id: str, content: str, usage: dict):
+        if not settings.SLIDE_CACHE_ENABLED:
+            return
+        now = datetime.now()
+        try:
+            slide_cache_col.update_one(
+                {"key": key},
+                {
+                    "$set": {
+                        "content": content,
+                        "usage": usage,
+                        "model_id": model_id,
+                        "last_used_at": now
+                    },
+                    "$setOnInsert": {"created_at": now, "hits": 0}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            print(f"[WARN] 슬라이드 캐시 저장 실패: {e}")
+            return
+
+        # 크기 기반 정리는 매번 하지 않고 일정 횟수마다 수행
+        if next(SlideCache._put_counter) % 100 == 0:
+            SlideCache.evict_overflow()
+
+    @staticmethod
+    def evict_overflow():
+        """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제 (LRU)"""
+        try:
+            overflow = slide_cache_col.estimated_document_count() - settings.SLIDE_CACHE_MAX_ENTRIES
+            if overflow <= 0:
+                return
+            stale = slide_cache_col.find({}, {"_id": 1}).sort("last_used_at", 1).limit(overflow)
+            ids = [doc["_id"] for doc in stale]
+            if ids:
+                slide_cache_col.delete_many({"_id": {"$in": ids}})
+        except Exception as e:
+            print(f"[WARN] 슬라이드 캐시 정리 실패: {e}")
@@ -0,0 +1,275 @@
+# app/services/upload_store.py
+
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.db import upload_sessions_col
+
+class UploadTooLarge(Exception):
+    """업로드 크기 제한 초과"""
+    pass
+
+class UploadConflict(Exception):
+    """분할 업로드의 offset이 서버가 받은 위치와 다름 (클라이언트는 GET으로 위치 확인 후 재시도)"""
+    pass
+
+class UploadStore:
+    """
+    업로드 파일 저장소
+    - 클라이언트 파일명 대신 작업(job_id)/업로드 ID 단위 경로에 저장하여 동시 업로드 충돌 방지
+    - 큰 단위로 스트리밍 저장하면서 SHA-256 해시를 함께 계산 (중복 감지/캐시 조회용)
+    - 재개 가능한 분할 업로드 (대용량 강의 녹음용)
+    """
+
+    PARTIAL_DIR = os.path.join(settings.UPLOAD_DIR, "partial")
+    # 조각 기록 중 선점(offset 잠금)이 이 시간보다 오래되면 중단된 요청으로 보고 다시 선점 허용
+    WRITE_CLAIM_SECONDS = 300
+    TEMP_DIR = os.path.join(settings.UPLOAD_DIR, "tmp")
+
+    # 분할 업로드의 진행 중 해시 (upload_id -> (다음 offset, hasher))
+    # 프로세스가 바뀌면 완료 시점에 파일을 다시 읽어 계산
+    _hashers = {}
+    _hashers_lock = threading.Lock()
+
+    @staticmethod
+    def safe_filename(filename: str) -> str:
+        name = os.path.basename((filename or "").replace("\\", "/")).strip()
+        name = re.sub(r'[\x00-\x1f<>:"|?*]', "_", name)
+        if name in ("", ".", ".."):
+            name = "upload"
+        return name
+
+    @staticmethod
+    def job_upload_path(job_id: str, filename: str) -> str:
+        """작업 전용 폴더 (processor의 work_dir과 동일, 작업 삭제 시 함께 정리됨)"""
+        job_dir = os.path.join(settings.UPLOAD_DIR, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        return os.path.join(job_dir, UploadStore.safe_filename(filename))
+
+    @staticmethod
+    def temp_upload_path(filename: str) -> str:
+        temp_dir = os.path.join(UploadStore.TEMP_DIR, str(uuid.uuid4()))
+        os.makedirs(temp_dir, exist_ok=True)
+        return os.path.join(temp_dir, UploadStore.safe_filename(filename))
+
+    @staticmethod
+    def remove_temp(path: str):
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    @staticmethod
+    def remove_job_upload(job_id: str, file_path: str = None):
+        """작업 완료/삭제 시 업로드 원본과 작업 폴더 정리 (실패한 작업은 재개를 위해 남겨둠)"""
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        shutil.rmtree(os.path.join(settings.UPLOAD_DIR, job_id), ignore_errors=True)
+
+    @staticmethod
+    def save_stream(src, dest_path: str, max_bytes: int):
+        """
+        파일 객체를 dest_path에 스트리밍 저장하고 (sha256, size) 반환
+        제한을 넘는 순간 중단하고 부분 파일을 삭제합니다.
+        """
+        buffer_size = settings.UPLOAD_BUFFER_KB * 1024
+        hasher = hashlib.sha256()
+        size = 0
+        tmp_path = dest_path + ".part"
+
+        try:
+            with open(tmp_path, "wb") as out:
+                while True:
+                    chunk = src.read(buffer_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"파일 크기 제한({max_bytes // (1024 * 1024)}MB)을 초과했습니다.")
+                    hasher.update(chunk)
+                    out.write(chunk)
+            os.replace(tmp_path, dest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return hasher.hexdigest(), size
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        buffer_size = settings.UPLOAD_BUFFER_KB * 1024
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(buffer_size), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    # --- 재개 가능한 분할 업로드 ---
+
+    @staticmethod
+    def _part_path(upload_id: str) -> str:
+        return os.path.join(UploadStore.PARTIAL_DIR, f"{upload_id}.part")
+
+    @staticmethod
+    def _public(session: dict) -> dict:
+        return {
+            "upload_id": session["upload_id"],
+            "filename": session["filename"],
+            "size": session["size"],
+            "received": session["received"],
+            "part_size": settings.UPLOAD_PART_MAX_MB * 1024 * 1024
+        }
+
+    @staticmethod
+    def create_session(owner: str, filename: str, size: int, max_bytes: int):
+        if size <= 0:
+            raise ValueError("파일 크기가 올바르지 않습니다.")
+        if size > max_bytes:
+            raise UploadTooLarge(f"파일 크기 제한({max_bytes // (1024 * 1024)}MB)을 초과했습니다.")
+
+        UploadStore.purge_stale_parts()
+        os.makedirs(UploadStore.PARTIAL_DIR, exist_ok=True)
+
+        upload_id = str(uuid.uuid4())
+        open(UploadStore._part_path(upload_id), "wb").close()
+
+        session = {
+            "upload_id": upload_id,
+            "owner": owner,
+            "filename": UploadStore.safe_filename(filename),
+            "size": size,
+            "received": 0,
+            "created_at": datetime.now()  # TTL 인덱스로 미완료 업로드 자동 만료
+        }
+        upload_sessions_col.insert_one(session)
+        with UploadStore._hashers_lock:
+            UploadStore._hashers[upload_id] = (0, hashlib.sha256())
+        return UploadStore._public(session)
+
+    @staticmethod
+    def get_session(owner: str, upload_id: str):
+        session = upload_sessions_col.find_one({"upload_id": upload_id, "owner": owner}, {"_id": 0})
+        return UploadStore._public(session) if session else None
+
+    @staticmethod
+    def write_part(owner: str, upload_id: str, offset: int, data: bytes):
+        """offset 위치에 조각을 기록하고 갱신된 세션 반환 (없으면 None)"""
+        session = upload_sessions_col.find_one({"upload_id": upload_id, "owner": owner}, {"_id": 0})
+        if not session:
+            return None
+        if offset != session["received"]:
+            raise UploadConflict(f"offset {offset} != received {session['received']}")
+        if offset + len(data) > session["size"]:
+            raise UploadTooLarge("선언한 파일 크기를 초과했습니다.")
+
+        # 같은 offset에 동시에 쓰는 요청이 있으면 하나만 기록하도록 먼저 offset을 선점
+        # (기록 도중 프로세스가 죽은 경우를 위해 오래된 선점은 무시)
+        now = datetime.now()
+        claimed = upload_sessions_col.find_one_and_update(
+            {
+                "upload_id": upload_id,
+                "owner": owner,
+                "received": offset,
+                "completing": {"$ne": True},
+                "$or": [{"writing": None}, {"writing_at": {"$lt": now - timedelta(seconds=UploadStore.WRITE_CLAIM_SECONDS)}}]
+            },
+            {"$set": {"writing": offset, "writing_at": now}},
+            projection={"_id": 0}
+        )
+        if not claimed:
+            raise UploadConflict("다른 요청이 같은 위치를 기록 중이거나 먼저 기록했습니다.")
+
+        try:
+            with open(UploadStore._part_path(upload_id), "r+b") as f:
+                f.seek(offset)
+                f.write(data)
+                f.truncate()
+
+            with UploadStore._hashers_lock:
+                state = UploadStore._hashers.get(upload_id)
+                if state and state[0] == offset:
+                    state[1].update(data)
+                    UploadStore._hashers[upload_id] = (offset + len(data), state[1])
+                else:
+                    UploadStore._hashers.pop(upload_id, None)
+        except Exception:
+            upload_sessions_col.update_one({"upload_id": upload_id, "writing": offset}, {"$set": {"writing": None}})
+            with UploadStore._hashers_lock:
+                UploadStore._hashers.pop(upload_id, None)
+            raise
+
+        upload_sessions_col.update_one(
+            {"upload_id": upload_id, "writing": offset},
+            {"$set": {"received": offset + len(data), "writing": None}}
+        )
+
+        claimed["received"] = offset + len(data)
+        return UploadStore._public(claimed)
+
+    @staticmethod
+    def complete_session(owner: str, upload_id: str, dest_path: str):
+        """모든 조각을 받은 업로드를 dest_path로 옮기고 (sha256, size) 반환"""
+        # 동시에 들어온 완료 요청 중 하나만 처리
+        session = upload_sessions_col.find_one_and_update(
+            {
+                "upload_id": upload_id,
+                "owner": owner,
+                "completing": {"$ne": True},
+                "writing": None,
+                "$expr": {"$eq": ["$received", "$size"]}
+            },
+            {"$set": {"completing": True}},
+            projection={"_id": 0}
+        )
+        if not session:
+            current = upload_sessions_col.find_one({"upload_id": upload_id, "owner": owner}, {"_id": 0})
+            if not current:
+                return None
+            if current.get("completing"):
+                raise UploadConflict("이미 완료 처리 중인 업로드입니다.")
+            raise UploadConflict(f"업로드가 완료되지 않았습니다. ({current['received']}/{current['size']} bytes)")
+
+        part_path = UploadStore._part_path(upload_id)
+        try:
+            with UploadStore._hashers_lock:
+                state = UploadStore._hashers.pop(upload_id, None)
+            if state and state[0] == session["size"]:
+                file_hash = state[1].hexdigest()
+            else:
+                file_hash = UploadStore.hash_file(part_path)
+
+            shutil.move(part_path, dest_path)
+        except Exception:
+            upload_sessions_col.update_one({"upload_id": upload_id}, {"$set": {"completing": False}})
+            raise
+        upload_sessions_col.delete_one({"upload_id": upload_id})
+        return file_hash, session["size"]
+
+    @staticmethod
+    def discard_session(owner: str, upload_id: str) -> bool:
+        result = upload_sessions_col.delete_one({"upload_id": upload_id, "owner": owner})
+        if result.deleted_count == 0:
+            return False
+        with UploadStore._hashers_lock:
+            UploadStore._hashers.pop(upload_id, None)
+        part_path = UploadStore._part_path(upload_id)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return True
+
+    @staticmethod
+    def purge_stale_parts():
+        """TTL로 세션이 만료된 뒤 남은 조각 파일 정리"""
+        if not os.path.isdir(UploadStore.PARTIAL_DIR):
+            return
+        cutoff = datetime.now().timestamp() - settings.UPLOAD_SESSION_TTL_HOURS * 3600
+        try:
+            for name in os.listdir(UploadStore.PARTIAL_DIR):
+                path = os.path.join(UploadStore.PARTIAL_DIR, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError as e:
+            print(f"[WARN] 만료된 분할 업로드 정리 실패: {e}")
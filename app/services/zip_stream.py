@@ -0,0 +1,72 @@
+# app/services/zip_stream.py
+
+import io
+import os
+import zipfile
+
+# 이미 압축된 포맷은 다시 압축해도 크기가 줄지 않으므로 그대로 저장
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".pdf", ".zip", ".mp3", ".m4a"}
+
+CHUNK_SIZE = 256 * 1024
+
+def compression_for(arcname: str):
+    ext = os.path.splitext(arcname)[1].lower()
+    return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+class _StreamBuffer(io.RawIOBase):
+    """zipfile이 쓰는 바이트를 모아두었다가 응답으로 흘려보내는 버퍼 (seek 불가 → data descriptor 모드)"""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_zip(entries):
+    """
+    (arcname, 파일 경로) 목록을 임시 파일 없이 zip 스트림으로 생성
+    파일 하나도 CHUNK_SIZE 단위로 흘려보내므로 메모리 사용량이 파일 크기와 무관합니다.
+    """
+    buf = _StreamBuffer()
+    with zipfile.ZipFile(buf, "w", allowZip64=True) as zf:
+        for arcname, path in entries:
+            zinfo = zipfile.ZipInfo.from_file(path, arcname)
+            zinfo.compress_type = compression_for(arcname)
+            with open(path, "rb") as src, zf.open(zinfo, "w") as dest:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = buf.drain()
+                    if data:
+                        yield data
+            data = buf.drain()
+            if data:
+                yield data
+    # 중앙 디렉터리
+    data = buf.drain()
+    if data:
+        yield data
+
+def walk_entries(root: str):
+    """폴더 아래 파일을 (상대 경로 arcname, 절대 경로)로 나열"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, root).replace(os.sep, "/"), path
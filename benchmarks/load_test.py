@@ -0,0 +1,94 @@
+# benchmarks/load_test.py
+"""
+동시 요청 처리량 측정 스크립트
+
+실행 중인 서버에 로그인한 뒤 여러 스레드에서 API를 동시에 호출하고
+초당 처리 요청 수(req/s)와 지연 시간 분포를 출력합니다.
+변경 전/후 커밋에서 같은 옵션으로 실행해 결과를 비교하세요.
+
+    python benchmarks/load_test.py --username admin --password pass \
+        --concurrency 32 --requests 2000
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_PATHS = ["/api/jobs?limit=20", "/api/docs/nodes", "/api/docs/folders", "/api/settings/usage"]
+
+def _login(base_url: str, username: str, password: str) -> str:
+    res = requests.post(f"{base_url}/api/auth/login", data={"username": username, "password": password}, timeout=30)
+    res.raise_for_status()
+    session_id = res.cookies.get("session_id")
+    if not session_id:
+        raise SystemExit("로그인 실패: session_id 쿠키가 없습니다.")
+    return session_id
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+def run(base_url: str, session_id: str, paths, concurrency: int, total: int):
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int):
+        nonlocal errors
+        # 스레드별 세션으로 커넥션 재사용
+        session = getattr(local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set("session_id", session_id)
+            local.session = session
+
+        path = paths[i % len(paths)]
+        started = time.perf_counter()
+        try:
+            ok = session.get(f"{base_url}{path}", timeout=60).status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    ms = [v * 1000 for v in latencies]
+    print(f"requests    : {total} (errors {errors})")
+    print(f"concurrency : {concurrency}")
+    print(f"wall time   : {wall:.2f}s")
+    print(f"throughput  : {total / wall:.1f} req/s")
+    print(f"latency ms  : mean {statistics.mean(ms):.1f} / p50 {_percentile(ms, 50):.1f} "
+          f"/ p95 {_percentile(ms, 95):.1f} / p99 {_percentile(ms, 99):.1f} / max {max(ms):.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="API 동시 요청 부하 테스트")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths", help="호출할 경로 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    session_id = _login(base_url, args.username, args.password)
+    run(base_url, session_id, args.paths or DEFAULT_PATHS, args.concurrency, args.requests)
+
+if __name__ == "__main__":
+    main()
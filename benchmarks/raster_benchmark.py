@@ -0,0 +1,87 @@
+# benchmarks/raster_benchmark.py
+"""
+PDF 래스터화 병렬 처리 벤치마크
+
+50/200/500 페이지 PDF를 RASTER_PROCESSES 값별로 렌더링하여 소요 시간과 속도 향상을 출력합니다.
+(MongoDB 없이 실행 가능, poppler(pdftoppm)와 Pillow/pdf2image 필요)
+
+    python benchmarks/raster_benchmark.py
+    python benchmarks/raster_benchmark.py --pdf lecture.pdf --processes 1 2 4 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from app.services.rasterizer import iter_pdf_pages, count_pdf_pages
+
+def _fixture_page(i: int):
+    img = Image.new("RGB", (1280, 720), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, 1280, 90], fill=(30, 60, 120))
+    draw.text((40, 30), f"Lecture fixture - slide {i + 1}", fill="white")
+    for line in range(12):
+        y = 130 + line * 40
+        draw.text((60, y), f"- bullet {line + 1}: " + "lorem ipsum " * (4 + (i + line) % 5), fill=(20, 20, 20))
+    draw.ellipse([900, 300, 1200, 600], outline=(200, 60, 60), width=6)
+    return img
+
+FIXTURE_BATCH_PAGES = 25
+
+def make_fixture(path: str, pages: int):
+    """
+    슬라이드 비슷한 페이지(제목, 본문 줄, 도형)로 구성된 PDF 생성
+    Pillow는 append_images를 모두 메모리에 올린 뒤 저장하므로, 일정 페이지씩 나누어 기존 파일에 이어 씀
+    """
+    for start in range(0, pages, FIXTURE_BATCH_PAGES):
+        batch = [_fixture_page(i) for i in range(start, min(pages, start + FIXTURE_BATCH_PAGES))]
+        try:
+            batch[0].save(path, "PDF", resolution=96, save_all=True, append_images=batch[1:], append=start > 0)
+        finally:
+            for img in batch:
+                img.close()
+
+def render_all(pdf_path: str, processes: int, dpi: int, chunk: int) -> float:
+    started = time.perf_counter()
+    for _, img in iter_pdf_pages(pdf_path, chunk_size=chunk, dpi=dpi, processes=processes):
+        img.close()
+    return time.perf_counter() - started
+
+def main():
+    cpu = os.cpu_count() or 1
+    default_procs = sorted({1, 2, 4, cpu // 2 or 1, cpu})
+    parser = argparse.ArgumentParser(description="pdftoppm 병렬 래스터화 벤치마크")
+    parser.add_argument("--pdf", help="고정 PDF 대신 사용할 파일")
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--processes", type=int, nargs="+", default=default_procs)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--chunk", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            fixtures = [args.pdf]
+        else:
+            fixtures = []
+            for pages in args.pages:
+                path = os.path.join(tmp, f"fixture_{pages}.pdf")
+                make_fixture(path, pages)
+                fixtures.append(path)
+
+        print(f"cpu={cpu} dpi={args.dpi} chunk={args.chunk}")
+        print(f"{'pages':>6} {'procs':>6} {'seconds':>9} {'pages/s':>8} {'speedup':>8}")
+        for path in fixtures:
+            pages = count_pdf_pages(path)
+            baseline = None
+            for procs in args.processes:
+                elapsed = render_all(path, procs, args.dpi, args.chunk)
+                baseline = baseline or elapsed
+                print(f"{pages:>6} {procs:>6} {elapsed:>9.2f} {pages / elapsed:>8.1f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/report_benchmark.py
+"""
+PDF 보고서 렌더러 벤치마크
+
+슬라이드 수별로 가상의 보고서(이미지 + Markdown)를 만들고 REPORT_PDF_BACKEND 후보별
+렌더링 시간과 최대 메모리(RSS)를 출력합니다. 각 렌더링은 별도 프로세스에서 실행하여
+이전 실행의 메모리가 섞이지 않게 합니다. (Linux/macOS, MongoDB 불필요)
+
+    python benchmarks/report_benchmark.py
+    python benchmarks/report_benchmark.py --slides 50 300 --backends pymupdf
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+SLIDE_TEXT = (
+    "### 핵심 내용\n\n"
+    "- 이 슬라이드는 벤치마크용 예시입니다.\n"
+    "- **강조된 문장**과 `코드`, 그리고 목록을 포함합니다.\n\n"
+    "> 인용문: 렌더러 성능 비교를 위한 본문\n\n"
+    + "본문 문단입니다. " * 40 + "\n"
+)
+
+def make_report(base_dir: str, slides: int) -> str:
+    images_dir = os.path.join(base_dir, "images")
+    os.makedirs(images_dir, exist_ok=True)
+    md = ""
+    for idx in range(1, slides + 1):
+        fname = f"page_{idx:03d}.png"
+        img = Image.new("RGB", (1600, 900), "white")
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([0, 0, 1600, 120], fill=(30, 60, 120))
+        draw.text((40, 40), f"Slide {idx}", fill="white")
+        for line in range(14):
+            draw.text((60, 160 + line * 45), "benchmark bullet " * 6, fill=(30, 30, 30))
+        img.save(os.path.join(images_dir, fname))
+        img.close()
+        md += f"## Slide {idx}\n\n![{fname}](./images/{fname})\n\n{SLIDE_TEXT}\n\n---\n\n"
+    return md
+
+def _max_rss_mb(who) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _render_child(backend: str, md: str, base_dir: str, conn):
+    from app.services.report_renderer import render_report_pdf
+
+    before = _max_rss_mb(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        pdf = render_report_pdf(md, base_dir, backend)
+        elapsed = time.perf_counter() - started
+        peak = max(_max_rss_mb(resource.RUSAGE_SELF) - before, _max_rss_mb(resource.RUSAGE_CHILDREN))
+        conn.send((elapsed, peak, len(pdf), None))
+    except Exception as e:
+        conn.send((None, None, None, f"{type(e).__name__}: {e}"))
+
+def run_one(backend: str, md: str, base_dir: str):
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_render_child, args=(backend, md, base_dir, child))
+    proc.start()
+    result = parent.recv()
+    proc.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 보고서 렌더러 벤치마크")
+    parser.add_argument("--slides", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument("--backends", nargs="+", default=["wkhtmltopdf", "pymupdf"])
+    args = parser.parse_args()
+
+    print(f"{'slides':>6} {'backend':>12} {'seconds':>9} {'peak MB':>9} {'pdf MB':>8}")
+    for slides in args.slides:
+        with tempfile.TemporaryDirectory() as base_dir:
+            md = make_report(base_dir, slides)
+            for backend in args.backends:
+                elapsed, peak, size, error = run_one(backend, md, base_dir)
+                if error:
+                    print(f"{slides:>6} {backend:>12}  실패: {error}")
+                    continue
+                print(f"{slides:>6} {backend:>12} {elapsed:>9.2f} {peak:>9.1f} {size / (1024 * 1024):>8.1f}")
+
+if __name__ == "__main__":
+    main()
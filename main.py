@@ -1,13 +1,40 @@
 # main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from app.core.config import settings
 from app.routes import view_routes, auth_routes, job_routes, user_routes, doc_routes
+from app.db.indexes import ensure_indexes_in_background
 import os
 
 app = FastAPI(title="LecAI")
 
+@app.on_event("startup")
+async def check_job_events_source():
+    # 워커 프로세스의 진행 상황은 local pub/sub으로 전달되지 않음 (대시보드가 갱신되지 않는 설정)
+    if settings.JOB_EXECUTION_MODE == "worker" and settings.JOB_EVENTS_SOURCE == "local":
+        raise RuntimeError("JOB_EXECUTION_MODE=worker 에서는 JOB_EVENTS_SOURCE=changestream 이 필요합니다.")
+
+@app.on_event("startup")
+async def create_indexes():
+    # 인덱스 생성은 요청 처리를 막지 않도록 백그라운드에서 수행
+    ensure_indexes_in_background()
+
+# 멀티파트 업로드는 라우트 실행 전에 본문을 모두 받으므로, 선언된 크기로 먼저 거절
+UPLOAD_LIMITS = {
+    "/api/upload": settings.MAX_UPLOAD_MB * 1024 * 1024,
+    "/api/docs/upload": settings.MAX_DOC_UPLOAD_MB * 1024 * 1024,
+}
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    limit = UPLOAD_LIMITS.get(request.url.path)
+    declared = request.headers.get("content-length")
+    # 멀티파트 헤더 여유분 1MB
+    if limit and declared and declared.isdigit() and int(declared) > limit + 1024 * 1024:
+        return JSONResponse(status_code=413, content={"detail": f"파일 크기 제한({limit // (1024 * 1024)}MB)을 초과했습니다."})
+    return await call_next(request)
+
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     return FileResponse(os.path.join("static", "favicon.ico"))
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""
+공통 테스트 설정
+- MongoDB 대신 mongomock(메모리)을 사용하도록 app.db import 전에 MongoClient를 교체
+- 파일을 쓰는 저장소(업로드/blob)는 테스트마다 임시 폴더를 사용
+"""
+
+import os
+import sys
+
+import mongomock
+import pymongo
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.db는 import 시점에 MongoClient를 만들므로 그 전에 교체
+os.environ.setdefault("MONGO_HOST", "localhost")
+os.environ.setdefault("MONGO_PORT", "27017")
+os.environ.setdefault("MONGO_USERNAME", "test")
+os.environ.setdefault("MONGO_PASSWORD", "test")
+pymongo.MongoClient = mongomock.MongoClient
+
+from app.core.config import settings  # noqa: E402
+from app import db as app_db  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """테스트마다 빈 컬렉션에서 시작"""
+    for name in app_db.db.list_collection_names():
+        app_db.db[name].delete_many({})
+    yield
+
+@pytest.fixture
+def storage_dirs(tmp_path, monkeypatch):
+    """업로드/blob 저장 경로를 임시 폴더로 변경"""
+    from app.services.blob_store import BlobStore
+    from app.services.upload_store import UploadStore
+
+    upload_dir = tmp_path / "uploads"
+    blob_dir = tmp_path / "blobs"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "DOCS_BLOB_DIR", str(blob_dir))
+    monkeypatch.setattr(UploadStore, "PARTIAL_DIR", str(upload_dir / "partial"))
+    monkeypatch.setattr(UploadStore, "TEMP_DIR", str(upload_dir / "tmp"))
+    monkeypatch.setattr(BlobStore, "TEMP_DIR", str(blob_dir / "tmp"))
+    return tmp_path
@@ -0,0 +1,70 @@
+# tests/test_blob_store.py
+
+import io
+import os
+
+from app.db import blobs_col
+from app.services.blob_store import BlobStore
+
+def _refcount(key):
+    doc = blobs_col.find_one({"key": key})
+    return doc["refcount"] if doc else 0
+
+def test_same_content_is_stored_once(storage_dirs):
+    key1, size = BlobStore.put_stream(io.BytesIO(b"slide"), "a.PNG")
+    key2, _ = BlobStore.put_stream(io.BytesIO(b"slide"), "b.png")
+
+    assert key1 == key2
+    assert key1.endswith(".png")
+    assert size == 5
+    assert _refcount(key1) == 2
+    assert BlobStore.read_text(key1) == "slide"
+    # 임시 파일은 남지 않음
+    assert os.listdir(BlobStore.TEMP_DIR) == []
+
+def test_release_removes_file_at_zero(storage_dirs):
+    key, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+    assert BlobStore.retain([key])
+    assert _refcount(key) == 2
+
+    BlobStore.release([key])
+    assert _refcount(key) == 1
+    assert os.path.exists(BlobStore.path(key))
+
+    BlobStore.release([key])
+    assert blobs_col.find_one({"key": key}) is None
+    assert not os.path.exists(BlobStore.path(key))
+
+def test_retain_rolls_back_when_a_blob_is_missing(storage_dirs):
+    key, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+
+    assert not BlobStore.retain([key, "missing"])
+    assert _refcount(key) == 1
+
+def test_retain_rejects_blob_whose_file_is_gone(storage_dirs):
+    key, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+    os.remove(BlobStore.path(key))
+
+    assert not BlobStore.retain([key])
+    # 추가했던 참조만 되돌리고 기존 참조는 유지
+    assert _refcount(key) == 1
+
+def test_remove_file_restores_when_referenced_again(storage_dirs):
+    key, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+    # release가 참조 기록을 지운 직후, 파일을 치우기 전에 다른 요청이 같은 내용을 다시 참조한 상황
+    blobs_col.delete_one({"key": key})
+    blobs_col.insert_one({"key": key, "refcount": 1, "size": 7})
+
+    BlobStore._remove_file(key)
+    assert os.path.exists(BlobStore.path(key))
+    assert [n for n in os.listdir(BlobStore.TEMP_DIR) if n.endswith(".trash")] == []
+
+def test_put_after_release_recreates_file(storage_dirs):
+    key, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+    BlobStore.release([key])
+    assert not os.path.exists(BlobStore.path(key))
+
+    key2, _ = BlobStore.put_stream(io.BytesIO(b"content"), "x.md")
+    assert key2 == key
+    assert _refcount(key) == 1
+    assert os.path.exists(BlobStore.path(key))
@@ -0,0 +1,57 @@
+# tests/test_doc_manager.py
+
+import os
+import zipfile
+
+import pytest
+
+from app.db import blobs_col
+from app.services.blob_store import BlobStore
+from app.services.doc_manager import DocManager
+
+@pytest.fixture
+def result_zip(storage_dirs):
+    path = storage_dirs / "result.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("result.md", "## Slide 1\n\n![page_001.png](./images/page_001.png)\n")
+        zf.writestr("images/page_001.png", b"png-bytes")
+        zf.writestr("__MACOSX/._result.md", b"junk")
+    return str(path)
+
+def _refcounts():
+    return {doc["key"]: doc["refcount"] for doc in blobs_col.find()}
+
+def test_listings_hide_file_manifest(result_zip):
+    doc = DocManager.upload_zip_doc("alice", result_zip, "lecture.zip")
+    assert "files" not in doc
+
+    nodes = DocManager.get_nodes("alice")
+    assert [n["id"] for n in nodes] == [doc["id"]]
+    assert "files" not in nodes[0]
+    assert "files" not in DocManager.get_node("alice", doc["id"])
+    # 숨김 항목은 저장하지 않음
+    assert len(_refcounts()) == 2
+
+def test_import_shares_blobs_and_delete_releases_once(result_zip):
+    first = DocManager.import_job_doc("alice", "job1", result_zip, "lecture.pptx")
+    second = DocManager.import_job_doc("bob", "job1", result_zip, "lecture.pptx")
+    assert set(_refcounts().values()) == {2}
+
+    assert DocManager.delete_node("alice", first["id"])
+    # 같은 노드를 다시 삭제해도 참조는 한 번만 감소
+    assert not DocManager.delete_node("alice", first["id"])
+    assert set(_refcounts().values()) == {1}
+
+    keys = list(_refcounts())
+    assert DocManager.delete_node("bob", second["id"])
+    assert _refcounts() == {}
+    assert not any(os.path.exists(BlobStore.path(key)) for key in keys)
+
+def test_deleting_folder_releases_children(result_zip):
+    folder = DocManager.create_folder("alice", "week1")
+    DocManager.upload_zip_doc("alice", result_zip, "lecture.zip", parent_id=folder["id"])
+    assert _refcounts()
+
+    assert DocManager.delete_node("alice", folder["id"])
+    assert DocManager.get_nodes("alice", folder["id"]) == []
+    assert _refcounts() == {}
@@ -0,0 +1,147 @@
+# tests/test_progress_writer.py
+
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.db import history_col
+from app.services import progress_writer as progress_module
+from app.services.progress_writer import ProgressWriter, log_push_ops
+
+class _RecordingCollection:
+    """update_one 호출을 기록하는 컬렉션 래퍼 (선택적으로 쓰기 도중 대기)"""
+
+    def __init__(self, col):
+        self._col = col
+        self.updates = []
+        self.block = None      # 설정되면 update_one이 이 Event를 기다림
+        self.entered = threading.Event()
+
+    def update_one(self, query, update, **kwargs):
+        self.entered.set()
+        if self.block is not None:
+            self.block.wait(2)
+        self.updates.append(update)
+        return self._col.update_one(query, update, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._col, name)
+
+@pytest.fixture
+def writer(monkeypatch):
+    # 백그라운드 flush가 테스트 중에 끼어들지 않도록 주기를 길게
+    monkeypatch.setattr(settings, "PROGRESS_FLUSH_SECONDS", 60.0)
+    monkeypatch.setattr(settings, "PROGRESS_FLUSH_LOGS", 3)
+    monkeypatch.setattr(settings, "JOB_LOG_CAP", 5)
+    col = _RecordingCollection(history_col)
+    monkeypatch.setattr(progress_module, "history_col", col)
+    history_col.insert_one({"id": "job", "status": "processing", "logs": [], "log_total": 0})
+    return ProgressWriter(), col
+
+def test_updates_are_coalesced_until_flush(writer):
+    pw, col = writer
+    pw.update("job", {"progress": 10}, "a")
+    pw.update("job", {"progress": 20}, "b")
+    assert col.updates == []
+
+    pw.flush("job")
+    assert len(col.updates) == 1
+    doc = history_col.find_one({"id": "job"})
+    assert doc["progress"] == 20
+    assert doc["logs"] == ["a", "b"]
+
+    # 버퍼가 비었으면 다시 쓰지 않음
+    pw.flush("job")
+    assert len(col.updates) == 1
+
+def test_flushes_when_log_threshold_reached(writer):
+    pw, col = writer
+    for entry in ("a", "b", "c"):
+        pw.update("job", {"progress": 1}, entry)
+    assert len(col.updates) == 1
+    assert history_col.find_one({"id": "job"})["logs"] == ["a", "b", "c"]
+
+def test_log_cap_keeps_recent_entries_and_total(writer):
+    pw, _ = writer
+    history_col.update_one({"id": "job"}, log_push_ops([str(i) for i in range(8)]))
+    doc = history_col.find_one({"id": "job"})
+    assert doc["logs"] == ["3", "4", "5", "6", "7"]
+    assert doc["log_total"] == 8
+
+def test_final_writes_pending_progress_first(writer):
+    pw, col = writer
+    pw.update("job", {"progress": 90}, "almost done")
+    with pw.final("job"):
+        history_col.update_one({"id": "job"}, {"$set": {"status": "completed", "progress": 100}})
+
+    assert len(col.updates) == 1
+    doc = history_col.find_one({"id": "job"})
+    assert doc["status"] == "completed"
+    assert doc["progress"] == 100
+    assert doc["logs"] == ["almost done"]
+
+def test_final_waits_for_inflight_flush(writer):
+    pw, col = writer
+    pw.update("job", {"status": "processing", "progress": 50}, "working")
+
+    # 진행률 flush가 DB 쓰기 도중 멈춰 있는 상태
+    col.block = threading.Event()
+    flusher = threading.Thread(target=pw.flush, args=("job",), daemon=True)
+    flusher.start()
+    assert col.entered.wait(2)
+
+    final_done = threading.Event()
+
+    def finish():
+        with pw.final("job"):
+            col.update_one({"id": "job"}, {"$set": {"status": "completed"}})
+        final_done.set()
+
+    finisher = threading.Thread(target=finish, daemon=True)
+    finisher.start()
+    # 진행 중인 flush가 끝나기 전에는 최종 상태를 쓰지 않음
+    assert not final_done.wait(0.1)
+
+    col.block.set()
+    flusher.join(timeout=2)
+    assert final_done.wait(2)
+    # 늦게 끝난 진행률 쓰기가 최종 상태를 덮어쓰지 않음
+    assert [u["$set"]["status"] for u in col.updates] == ["processing", "completed"]
+    assert history_col.find_one({"id": "job"})["status"] == "completed"
+
+def test_flush_blocked_while_final_in_progress(writer):
+    pw, col = writer
+    release = threading.Event()
+    inside = threading.Event()
+
+    def finish():
+        with pw.final("job"):
+            inside.set()
+            release.wait(2)
+            col.update_one({"id": "job"}, {"$set": {"status": "failed"}})
+
+    finisher = threading.Thread(target=finish, daemon=True)
+    finisher.start()
+    assert inside.wait(2)
+
+    pw.update("job", {"progress": 60}, "late progress")
+    flusher = threading.Thread(target=pw.flush, args=("job",), daemon=True)
+    flusher.start()
+    flusher.join(0.1)
+    assert flusher.is_alive()
+    assert col.updates == []
+
+    release.set()
+    finisher.join(timeout=2)
+    flusher.join(timeout=2)
+    # 최종 기록이 끝난 뒤에 flush됨
+    assert col.updates[0]["$set"] == {"status": "failed"}
+    assert col.updates[1]["$set"]["progress"] == 60
+
+def test_discard_drops_pending(writer):
+    pw, col = writer
+    pw.update("job", {"progress": 10}, "a")
+    pw.discard("job")
+    pw.flush_all()
+    assert col.updates == []
@@ -0,0 +1,113 @@
+# tests/test_rasterizer.py
+"""pdftoppm 없이 구간 분할/슬롯/순서만 검증 (렌더링 함수는 가짜로 교체)"""
+
+import time
+import random
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services import rasterizer
+from app.services.rasterizer import _page_windows, iter_pdf_pages
+
+class _FakeImage:
+    def __init__(self, page):
+        self.page = page
+
+    def close(self):
+        pass
+
+class _FakeRenderer:
+    def __init__(self, total, short_windows=()):
+        self.total = total
+        self.short_windows = set(short_windows)   # 페이지를 하나 덜 돌려줄 구간 시작 페이지
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def info(self, pdf_path):
+        return {"Pages": self.total}
+
+    def convert(self, pdf_path, fmt, dpi, first_page, last_page):
+        with self._lock:
+            self.calls.append((first_page, last_page))
+        # 구간마다 렌더링 시간이 달라도 yield 순서는 페이지 순서여야 함
+        time.sleep(random.uniform(0, 0.01))
+        last = last_page - 1 if first_page in self.short_windows else last_page
+        return [_FakeImage(p) for p in range(first_page, last + 1)]
+
+class _CountingSlots:
+    """확보/반환 수를 세는 Semaphore (동시에 확보된 최대 수 기록)"""
+
+    def __init__(self, value):
+        self._sem = threading.Semaphore(value)
+        self._lock = threading.Lock()
+        self.held = 0
+        self.max_held = 0
+
+    def acquire(self):
+        self._sem.acquire()
+        with self._lock:
+            self.held += 1
+            self.max_held = max(self.max_held, self.held)
+
+    def release(self):
+        with self._lock:
+            self.held -= 1
+        self._sem.release()
+
+@pytest.fixture
+def renderer(monkeypatch):
+    def install(total, short_windows=()):
+        fake = _FakeRenderer(total, short_windows)
+        monkeypatch.setattr(rasterizer, "pdfinfo_from_path", fake.info)
+        monkeypatch.setattr(rasterizer, "convert_from_path", fake.convert)
+        return fake
+    return install
+
+def test_page_windows():
+    assert _page_windows([1, 2, 3, 5, 6, 9], 2) == [(1, 2), (3, 3), (5, 6), (9, 9)]
+    assert _page_windows([], 4) == []
+    assert _page_windows([1, 2, 3, 4], 10) == [(1, 4)]
+
+def test_yields_every_page_in_order(renderer):
+    fake = renderer(23)
+    pages = [idx for idx, img in iter_pdf_pages("x.pdf", chunk_size=4, processes=3)]
+    assert pages == list(range(1, 24))
+    assert max(last - first + 1 for first, last in fake.calls) <= 4
+
+def test_skip_pages_are_not_rendered(renderer):
+    fake = renderer(10)
+    pages = [idx for idx, _ in iter_pdf_pages("x.pdf", chunk_size=3, processes=2, skip_pages={1, 2, 5})]
+    assert pages == [3, 4, 6, 7, 8, 9, 10]
+    rendered = {p for first, last in fake.calls for p in range(first, last + 1)}
+    assert rendered.isdisjoint({1, 2, 5})
+
+def test_slots_bound_pending_pages(renderer, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_PENDING_PAGES", 4)
+    renderer(30)
+    slots = _CountingSlots(4)
+
+    pages = []
+    for idx, img in iter_pdf_pages("x.pdf", slots=slots, chunk_size=8, processes=4):
+        pages.append(idx)
+        img.close()
+        slots.release()
+
+    assert pages == list(range(1, 31))
+    assert slots.max_held <= 4
+    assert slots.held == 0
+
+def test_slots_released_for_short_windows(renderer, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_PENDING_PAGES", 4)
+    # 첫 구간(1~2)에서 렌더러가 페이지를 하나 덜 돌려줌
+    renderer(6, short_windows={1})
+    slots = _CountingSlots(4)
+
+    pages = []
+    for idx, img in iter_pdf_pages("x.pdf", slots=slots, chunk_size=2, processes=2):
+        pages.append(idx)
+        slots.release()
+
+    assert 2 not in pages
+    assert slots.held == 0
@@ -0,0 +1,88 @@
+# tests/test_rate_limiter.py
+
+import time
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limiter import AdaptiveLimiter, parse_duration
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 0.0),
+    ("0.5", 0.5),
+    ("1s", 1.0),
+    ("120ms", 0.12),
+    ("6m0s", 360.0),
+    ("1h2m3s", 3723.0),
+    ("garbage", 0.0),
+])
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == pytest.approx(expected)
+
+def test_success_increases_limit_additively(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_LATENCY_BACKOFF_RATIO", 1000.0)
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=4)
+
+    limiter.release(limiter.acquire(), 200)
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(20):
+        limiter.release(limiter.acquire(), 200)
+    # 상한을 넘지 않음
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+def test_429_halves_limit_and_honors_retry_after():
+    limiter = AdaptiveLimiter(initial=8, min_limit=1, max_limit=16)
+
+    before = time.monotonic()
+    limiter.release(limiter.acquire(), 429, {"retry-after": "2s"})
+    assert limiter.limit == 4
+    assert 1.5 <= limiter.blocked_until - before <= 2.5
+
+    # 같은 시점에 실패한 다른 요청 때문에 연쇄적으로 줄어들지 않음
+    limiter.blocked_until = 0.0
+    limiter.release(limiter.acquire(), 503)
+    assert limiter.limit == 4
+
+def test_decrease_respects_min_limit():
+    limiter = AdaptiveLimiter(initial=2, min_limit=2, max_limit=8)
+    limiter.release(limiter.acquire(), 500)
+    assert limiter.limit == 2
+
+def test_timeout_without_header_blocks_briefly():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8)
+    before = time.monotonic()
+    limiter.release(limiter.acquire(), None)
+    assert 0.5 <= limiter.blocked_until - before <= 1.5
+
+def test_exhausted_quota_blocks_until_reset():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8)
+    before = time.monotonic()
+    limiter.release(limiter.acquire(), 200, {
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "3s",
+    })
+    assert 2.5 <= limiter.blocked_until - before <= 3.5
+
+def test_latency_spike_decreases_limit(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_LATENCY_BACKOFF_RATIO", 2.0)
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8)
+    limiter.latency_ewma = limiter.latency_floor = 0.01
+
+    # 기준 지연시간보다 크게 느린 성공 응답
+    limiter.release(time.monotonic() - 1.0, 200)
+    assert limiter.limit == 2
+
+def test_acquire_waits_for_free_slot():
+    limiter = AdaptiveLimiter(initial=1, min_limit=1, max_limit=1)
+    first = limiter.acquire()
+
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()), daemon=True)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(first, 200)
+    assert acquired.wait(2)
+    thread.join(timeout=2)
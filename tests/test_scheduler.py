@@ -0,0 +1,177 @@
+# tests/test_scheduler.py
+
+import time
+import threading
+
+from app.services.scheduler import FairScheduler
+
+def _wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+def _acquire_in_thread(scheduler, job_id, order):
+    def run():
+        scheduler.acquire(job_id)
+        order.append(job_id)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def _waiting(scheduler, job_id):
+    return scheduler._jobs[job_id].waiting > 0
+
+def test_small_job_goes_first():
+    scheduler = FairScheduler("test", 1, small_job_units=5)
+    scheduler.register("holder", "u0", 100)
+    scheduler.register("big", "u1", 100)
+    scheduler.register("small", "u2", 3)
+
+    scheduler.acquire("holder")
+    order = []
+    threads = [_acquire_in_thread(scheduler, "big", order)]
+    assert _wait_for(lambda: _waiting(scheduler, "big"))
+    threads.append(_acquire_in_thread(scheduler, "small", order))
+    assert _wait_for(lambda: _waiting(scheduler, "small"))
+
+    # 큰 작업이 먼저 기다렸어도 남은 단위가 적은 작업이 먼저 슬롯을 받음
+    scheduler.release("holder")
+    assert _wait_for(lambda: order == ["small"])
+    scheduler.release("small")
+    assert _wait_for(lambda: order == ["small", "big"])
+    scheduler.release("big")
+    for thread in threads:
+        thread.join(timeout=2)
+
+def test_least_served_owner_goes_first():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("a1", "alice", 100)
+    scheduler.register("a2", "alice", 100)
+    scheduler.register("b1", "bob", 100)
+
+    scheduler.acquire("a1")
+    order = []
+    threads = [_acquire_in_thread(scheduler, "a2", order)]
+    assert _wait_for(lambda: _waiting(scheduler, "a2"))
+    threads.append(_acquire_in_thread(scheduler, "b1", order))
+    assert _wait_for(lambda: _waiting(scheduler, "b1"))
+
+    # 새로 들어온 bob은 alice와 같은 몫에서 시작하므로 먼저 등록된 a2가 먼저
+    scheduler.release("a1")
+    assert _wait_for(lambda: order == ["a2"])
+
+    # alice가 더 많이 할당받았으므로 먼저 등록된 a1보다 bob이 먼저
+    threads.append(_acquire_in_thread(scheduler, "a1", order))
+    assert _wait_for(lambda: _waiting(scheduler, "a1"))
+    scheduler.release("a2")
+    assert _wait_for(lambda: order == ["a2", "b1"])
+    scheduler.release("b1")
+    assert _wait_for(lambda: order == ["a2", "b1", "a1"])
+    scheduler.release("a1")
+    for thread in threads:
+        thread.join(timeout=2)
+
+def test_release_frees_slot_and_counts_units():
+    scheduler = FairScheduler("test", 2)
+    scheduler.register("job", "u", 3)
+
+    scheduler.acquire("job")
+    scheduler.acquire("job")
+    assert scheduler._in_use == 2
+
+    scheduler.release("job")
+    # 재시도할 요청은 남은 단위 수를 줄이지 않음
+    scheduler.release("job", completed=False)
+    assert scheduler._in_use == 0
+    assert scheduler._jobs["job"].remaining == 2
+    assert scheduler._jobs["job"].running == 0
+
+    with scheduler.slot("job"):
+        assert scheduler._in_use == 1
+    assert scheduler._in_use == 0
+
+def test_queue_position():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("first", "u1", 10)
+    scheduler.register("second", "u2", 10)
+    assert scheduler.queue_position("unknown") is None
+
+    scheduler.acquire("first")
+    assert scheduler.queue_position("first") == 0
+    # 슬롯이 모두 사용 중이면 실행 중인 작업 뒤에서 기다림
+    assert scheduler.queue_position("second") == 1
+    scheduler.release("first")
+    assert scheduler.queue_position("second") == 0
+
+def test_failed_release_blocks_only_that_job():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("failing", "u1", 10)
+    scheduler.register("other", "u2", 10)
+
+    scheduler.acquire("failing")
+    scheduler.release("failing", completed=False, failed=True, retry_after=0.3)
+    assert scheduler._jobs["failing"].blocked_until > time.monotonic()
+
+    # 보류 중에도 다른 작업은 바로 슬롯을 받음
+    started = time.monotonic()
+    scheduler.acquire("other")
+    assert time.monotonic() - started < 0.2
+    scheduler.release("other")
+
+    started = time.monotonic()
+    scheduler.acquire("failing")
+    assert time.monotonic() - started >= 0.25
+    scheduler.release("failing")
+    assert scheduler._jobs["failing"].failures == 0
+
+def test_gate_parses_retry_after_on_429():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("job", "u", 10)
+    gate = scheduler.gate("job")
+
+    started_at = gate.acquire()
+    before = time.monotonic()
+    gate.release(started_at, 429, {"retry-after": "5"})
+    job = scheduler._jobs["job"]
+    assert job.failures == 1
+    assert 4.5 <= job.blocked_until - before <= 5.5
+    assert job.remaining == 10
+
+    # 성공 응답은 남은 단위를 줄이고 실패 횟수를 초기화
+    job.blocked_until = 0.0
+    gate.release(gate.acquire(), 200, {})
+    assert job.remaining == 9
+    assert job.failures == 0
+
+def test_unregister_wakes_waiters():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("a", "u1", 10)
+    scheduler.register("b", "u2", 10)
+    scheduler.acquire("a")
+
+    order = []
+    thread = _acquire_in_thread(scheduler, "b", order)
+    assert _wait_for(lambda: _waiting(scheduler, "b"))
+    scheduler.release("a")
+    scheduler.unregister("a")
+    assert _wait_for(lambda: order == ["b"])
+    scheduler.release("b")
+    thread.join(timeout=2)
+
+def test_resize_wakes_waiters():
+    scheduler = FairScheduler("test", 1)
+    scheduler.register("a", "u1", 10)
+    scheduler.register("b", "u2", 10)
+    scheduler.acquire("a")
+
+    order = []
+    thread = _acquire_in_thread(scheduler, "b", order)
+    assert _wait_for(lambda: _waiting(scheduler, "b"))
+    scheduler.resize(2)
+    assert _wait_for(lambda: order == ["b"])
+    scheduler.release("a")
+    scheduler.release("b")
+    thread.join(timeout=2)
@@ -0,0 +1,125 @@
+# tests/test_upload_store.py
+
+import io
+import os
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import upload_sessions_col
+from app.services.upload_store import UploadStore, UploadConflict, UploadTooLarge
+
+MAX_BYTES = 1024 * 1024
+
+def _session(upload_id):
+    return upload_sessions_col.find_one({"upload_id": upload_id})
+
+def test_save_stream_hashes_and_enforces_limit(storage_dirs):
+    dest = UploadStore.job_upload_path("job1", "../../lecture.pdf")
+    assert os.path.dirname(dest).endswith("job1")
+    assert os.path.basename(dest) == "lecture.pdf"
+
+    file_hash, size = UploadStore.save_stream(io.BytesIO(b"pdf-bytes"), dest, MAX_BYTES)
+    assert file_hash == hashlib.sha256(b"pdf-bytes").hexdigest()
+    assert size == 9
+
+    with pytest.raises(UploadTooLarge):
+        UploadStore.save_stream(io.BytesIO(b"x" * 10), dest + "2", 5)
+    assert not os.path.exists(dest + "2.part")
+
+def test_parts_are_written_in_order_and_completed(storage_dirs):
+    data = b"0123456789"
+    upload = UploadStore.create_session("alice", "talk.mp3", len(data), MAX_BYTES)
+    upload_id = upload["upload_id"]
+
+    assert UploadStore.write_part("alice", upload_id, 0, data[:4])["received"] == 4
+    # 이미 받은 위치를 다시 보내거나 건너뛰면 충돌
+    with pytest.raises(UploadConflict):
+        UploadStore.write_part("alice", upload_id, 0, data[:4])
+    with pytest.raises(UploadConflict):
+        UploadStore.write_part("alice", upload_id, 8, data[8:])
+    assert UploadStore.write_part("alice", upload_id, 4, data[4:])["received"] == 10
+
+    dest = str(storage_dirs / "talk.mp3")
+    file_hash, size = UploadStore.complete_session("alice", upload_id, dest)
+    assert size == 10
+    assert file_hash == hashlib.sha256(data).hexdigest()
+    with open(dest, "rb") as f:
+        assert f.read() == data
+    assert _session(upload_id) is None
+
+def test_other_owner_cannot_write(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    assert UploadStore.write_part("bob", upload["upload_id"], 0, b"abcd") is None
+    assert UploadStore.get_session("bob", upload["upload_id"]) is None
+
+def test_part_beyond_declared_size_is_rejected(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    with pytest.raises(UploadTooLarge):
+        UploadStore.write_part("alice", upload["upload_id"], 0, b"abcdef")
+
+def test_offset_claim_blocks_concurrent_writer(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 8, MAX_BYTES)
+    upload_id = upload["upload_id"]
+    # 다른 요청이 같은 offset을 기록 중
+    upload_sessions_col.update_one({"upload_id": upload_id}, {"$set": {"writing": 0, "writing_at": datetime.now()}})
+
+    with pytest.raises(UploadConflict):
+        UploadStore.write_part("alice", upload_id, 0, b"abcd")
+    assert _session(upload_id)["received"] == 0
+
+def test_stale_offset_claim_is_taken_over(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    upload_id = upload["upload_id"]
+    # 기록 도중 죽은 요청의 오래된 선점
+    stale = datetime.now() - timedelta(seconds=UploadStore.WRITE_CLAIM_SECONDS + 1)
+    upload_sessions_col.update_one({"upload_id": upload_id}, {"$set": {"writing": 0, "writing_at": stale}})
+
+    assert UploadStore.write_part("alice", upload_id, 0, b"abcd")["received"] == 4
+    assert _session(upload_id)["writing"] is None
+
+def test_failed_write_releases_claim(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    upload_id = upload["upload_id"]
+    os.remove(UploadStore._part_path(upload_id))
+
+    with pytest.raises(OSError):
+        UploadStore.write_part("alice", upload_id, 0, b"abcd")
+    session = _session(upload_id)
+    assert session["writing"] is None
+    assert session["received"] == 0
+
+def test_complete_runs_once(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    upload_id = upload["upload_id"]
+
+    with pytest.raises(UploadConflict):
+        UploadStore.complete_session("alice", upload_id, str(storage_dirs / "early.mp3"))
+
+    UploadStore.write_part("alice", upload_id, 0, b"abcd")
+    # 다른 완료 요청이 처리 중
+    upload_sessions_col.update_one({"upload_id": upload_id}, {"$set": {"completing": True}})
+    with pytest.raises(UploadConflict):
+        UploadStore.complete_session("alice", upload_id, str(storage_dirs / "second.mp3"))
+    # 완료 처리 중에는 조각도 받지 않음
+    upload_sessions_col.update_one({"upload_id": upload_id}, {"$set": {"received": 0}})
+    with pytest.raises(UploadConflict):
+        UploadStore.write_part("alice", upload_id, 0, b"abcd")
+
+def test_complete_rehashes_when_hasher_missing(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    upload_id = upload["upload_id"]
+    UploadStore.write_part("alice", upload_id, 0, b"abcd")
+    # 다른 프로세스에서 완료 요청을 받은 경우
+    UploadStore._hashers.pop(upload_id, None)
+
+    file_hash, _ = UploadStore.complete_session("alice", upload_id, str(storage_dirs / "talk.mp3"))
+    assert file_hash == hashlib.sha256(b"abcd").hexdigest()
+
+def test_discard_removes_part(storage_dirs):
+    upload = UploadStore.create_session("alice", "talk.mp3", 4, MAX_BYTES)
+    upload_id = upload["upload_id"]
+    assert UploadStore.discard_session("alice", upload_id)
+    assert not os.path.exists(UploadStore._part_path(upload_id))
+    assert not UploadStore.discard_session("alice", upload_id)
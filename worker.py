@@ -0,0 +1,161 @@
+# worker.py
+"""
+작업 워커 엔트리포인트 (JOB_EXECUTION_MODE=worker)
+
+    python worker.py [--processes N] [--threads M]
+
+웹 서버와 별도로 실행되며 MongoDB 대기열(history)에서 작업을 임대(lease)하여 처리합니다.
+- 처리 중에는 주기적으로 heartbeat를 보내 임대를 연장합니다.
+- 워커가 죽으면 임대가 만료되고, 다른 워커가 해당 작업을 다시 가져가 이어서 처리합니다.
+- 여러 머신에서 실행할 경우 UPLOAD_DIR / RESULT_DIR은 공유 스토리지여야 합니다.
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from app.core.config import settings
+
+def _run_job(job: dict, worker_id: str, lost: threading.Event):
+    # 무거운 모듈은 워커 프로세스 안에서만 import
+    from app.services.processor import process_file_task
+    from app.services.audio_processor import process_audio_task
+
+    # 임대 ID를 넘겨 완료/실패 기록과 결과 zip 교체는 임대를 가진 동안에만 수행
+    if job.get("kind") == "audio":
+        process_audio_task(job["id"], job["file_path"], worker_id, lost)
+    else:
+        process_file_task(job["id"], job["file_path"], worker_id, lost)
+
+def _heartbeat_loop(job_id: str, worker_id: str, stop: threading.Event, lost: threading.Event):
+    from app.services.job_manager import JobManager
+
+    interval = max(1, settings.JOB_LEASE_SECONDS // 3)
+    while not stop.wait(interval):
+        try:
+            if not JobManager.heartbeat(job_id, worker_id, settings.JOB_LEASE_SECONDS):
+                # 다른 워커가 가져갔으므로 처리 중단 신호 (두 워커가 같은 작업을 끝까지 실행하지 않도록)
+                print(f"[Worker] {worker_id} lost lease on job {job_id}, cancelling")
+                lost.set()
+                return
+        except Exception as e:
+            print(f"[Worker] heartbeat 실패 ({job_id}): {e}")
+
+def _job_loop(worker_id: str):
+    from app.services.job_manager import JobManager
+
+    while True:
+        try:
+            job = JobManager.claim_next_job(worker_id, settings.JOB_LEASE_SECONDS)
+        except Exception as e:
+            print(f"[Worker] 작업 조회 실패: {e}")
+            job = None
+
+        if not job:
+            time.sleep(settings.WORKER_POLL_SECONDS)
+            continue
+
+        if job.get("attempts", 1) > 1:
+            JobManager.update_progress(
+                job["id"], job.get("current_page", 0), job.get("total_pages", 0),
+                f"중단된 작업을 이어서 처리합니다. (시도 {job['attempts']}/{settings.JOB_MAX_ATTEMPTS})"
+            )
+
+        print(f"[Worker] {worker_id} picked job {job['id']} ({job.get('kind')})")
+        stop = threading.Event()
+        lost = threading.Event()
+        hb = threading.Thread(target=_heartbeat_loop, args=(job["id"], worker_id, stop, lost), daemon=True)
+        hb.start()
+        try:
+            _run_job(job, worker_id, lost)
+        except Exception as e:
+            print(f"[Worker] job {job['id']} crashed: {e}")
+            JobManager.mark_failed(job["id"], str(e), worker_id)
+        finally:
+            stop.set()
+            hb.join()
+
+def _shutdown_worker(signum, frame):
+    # terminate()(SIGTERM)로 종료되면 atexit이 실행되지 않으므로 상주 LibreOffice를 직접 정리
+    office = sys.modules.get("app.services.office_converter")
+    if office is not None:
+        office.office_converter.shutdown()
+    progress = sys.modules.get("app.services.progress_writer")
+    if progress is not None:
+        progress.progress_writer.flush_all()
+    os._exit(0)
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def gpu_slots_per_process(processes: int) -> int:
+    """
+    gpu_scheduler는 프로세스 안에서만 슬롯을 세므로, 전체 동시 요청 수가 LOCAL_MAX_INFLIGHT를 넘지 않도록 나눠서 배정
+    (프로세스 수가 더 많으면 프로세스당 1개가 최소이므로 실제 상한은 프로세스 수)
+    여러 머신에서 워커를 띄우는 경우에는 머신별 LOCAL_MAX_INFLIGHT를 나눠서 설정해야 합니다.
+    """
+    return max(1, settings.LOCAL_MAX_INFLIGHT // max(1, processes))
+
+def worker_process(index: int, threads: int, processes: int = 1):
+    """하나의 프로세스 안에서 threads개의 작업을 동시에 처리 (스케줄러는 프로세스 단위로 공유)"""
+    signal.signal(signal.SIGTERM, _shutdown_worker)
+    from app.services.scheduler import gpu_scheduler
+    gpu_scheduler.resize(gpu_slots_per_process(processes))
+    base_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+    loops = [
+        threading.Thread(target=_job_loop, args=(f"{base_id}-{t}",), daemon=True)
+        for t in range(max(1, threads))
+    ]
+    for loop in loops:
+        loop.start()
+    for loop in loops:
+        loop.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="LecAI job worker")
+    parser.add_argument("--processes", type=int, default=settings.WORKER_PROCESSES)
+    parser.add_argument("--threads", type=int, default=settings.WORKER_THREADS)
+    args = parser.parse_args()
+
+    # pymongo 클라이언트는 fork-safe 하지 않으므로 부모 프로세스에서 만들지 않고 별도 프로세스에서 인덱스 생성
+    subprocess.run([sys.executable, "-m", "app.db.indexes", "ensure"], check=False)
+
+    # 부모가 SIGTERM을 받아도 자식 프로세스를 정리하도록 KeyboardInterrupt와 같은 경로로 처리
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    procs = {}
+
+    def spawn(i):
+        p = multiprocessing.Process(target=worker_process, args=(i, args.threads, processes), daemon=True)
+        p.start()
+        procs[i] = p
+
+    processes = max(1, args.processes)
+    if processes > settings.LOCAL_MAX_INFLIGHT:
+        print(f"[WARN] 워커 프로세스 수({processes})가 LOCAL_MAX_INFLIGHT({settings.LOCAL_MAX_INFLIGHT})보다 많아 "
+              f"Local LLM 동시 요청이 최대 {processes}개까지 늘어날 수 있습니다.")
+
+    for i in range(processes):
+        spawn(i)
+    print(f"[Worker] {len(procs)} processes x {args.threads} threads started "
+          f"(GPU slots {gpu_slots_per_process(processes)}/process)")
+
+    # 죽은 프로세스는 재시작 (처리 중이던 작업은 임대 만료 후 다시 가져감)
+    try:
+        while True:
+            time.sleep(5)
+            for i, p in list(procs.items()):
+                if not p.is_alive():
+                    print(f"[Worker] process {i} exited ({p.exitcode}), restarting")
+                    spawn(i)
+    except KeyboardInterrupt:
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            p.join(timeout=30)
+
+if __name__ == "__main__":
+    main()